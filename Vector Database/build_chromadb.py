@@ -5,10 +5,19 @@ ChromaDB 1.4.x | sentence-transformers all-mpnet-base-v2 (768-dim)
 
 Run from the project root:
     cd Flex-Practicum-Project-2026
-    python "Vector Database/build_chromadb.py"
+    python "Vector Database/build_chromadb.py"            # new/changed files only
+    python "Vector Database/build_chromadb.py" --fresh    # re-embed everything
+    python "Vector Database/build_chromadb.py" --chunking structured   # section/table-aware chunks
 """
 
+import argparse
+import itertools
+import os
+import queue
 import re
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
 from pathlib import Path
 from collections import defaultdict
 
@@ -43,6 +52,32 @@ SCRIPT_DIR = Path(__file__).resolve().parent
 BASE = SCRIPT_DIR.parent                          # project root
 DB_PATH = str(BASE / "chromadb_store")
 
+# Shared backend helpers (stats index, content manifest, ...) live under BASE/backend
+if str(BASE) not in sys.path:
+    sys.path.insert(0, str(BASE))
+from backend.core.config import METADATA_INDEX_PATH, CONTENT_MANIFEST_PATH, SPARSE_INDEX_PATH
+from backend.core.stats_index import MetadataIndex, sync_index
+from backend.core.sparse_index import SparseIndex, sync_sparse_index
+from backend.core.content_manifest import ContentManifest, file_key, file_sha256
+from backend.core.config import CHUNKING_STRATEGY
+from backend.core.extraction_cache import cached_extract, get_extraction_cache, HTML_TEXT, HTML_LAYOUT, PDF_LAYOUT
+from backend.core.chunking import CHUNKING_STRATEGIES, iter_document_chunks, chunk_metadata
+from backend.core.periods import period_fields, backfill_period_fields
+from backend.core.near_duplicates import simhash_hex
+from backend.core.layout_text import layout_page_text, read_html_layout, read_pdf_layout
+from backend.core.pdf_parallel import (
+    mark_worker_process, page_count, should_shard, submit_page_shards, join_shards,
+)
+
+# Persist the stats and sparse indexes every N processed files (and always at the end)
+INDEX_SAVE_EVERY = 25
+
+# Pipelined build settings
+EXTRACT_WORKERS = max(1, (os.cpu_count() or 2) - 1)   # extraction processes
+EMBED_BATCH = 512                                      # chunks per encoder call (across files)
+UPSERT_BATCH = 256                                     # chunks per collection.upsert()
+UPSERT_QUEUE_SIZE = 4                                  # embedded batches waiting for upsert
+
 # Company → list of (subfolder, filing_type) pairs.
 # Paths are relative to BASE / company_folder.
 SOURCES = {
@@ -124,106 +159,34 @@ def _clean_extracted_text(text):
 # ---------------------------------------------------------------------------
 # TEXT EXTRACTION
 # ---------------------------------------------------------------------------
-def extract_html(path):
+def _read_html_text(path):
     with open(path, "r", encoding="utf-8", errors="ignore") as f:
         soup = BeautifulSoup(f.read(), "html.parser")
     for el in soup(["script", "style", "head", "meta"]):
         el.decompose()
-    return _clean_extracted_text(soup.get_text(separator="\n", strip=True))
-
-def _extract_page_with_tables(page):
-    """Extract text from a single pdfplumber page, rendering tables as Markdown."""
-    parts = []
-    tables = page.find_tables()
-    table_bboxes = [t.bbox for t in tables]
-
-    # Extract non-table text
-    if table_bboxes:
-        non_table_page = page
-        for bbox in table_bboxes:
-            clipped = (
-                max(0, bbox[0]), max(0, bbox[1]),
-                min(page.width, bbox[2]), min(page.height, bbox[3]),
-            )
-            try:
-                non_table_page = non_table_page.outside_bbox(clipped)
-            except Exception:
-                pass
-        text = non_table_page.extract_text() or ""
-        if text.strip():
-            parts.append(text)
-    else:
-        text = page.extract_text() or ""
-        if text.strip():
-            parts.append(text)
-
-    # Extract tables as Markdown
-    for table in tables:
-        rows = table.extract()
-        if not rows or len(rows) < 2:
-            continue
-        header = [cell.strip() if cell else "" for cell in rows[0]]
-        md_lines = ["| " + " | ".join(header) + " |"]
-        md_lines.append("| " + " | ".join(["---"] * len(header)) + " |")
-        for row in rows[1:]:
-            cells = [cell.strip() if cell else "" for cell in row]
-            if any(cells):
-                md_lines.append("| " + " | ".join(cells) + " |")
-        parts.append("\n".join(md_lines))
-
-    return "\n\n".join(parts)
-
-def _extract_page_words(page):
-    """Word-level extraction for multi-column pages (correct reading order)."""
-    words = page.extract_words(x_tolerance=3, y_tolerance=3)
-    if not words:
-        return ""
-    # Group by y-position (lines), then sort each line by x
-    lines = {}
-    for w in words:
-        y_key = round(w["top"] / 3) * 3
-        lines.setdefault(y_key, []).append(w)
-    sorted_lines = sorted(lines.items())
-    result = []
-    for _, line_words in sorted_lines:
-        line_words.sort(key=lambda w: w["x0"])
-        result.append(" ".join(w["text"] for w in line_words))
-    return "\n".join(result)
-
-def extract_pdf(path):
-    """Extract text from PDF using pdfplumber (with table + multi-column support).
+    return soup.get_text(separator="\n", strip=True)
+
+def extract_html(path, sha=None, layout=False):
+    # Raw text is shared with the ingestion processor via the extraction cache;
+    # layout=True renders tables as Markdown (structured chunking)
+    if layout:
+        return _clean_extracted_text(cached_extract(path, *HTML_LAYOUT, read_html_layout, sha=sha))
+    return _clean_extracted_text(cached_extract(path, *HTML_TEXT, _read_html_text, sha=sha))
+
+def extract_pdf(path, pages=None, sha=None):
+    """Extract text from PDF using pdfplumber (tables as Markdown + multi-column support).
+    `pages` is per-page text already extracted by page-sharded workers; long PDFs
+    are otherwise split across processes by the page-parallel engine.
     Falls back to PyPDF2 if pdfplumber fails entirely."""
-    text = ""
-    try:
-        with pdfplumber.open(path) as pdf:
-            for page in pdf.pages:
-                page_text = _extract_page_with_tables(page)
-                if not page_text or len(page_text.strip()) < 20:
-                    page_text = _extract_page_words(page)
-                if page_text:
-                    text += page_text + "\n\n"
-        if text.strip():
-            return _clean_extracted_text(text)
-    except Exception as e:
-        print(f" ⚠️  pdfplumber error, falling back to PyPDF2: {e}")
-
-    # PyPDF2 fallback
-    text = ""
-    try:
-        with open(path, "rb") as f:
-            for page in PyPDF2.PdfReader(f).pages:
-                t = page.extract_text()
-                if t:
-                    text += t + "\n"
-    except Exception as e:
-        print(f" ⚠️  PDF error: {e}")
+    text = cached_extract(path, *PDF_LAYOUT, lambda p: read_pdf_layout(p, pages), sha=sha)
     return _clean_extracted_text(text)
 
-def extract(path):
+def extract(path, sha=None, pages=None, layout=False):
+    """Extract cleaned text, served from the shared extraction cache when possible."""
     if path.suffix.lower() in (".html", ".htm"):
-        return extract_html(path)
+        return extract_html(path, sha, layout)
     elif path.suffix.lower() == ".pdf":
-        return extract_pdf(path)
+        return extract_pdf(path, pages, sha)
     return ""
 
 # ---------------------------------------------------------------------------
@@ -366,16 +329,10 @@ def get_fiscal_quarter(path, company, content=""):
 # ---------------------------------------------------------------------------
 # CHUNKING
 # ---------------------------------------------------------------------------
-def chunk_text(text, chunk_words=250, overlap_words=50):
-    words = text.split()
-    if not words:
-        return []
-    chunks = []
-    i = 0
-    while i < len(words):
-        chunks.append(" ".join(words[i:i + chunk_words]).strip())
-        i += chunk_words - overlap_words
-    return [c for c in chunks if len(c) > 50]
+def chunk_document(text, chunking="words"):
+    """Chunks (text, section, kind) under the "words" or "structured" strategy.
+    Both stream over the text (shared with ingestion; no full word list is built)."""
+    return list(iter_document_chunks(text, chunking))
 
 # ---------------------------------------------------------------------------
 # FILE DISCOVERY
@@ -416,10 +373,114 @@ def discover_all_files():
 
     return results
 
+# ---------------------------------------------------------------------------
+# PIPELINE STAGES
+# ---------------------------------------------------------------------------
+def prepare_file(filepath, company, filing_type, pages=None, chunking="words"):
+    """
+    Stage 1 (process pool): hash, extract, classify and chunk one file.
+    `pages` carries per-page text of a long PDF that was extracted page-sharded.
+    Returns (filepath, company, filing_type, sha256, ids, texts, metadatas, status).
+    """
+    try:
+        sha = file_sha256(filepath)
+        text = extract(filepath, sha, pages, layout=chunking == "structured")
+    except Exception as e:
+        return filepath, company, filing_type, None, [], [], [], f"error: {e}"
+    if not text or len(text.strip()) < 100:
+        return filepath, company, filing_type, sha, [], [], [], "empty"
+
+    # Use content-based detection for filing type and fiscal quarter
+    if not filing_type or filing_type == "Other":
+        filing_type = detect_filing_type(filepath, text)
+    fy, q = get_fiscal_quarter(filepath, company, text)
+
+    chunks = chunk_document(text, chunking)
+    if not chunks:
+        return filepath, company, filing_type, sha, [], [], [], "no chunks"
+
+    ids, texts, metadatas = [], [], []
+    safe_stem = re.sub(r"[^a-zA-Z0-9_\-]", "_", filepath.stem)
+    for i, chunk in enumerate(chunks):
+        ids.append(f"{company}_{safe_stem}_chunk{i:04d}")
+        texts.append(chunk.text)
+        metadatas.append({
+            "company":      company,
+            "source_file":  filepath.name,
+            "filing_type":  filing_type,
+            "fiscal_year":  fy,
+            "quarter":      q,
+            **period_fields(fy, q),
+            "chunk_index":  i,
+            "total_chunks": len(chunks),
+            "simhash":      simhash_hex(chunk.text),
+            **chunk_metadata(chunk),
+        })
+    return filepath, company, filing_type, sha, ids, texts, metadatas, "ok"
+
+
+def _finish_file(record, collection, index, sparse, manifest):
+    """Apply a file's metadata-only updates and deletions, then checkpoint it."""
+    if record["update_ids"]:
+        collection.update(ids=record["update_ids"], metadatas=record["update_meta"])
+        index.record_upsert(record["update_ids"], record["update_meta"])
+        sparse.record_upsert(record["update_ids"], record["update_meta"])
+    if record["delete_ids"]:
+        collection.delete(ids=record["delete_ids"])
+        index.record_delete(record["delete_ids"])
+        sparse.record_delete(record["delete_ids"])
+    manifest.record(record["key"], record["path"], record["sha"], record["hashes"], record["chunking"])
+
+
+def _upsert_worker(batches, collection, index, sparse, manifest, errors):
+    """
+    Stage 3 (thread): upsert embedded batches and checkpoint finished files.
+    Each batch is (ids, embeddings, texts, metadatas, finished_file_records).
+    """
+    files_since_save = 0
+    while True:
+        batch = batches.get()
+        if batch is None:
+            break
+        if errors:
+            continue    # drain so the producer never blocks after a failure
+        ids, embeddings, texts, metadatas, finished = batch
+        try:
+            for start in range(0, len(ids), UPSERT_BATCH):
+                end = start + UPSERT_BATCH
+                collection.upsert(
+                    ids=ids[start:end],
+                    embeddings=embeddings[start:end],
+                    documents=texts[start:end],
+                    metadatas=metadatas[start:end],
+                )
+                index.record_upsert(ids[start:end], metadatas[start:end])
+                sparse.record_upsert(ids[start:end], metadatas[start:end], texts[start:end])
+            for record in finished:
+                _finish_file(record, collection, index, sparse, manifest)
+            files_since_save += len(finished)
+            if finished:
+                manifest.save()
+            if files_since_save >= INDEX_SAVE_EVERY:
+                index.save()
+                sparse.save()
+                files_since_save = 0
+        except Exception as e:
+            errors.append(e)
+            print(f"\n  ❌ Upsert failed: {e}")
+
+
 # ---------------------------------------------------------------------------
 # MAIN
 # ---------------------------------------------------------------------------
-def build_db():
+def build_db(workers=None, embed_batch=EMBED_BATCH, resume=True, chunking=CHUNKING_STRATEGY):
+    """
+    Pipelined, incremental build: a process pool hashes, extracts and chunks
+    files, the main thread encodes new/changed chunks from many files in large
+    batches, and a separate thread upserts them. Every finished file is
+    recorded in the content-hash manifest, so unchanged files are skipped and
+    an interrupted build resumes where it stopped.
+    """
     print("=" * 70)
     print("  MULTI-COMPANY CAPEX — CHROMADB EMBEDDING PIPELINE")
     print("=" * 70)
@@ -432,6 +493,31 @@ def build_db():
         metadata={"hnsw:space": "cosine"}
     )
     print(f"   Collection: capex_docs | Existing docs: {collection.count()}")
+    print(f"   Chunking: {chunking}")
+
+    # --- Metadata stats index (kept in sync with every upsert) ---
+    index = MetadataIndex(METADATA_INDEX_PATH)
+    sync_index(index, collection)
+
+    # --- BM25 sparse index (hybrid retrieval; same upsert/delete stream) ---
+    sparse = SparseIndex(SPARSE_INDEX_PATH)
+    sync_sparse_index(sparse, collection)
+
+    # --- Numeric period fields (fy_int, q_int, period_ordinal) for chunks built before them ---
+    def record_update(ids, metadatas):
+        index.record_upsert(ids, metadatas)
+        sparse.record_upsert(ids, metadatas)
+
+    backfilled = backfill_period_fields(collection, on_update=record_update)
+    if backfilled:
+        index.save()
+        sparse.save()
+        print(f"   Added period fields to {backfilled} existing chunks")
+
+    # --- Content-hash manifest (checkpoint + change detection) ---
+    manifest = ContentManifest(CONTENT_MANIFEST_PATH)
+    if not resume:
+        manifest.clear()
 
     # --- Embedding model ---
     print("\n🔄 Loading embedding model (all-mpnet-base-v2)...")
@@ -441,77 +527,188 @@ def build_db():
     # --- Discover files ---
     print("\n📂 Scanning company folders...")
     all_files = discover_all_files()
-    print(f"\n   Total files to process: {len(all_files)}")
+    print(f"\n   Total files found: {len(all_files)}")
 
     if not all_files:
         print("\n❌ No files found. Check folder structure.")
         return
 
+    todo = []
+    for f in all_files:
+        key = file_key(f[0])
+        if not index.contains(manifest.chunk_ids(key)):
+            manifest.forget(key)    # chunks missing from the collection
+        if manifest.known_sha(key, f[0], chunking) is None:
+            todo.append(f)
+    manifest.save()
+    if len(todo) < len(all_files):
+        print(f"   Unchanged: {len(all_files) - len(todo)} files skipped, {len(todo)} new or changed")
+
     # --- Process ---
-    total_chunks = 0
     stats        = defaultdict(lambda: {"files": 0, "chunks": 0})
     company_stats = defaultdict(lambda: {"files": 0, "chunks": 0})
 
-    for filepath, company, filing_type in all_files:
-        print(f"  📄 [{company:<11}] {filepath.name:<65} ", end="", flush=True)
-
-        text = extract(filepath)
-        if not text or len(text.strip()) < 100:
-            print("→ empty")
-            continue
-
-        # Use content-based detection for filing type and fiscal quarter
-        if not filing_type or filing_type == "Other":
-            filing_type = detect_filing_type(filepath, text)
-        fy, q = get_fiscal_quarter(filepath, company, text)
-
-        chunks = chunk_text(text)
-        if not chunks:
-            print("→ no chunks")
-            continue
+    try:
+        completed = _run_pipeline(todo, collection, model, index, sparse, manifest,
+                                  stats, company_stats, workers or EXTRACT_WORKERS, embed_batch, chunking)
+    finally:
+        index.save()
+        sparse.save()
+        manifest.save()
+    if not completed:
+        return
+    total_chunks = sum(s["chunks"] for s in company_stats.values())
 
-        print(f"→ {len(chunks)} chunks", end="", flush=True)
-
-        # Build batch
-        ids, texts, metadatas = [], [], []
-        for i, chunk in enumerate(chunks):
-            safe_stem = re.sub(r"[^a-zA-Z0-9_\-]", "_", filepath.stem)
-            doc_id = f"{company}_{safe_stem}_chunk{i:04d}"
-
-            ids.append(doc_id)
-            texts.append(chunk)
-            metadatas.append({
-                "company":      company,
-                "source_file":  filepath.name,
-                "filing_type":  filing_type,
-                "fiscal_year":  fy,
-                "quarter":      q,
-                "chunk_index":  i,
-                "total_chunks": len(chunks),
-            })
-
-        # Embed + upsert in batches of 64
-        for start in range(0, len(texts), 64):
-            b_ids  = ids[start:start + 64]
-            b_txt  = texts[start:start + 64]
-            b_meta = metadatas[start:start + 64]
-
-            embeddings = model.encode(b_txt, show_progress_bar=False)
-            collection.upsert(
-                ids=b_ids,
-                embeddings=embeddings.tolist(),
-                documents=b_txt,
-                metadatas=b_meta,
-            )
+    # --- Summary ---
+    _print_summary_and_smoke_test(collection, model, total_chunks, stats, company_stats)
 
-        total_chunks += len(chunks)
-        stats[filing_type]["files"]  += 1
-        stats[filing_type]["chunks"] += len(chunks)
-        company_stats[company]["files"]  += 1
-        company_stats[company]["chunks"] += len(chunks)
-        print(" ✓")
 
-    # --- Summary ---
+def _submit_pdf_shards(pool, filepath):
+    """
+    Split a long PDF into page ranges on the build pool so one big annual
+    report doesn't serialize on a single worker. Returns the shard futures,
+    or None when the file should be prepared whole (short, not a PDF, or
+    already in the extraction cache).
+    """
+    if filepath.suffix.lower() != ".pdf":
+        return None
+    try:
+        pages = page_count(filepath)
+        if not should_shard(filepath, pages):
+            return None
+        if get_extraction_cache().contains(*PDF_LAYOUT, file_sha256(filepath)):
+            return None
+        shards = submit_page_shards(pool, filepath, layout_page_text, pages)
+    except Exception:
+        return None     # prepare_file reports the error / falls back to PyPDF2
+    print(f"  📑 {filepath.name}: {pages} pages → {len(shards)} page-range shards")
+    return shards
+
+
+def _run_pipeline(files, collection, model, index, sparse, manifest,
+                  stats, company_stats, workers, embed_batch, chunking="words"):
+    """Run the extract → embed → upsert stages over the given files."""
+    batches = queue.Queue(maxsize=UPSERT_QUEUE_SIZE)
+    errors = []
+    upserter = threading.Thread(
+        target=_upsert_worker,
+        args=(batches, collection, index, sparse, manifest, errors),
+        daemon=True,
+    )
+    upserter.start()
+
+    # Chunks waiting to be embedded, possibly spanning several files
+    buf_ids, buf_texts, buf_meta = [], [], []
+    # (file record, index of the file's last chunk in the embed stream)
+    pending_files = []
+    emitted = 0
+
+    def flush():
+        nonlocal buf_ids, buf_texts, buf_meta, pending_files, emitted
+        if not buf_ids and not pending_files:
+            return
+        embeddings = model.encode(buf_texts, batch_size=64, show_progress_bar=False).tolist() if buf_texts else []
+        emitted += len(buf_ids)
+        finished = [rec for rec, last in pending_files if last < emitted]
+        pending_files = [p for p in pending_files if p[1] >= emitted]
+        batches.put((buf_ids, embeddings, buf_texts, buf_meta, finished))
+        print(f"  ⬆  embedded {len(buf_ids):>4} chunks | files complete: {len(finished)}", flush=True)
+        buf_ids, buf_texts, buf_meta = [], [], []
+
+    queued = 0
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=mark_worker_process) as pool:
+            it = iter(files)
+            # future -> None for a whole-file task, or the shard group of a long PDF
+            in_flight = {}
+
+            def submit(f):
+                shards = _submit_pdf_shards(pool, f[0])
+                if shards is None:
+                    in_flight[pool.submit(prepare_file, *f, None, chunking)] = None
+                    return
+                group = {"file": f, "shards": shards, "remaining": len(shards)}
+                for shard in shards:
+                    in_flight[shard] = group
+
+            # Keep a bounded number of files in flight so extraction stays
+            # ahead of the encoder without holding the whole corpus in memory
+            for f in itertools.islice(it, workers * 2):
+                submit(f)
+
+            while in_flight and not errors:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    group = in_flight.pop(fut)
+                    if group is not None:
+                        # One page range of a long PDF; once all are back,
+                        # classify + chunk the reassembled pages as usual
+                        group["remaining"] -= 1
+                        if group["remaining"] == 0:
+                            try:
+                                pages = join_shards(group["shards"])
+                            except Exception as e:
+                                print(f"  ⚠️  page-sharded extraction failed ({e}); extracting serially")
+                                pages = None
+                            in_flight[pool.submit(prepare_file, *group["file"], pages, chunking)] = None
+                        continue
+
+                    nxt = next(it, None)
+                    if nxt is not None:
+                        submit(nxt)
+
+                    filepath, company, filing_type, sha, ids, texts, metas, status = fut.result()
+                    if status != "ok":
+                        # Errors and empty extractions (e.g. a PDF parse that
+                        # failed quietly) leave the file's chunks and manifest
+                        # entry alone, so the next build looks at it again
+                        print(f"  📄 [{company:<11}] {filepath.name:<65} → {status}")
+                        continue
+
+                    key = file_key(filepath)
+                    plan = manifest.plan(key, ids, texts, metas)
+                    record = {
+                        "key": key,
+                        "path": filepath,
+                        "sha": sha,
+                        "chunking": chunking,
+                        "hashes": plan.hashes,
+                        "update_ids": [ids[i] for i in plan.update],
+                        "update_meta": [metas[i] for i in plan.update],
+                        "delete_ids": plan.delete,
+                    }
+
+                    print(f"  📄 [{company:<11}] {filepath.name:<65} → {len(ids)} chunks"
+                          f" ({len(plan.embed)} to embed, {len(plan.delete)} removed)")
+
+                    buf_ids += [ids[i] for i in plan.embed]
+                    buf_texts += [texts[i] for i in plan.embed]
+                    buf_meta += [metas[i] for i in plan.embed]
+                    queued += len(plan.embed)
+                    # Checkpointed once its last new chunk has been upserted
+                    pending_files.append((record, queued - 1))
+
+                    stats[filing_type]["files"]  += 1
+                    stats[filing_type]["chunks"] += len(plan.embed)
+                    company_stats[company]["files"]  += 1
+                    company_stats[company]["chunks"] += len(plan.embed)
+
+                    if len(buf_ids) >= embed_batch:
+                        flush()
+        flush()
+    except KeyboardInterrupt:
+        print("\n  ⏸  Interrupted — finished files are checkpointed; rerun to resume.")
+        return False
+    finally:
+        batches.put(None)
+        upserter.join()
+
+    if errors:
+        raise errors[0]
+    return True
+
+
+def _print_summary_and_smoke_test(collection, model, total_chunks, stats, company_stats):
     print("\n" + "=" * 70)
     print("  EMBEDDING COMPLETE")
     print("=" * 70)
@@ -565,4 +762,16 @@ def build_db():
 
 # ---------------------------------------------------------------------------
 if __name__ == "__main__":
-    build_db()
+    parser = argparse.ArgumentParser(description="Build the capex_docs ChromaDB collection")
+    parser.add_argument("--workers", type=int, default=None,
+                        help=f"extraction processes (default {EXTRACT_WORKERS})")
+    parser.add_argument("--embed-batch", type=int, default=EMBED_BATCH,
+                        help=f"chunks per embedding batch (default {EMBED_BATCH})")
+    parser.add_argument("--fresh", action="store_true",
+                        help="ignore the content manifest and re-embed every file")
+    parser.add_argument("--chunking", choices=CHUNKING_STRATEGIES, default=CHUNKING_STRATEGY,
+                        help="words: 250/50 word windows; structured: section-aware, "
+                             f"tables kept whole (default {CHUNKING_STRATEGY})")
+    args = parser.parse_args()
+    build_db(workers=args.workers, embed_batch=args.embed_batch, resume=not args.fresh,
+             chunking=args.chunking)
@@ -5,6 +5,7 @@ Handles loading and processing of SEC filings, earnings calls, and presentations
 """
 
 import os
+import sys
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
@@ -25,6 +26,18 @@ except ImportError:
 # HTML processing
 from bs4 import BeautifulSoup
 
+# Shared extraction cache and page-parallel PDF engine from the backend
+# (optional: needs the backend's dependencies)
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(_PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(_PROJECT_ROOT))
+try:
+    from backend.core.extraction_cache import cached_extract, HTML_TEXT, PDF_TEXT
+    from backend.core.pdf_parallel import extract_pdf_text
+except ImportError:
+    cached_extract = extract_pdf_text = None
+    HTML_TEXT = PDF_TEXT = None
+
 
 @dataclass
 class Document:
@@ -244,21 +257,31 @@ class DocumentProcessor:
         
         return None
     
-    def _extract_pdf(self, filepath: Path) -> str:
-        """Extract text from PDF file"""
+    def _cached(self, filepath: Path, extractor: tuple, read_fn) -> str:
+        """Raw extraction through the backend's shared extraction cache, when available"""
+        if cached_extract is None:
+            return read_fn(filepath)
+        return cached_extract(filepath, *extractor, read_fn)
+    
+    def _read_pdf_text(self, filepath: Path) -> str:
+        """Raw PDF text (same output as the backend's pdf_text extractor)"""
         
         text = ""
         
         # Try pdfplumber first (better for tables)
         if pdfplumber:
             try:
-                with pdfplumber.open(filepath) as pdf:
-                    for page in pdf.pages:
-                        page_text = page.extract_text()
-                        if page_text:
-                            text += page_text + "\n\n"
+                if extract_pdf_text is not None:
+                    # Backend engine: long PDFs are split across processes by page range
+                    text = extract_pdf_text(filepath)
+                else:
+                    with pdfplumber.open(filepath) as pdf:
+                        for page in pdf.pages:
+                            page_text = page.extract_text()
+                            if page_text:
+                                text += page_text + "\n\n"
                 if text.strip():
-                    return self._clean_text(text)
+                    return text
             except Exception as e:
                 print(f"pdfplumber failed for {filepath}: {e}")
         
@@ -271,26 +294,33 @@ class DocumentProcessor:
                         page_text = page.extract_text()
                         if page_text:
                             text += page_text + "\n\n"
-                return self._clean_text(text)
+                return text
             except Exception as e:
                 print(f"PyPDF2 failed for {filepath}: {e}")
         
         return ""
     
+    def _extract_pdf(self, filepath: Path) -> str:
+        """Extract text from PDF file"""
+        return self._clean_text(self._cached(filepath, PDF_TEXT, self._read_pdf_text))
+    
+    def _read_html_text(self, filepath: Path) -> str:
+        """Raw HTML text (same output as the backend's html_text extractor)"""
+        
+        with open(filepath, "r", encoding="utf-8", errors="ignore") as f:
+            soup = BeautifulSoup(f.read(), "html.parser")
+        
+        # Remove script and style elements
+        for element in soup(["script", "style", "head", "meta"]):
+            element.decompose()
+        
+        return soup.get_text(separator="\n", strip=True)
+    
     def _extract_html(self, filepath: Path) -> str:
         """Extract text from HTML file"""
         
         try:
-            with open(filepath, "r", encoding="utf-8", errors="ignore") as f:
-                soup = BeautifulSoup(f.read(), "html.parser")
-            
-            # Remove script and style elements
-            for element in soup(["script", "style", "head", "meta"]):
-                element.decompose()
-            
-            text = soup.get_text(separator="\n", strip=True)
-            return self._clean_text(text)
-        
+            return self._clean_text(self._cached(filepath, HTML_TEXT, self._read_html_text))
         except Exception as e:
             print(f"HTML extraction failed for {filepath}: {e}")
             return ""
@@ -29,6 +29,15 @@ from .geographic import (
     analyze_regional_investments,
     compare_geographic_footprints,
 )
+from .prefetch import prefetch_company_analytics
+from .async_api import (
+    aanalyze_company_sentiment,
+    aclassify_company_investments,
+    aanalyze_company_trends,
+    aget_company_facilities,
+    aget_all_anomalies,
+    aprefetch_company_analytics,
+)
 
 __all__ = [
     # Sentiment
@@ -54,6 +63,15 @@ __all__ = [
     "get_all_facilities_map",
     "analyze_regional_investments",
     "compare_geographic_footprints",
+    # Prefetch
+    "prefetch_company_analytics",
+    # Async wrappers
+    "aanalyze_company_sentiment",
+    "aclassify_company_investments",
+    "aanalyze_company_trends",
+    "aget_company_facilities",
+    "aget_all_anomalies",
+    "aprefetch_company_analytics",
     # Table Extractor
     "extract_company_financials",
     "extract_capex_breakdown",
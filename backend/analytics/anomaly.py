@@ -11,6 +11,11 @@ from backend.rag.retriever import search_documents, get_company_documents
 from backend.core.config import ANOMALY_THRESHOLD
 
 
+# Retrieval queries used by the detectors (also prefetched by dashboards)
+CAPEX_ANOMALY_QUERY = "{company} capital expenditure CapEx spending investment million billion"
+AI_CHANGE_QUERY = "{company} AI artificial intelligence data center GPU machine learning"
+
+
 def extract_dollar_amounts(text: str) -> list[float]:
     """
     Extract dollar amounts from text.
@@ -62,7 +67,7 @@ def detect_capex_anomalies(company: str, threshold: float = ANOMALY_THRESHOLD) -
     """
     # Search for CapEx-related content
     docs = search_documents(
-        query=f"{company} capital expenditure CapEx spending investment million billion",
+        query=CAPEX_ANOMALY_QUERY.format(company=company),
         company_filter=company,
         n_results=50,
     )
@@ -188,7 +193,7 @@ def detect_ai_investment_changes(company: str) -> dict:
     """
     # Search for AI-related content
     docs = search_documents(
-        query=f"{company} AI artificial intelligence data center GPU machine learning",
+        query=AI_CHANGE_QUERY.format(company=company),
         company_filter=company,
         n_results=100,
     )
@@ -0,0 +1,25 @@
+"""
+Async wrappers for the analytics functions.
+Each wrapper runs the (blocking, retrieval-heavy) analytics call on the
+"search" pool so async route handlers can await it without stalling the event loop.
+"""
+from backend.core.executor import offloaded
+from backend.analytics.sentiment import analyze_company_sentiment, compare_company_sentiments
+from backend.analytics.classifier import classify_company_investments, compare_investment_focus
+from backend.analytics.trends import analyze_company_trends, compare_company_trends
+from backend.analytics.geographic import get_company_facilities
+from backend.analytics.anomaly import detect_capex_anomalies, detect_ai_investment_changes, get_all_anomalies
+from backend.analytics.prefetch import prefetch_company_analytics
+
+
+aanalyze_company_sentiment = offloaded("search", analyze_company_sentiment)
+acompare_company_sentiments = offloaded("search", compare_company_sentiments)
+aclassify_company_investments = offloaded("search", classify_company_investments)
+acompare_investment_focus = offloaded("search", compare_investment_focus)
+aanalyze_company_trends = offloaded("search", analyze_company_trends)
+acompare_company_trends = offloaded("search", compare_company_trends)
+aget_company_facilities = offloaded("search", get_company_facilities)
+adetect_capex_anomalies = offloaded("search", detect_capex_anomalies)
+adetect_ai_investment_changes = offloaded("search", detect_ai_investment_changes)
+aget_all_anomalies = offloaded("search", get_all_anomalies)
+aprefetch_company_analytics = offloaded("search", prefetch_company_analytics)
@@ -38,6 +38,10 @@ TRADITIONAL_KEYWORDS = {
 }
 
 
+# Retrieval query used by classify_company_investments (also prefetched by dashboards)
+INVESTMENT_QUERY = "{company} investment capital expenditure CapEx spending expansion"
+
+
 def classify_investment_text(text: str) -> dict:
     """
     Classify a text passage as AI/Data Center or Traditional investment.
@@ -116,7 +120,7 @@ def classify_company_investments(company: str, n_docs: int = 50) -> dict:
     """
     # Search for investment-related content
     docs = search_documents(
-        query=f"{company} investment capital expenditure CapEx spending expansion",
+        query=INVESTMENT_QUERY.format(company=company),
         company_filter=company,
         n_results=n_docs,
     )
@@ -8,7 +8,7 @@ from pathlib import Path
 from typing import Optional
 from collections import defaultdict
 
-from backend.rag.retriever import search_documents, get_company_documents
+from backend.rag.retriever import search_documents_batch, get_company_documents
 from backend.core.config import COMPANIES
 
 # Known location patterns and their coordinates
@@ -181,18 +181,17 @@ def extract_facilities_from_documents(company: str, force_refresh: bool = False)
         if cached.get("facilities"):
             return cached
     
-    # Search for properties/facilities sections
-    property_docs = search_documents(
-        query=f"{company} properties facilities manufacturing plants locations operations",
-        company_filter=company,
-        n_results=30,
-    )
-    
-    # Also search for specific investment mentions
-    investment_docs = search_documents(
-        query=f"{company} facility expansion investment new plant construction",
-        company_filter=company,
-        n_results=20,
+    # Search for properties/facilities sections and specific investment
+    # mentions in a single batched retrieval
+    property_docs, investment_docs = search_documents_batch(
+        [
+            f"{company} properties facilities manufacturing plants locations operations",
+            f"{company} facility expansion investment new plant construction",
+        ],
+        [
+            {"company_filter": company, "n_results": 30},
+            {"company_filter": company, "n_results": 20},
+        ],
     )
     
     # Combine documents
@@ -0,0 +1,53 @@
+"""
+Batched retrieval warm-up for the per-company analytics.
+Issues every analytics search for a set of companies as one batched query so
+that the analytics functions called afterwards find the results in search_cache
+instead of each running its own encode + ChromaDB round trip.
+"""
+from backend.rag.retriever import prefetch_documents
+from backend.analytics.sentiment import SENTIMENT_QUERY
+from backend.analytics.classifier import INVESTMENT_QUERY
+from backend.analytics.trends import CAPEX_TREND_QUERY, AI_TREND_QUERY
+from backend.analytics.anomaly import CAPEX_ANOMALY_QUERY, AI_CHANGE_QUERY
+
+
+# (query template, n_results) pairs matching each analytics function's defaults
+CORE_SEARCHES = [
+    (SENTIMENT_QUERY, 20),      # analyze_company_sentiment
+    (INVESTMENT_QUERY, 50),     # classify_company_investments
+    (CAPEX_TREND_QUERY, 100),   # analyze_company_trends
+    (AI_TREND_QUERY, 100),      # analyze_company_trends
+]
+
+ANOMALY_SEARCHES = [
+    (CAPEX_ANOMALY_QUERY, 50),  # detect_capex_anomalies
+    (AI_CHANGE_QUERY, 100),     # detect_ai_investment_changes
+]
+
+
+def prefetch_company_analytics(
+    companies: list[str],
+    include_trends: bool = True,
+    include_anomalies: bool = False,
+) -> int:
+    """
+    Run the analytics searches for the given companies in one batch.
+
+    Returns the number of searches run.
+    """
+    searches = CORE_SEARCHES if include_trends else CORE_SEARCHES[:2]
+    if include_anomalies:
+        searches = searches + ANOMALY_SEARCHES
+
+    queries = []
+    filters = []
+    for company in companies:
+        for template, n_results in searches:
+            queries.append(template.format(company=company))
+            filters.append({"company_filter": company, "n_results": n_results})
+
+    try:
+        return prefetch_documents(queries, filters)
+    except Exception as e:
+        print(f"Analytics prefetch failed: {e}")
+        return 0
@@ -5,9 +5,8 @@ Uses a combination of financial lexicon and LLM for nuanced analysis.
 import re
 from collections import Counter
 from typing import Optional
-import anthropic
 
-from backend.core.config import ANTHROPIC_API_KEY, LLM_MODEL
+from backend.core.llm import llm_available, acreate_message
 from backend.rag.retriever import search_documents, get_company_documents
 from backend.core.cache import analytics_cache, cached
 
@@ -38,6 +37,9 @@ UNCERTAINTY_WORDS = {
     "intend", "plan", "planned", "potential", "potentially", "likely", "unlikely",
 }
 
+# Retrieval query used by analyze_company_sentiment (also prefetched by dashboards)
+SENTIMENT_QUERY = "{company} outlook strategy growth investment"
+
 AI_INVESTMENT_WORDS = {
     "ai", "artificial intelligence", "machine learning", "deep learning", "neural",
     "gpu", "data center", "datacenter", "hyperscale", "cloud", "generative ai",
@@ -94,11 +96,9 @@ async def analyze_sentiment_llm(text: str, context: str = "") -> dict:
     Returns:
         Dict with LLM sentiment analysis
     """
-    if not ANTHROPIC_API_KEY:
+    if not llm_available():
         return {"error": "ANTHROPIC_API_KEY not set"}
     
-    client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
-    
     # Truncate text if too long
     if len(text) > 10000:
         text = text[:10000] + "..."
@@ -121,8 +121,7 @@ Provide a JSON response with:
 Return only valid JSON, no other text."""
 
     try:
-        response = client.messages.create(
-            model=LLM_MODEL,
+        response = await acreate_message(
             max_tokens=500,
             messages=[{"role": "user", "content": prompt}]
         )
@@ -158,7 +157,7 @@ def analyze_company_sentiment(company: str, n_chunks: int = 20) -> dict:
     """
     # Get relevant documents
     docs = search_documents(
-        query=f"{company} outlook strategy growth investment",
+        query=SENTIMENT_QUERY.format(company=company),
         company_filter=company,
         n_results=n_chunks,
     )
@@ -3,22 +3,56 @@ PDF Table Extractor for financial data.
 Extracts tables from SEC filings and earnings presentations.
 """
 import re
+from importlib.util import find_spec
 from typing import Optional
 from pathlib import Path
 from collections import defaultdict
 
-try:
-    import pdfplumber
-    HAS_PDFPLUMBER = True
-except ImportError:
-    HAS_PDFPLUMBER = False
+# pdfplumber is imported on first use (keeps API startup light)
+HAS_PDFPLUMBER = find_spec("pdfplumber") is not None
 
+from backend.core.extraction_cache import cached_extract
 from backend.rag.retriever import search_documents
 
 
+# Extraction cache namespace for _read_pdf_tables() output
+PDF_TABLES = ("pdf_tables", 1)
+
+
+def _read_pdf_tables(pdf_path: Path) -> list[dict]:
+    import pdfplumber
+    tables = []
+    with pdfplumber.open(pdf_path) as pdf:
+        for page_num, page in enumerate(pdf.pages, 1):
+            page_tables = page.extract_tables()
+            
+            for table_idx, table in enumerate(page_tables):
+                if table and len(table) > 1:
+                    # Clean up table data
+                    cleaned_table = []
+                    for row in table:
+                        cleaned_row = [
+                            cell.strip() if cell else "" 
+                            for cell in row
+                        ]
+                        if any(cleaned_row):  # Skip empty rows
+                            cleaned_table.append(cleaned_row)
+                    
+                    if cleaned_table:
+                        tables.append({
+                            "page": page_num,
+                            "table_index": table_idx,
+                            "headers": cleaned_table[0] if cleaned_table else [],
+                            "rows": cleaned_table[1:] if len(cleaned_table) > 1 else [],
+                            "row_count": len(cleaned_table) - 1,
+                        })
+    return tables
+
+
 def extract_tables_from_pdf(pdf_path: str) -> list[dict]:
     """
     Extract tables from a PDF file using pdfplumber.
+    Results are cached on disk by file content hash.
     
     Args:
         pdf_path: Path to the PDF file
@@ -29,37 +63,10 @@ def extract_tables_from_pdf(pdf_path: str) -> list[dict]:
     if not HAS_PDFPLUMBER:
         return [{"error": "pdfplumber not installed. Run: pip install pdfplumber"}]
     
-    tables = []
-    
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            for page_num, page in enumerate(pdf.pages, 1):
-                page_tables = page.extract_tables()
-                
-                for table_idx, table in enumerate(page_tables):
-                    if table and len(table) > 1:
-                        # Clean up table data
-                        cleaned_table = []
-                        for row in table:
-                            cleaned_row = [
-                                cell.strip() if cell else "" 
-                                for cell in row
-                            ]
-                            if any(cleaned_row):  # Skip empty rows
-                                cleaned_table.append(cleaned_row)
-                        
-                        if cleaned_table:
-                            tables.append({
-                                "page": page_num,
-                                "table_index": table_idx,
-                                "headers": cleaned_table[0] if cleaned_table else [],
-                                "rows": cleaned_table[1:] if len(cleaned_table) > 1 else [],
-                                "row_count": len(cleaned_table) - 1,
-                            })
+        return cached_extract(Path(pdf_path), *PDF_TABLES, _read_pdf_tables)
     except Exception as e:
         return [{"error": f"Failed to extract tables: {str(e)}"}]
-    
-    return tables
 
 
 def extract_financial_data_from_text(text: str) -> dict:
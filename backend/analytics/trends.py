@@ -7,10 +7,15 @@ from typing import Optional
 from collections import defaultdict
 from statistics import mean, stdev
 
-from backend.rag.retriever import search_documents, get_company_documents
+from backend.rag.retriever import search_documents_batch, get_company_documents
 from backend.core.cache import analytics_cache, cached
 
 
+# Retrieval queries used by analyze_company_trends (also prefetched by dashboards)
+CAPEX_TREND_QUERY = "{company} capital expenditure CapEx investment spending"
+AI_TREND_QUERY = "{company} AI artificial intelligence machine learning data center"
+
+
 def extract_percentages(text: str) -> list[float]:
     """Extract percentage values from text."""
     percentages = []
@@ -116,13 +121,15 @@ def analyze_company_trends(company: str) -> dict:
         "overall_outlook": "",
     }
     
-    # Analyze CapEx mentions by period
-    capex_docs = search_documents(
-        query=f"{company} capital expenditure CapEx investment spending",
-        company_filter=company,
+    # Both trend searches share one encoder pass and one ChromaDB query
+    capex_docs, ai_docs = search_documents_batch(
+        [CAPEX_TREND_QUERY.format(company=company), AI_TREND_QUERY.format(company=company)],
+        [{"company_filter": company}, {"company_filter": company}],
         n_results=100,
     )
     
+    # Analyze CapEx mentions by period
+    
     capex_by_year = defaultdict(int)
     for doc in capex_docs:
         year = doc.get("fiscal_year", "Unknown")
@@ -141,12 +148,6 @@ def analyze_company_trends(company: str) -> dict:
         }
     
     # Analyze AI focus trend
-    ai_docs = search_documents(
-        query=f"{company} AI artificial intelligence machine learning data center",
-        company_filter=company,
-        n_results=100,
-    )
-    
     ai_by_year = defaultdict(int)
     ai_keywords = ["ai", "artificial intelligence", "machine learning", "gpu", "data center"]
     
@@ -4,7 +4,8 @@ Analysis API endpoints for dashboard data.
 from fastapi import APIRouter, HTTPException
 from backend.core.config import COMPANIES
 from backend.core.database import get_collection_stats, get_collection
-from backend.rag.retriever import search_documents
+from backend.core.executor import run_in_pool
+from backend.rag.retriever import asearch_documents, asearch_documents_batch
 
 router = APIRouter()
 
@@ -14,7 +15,7 @@ async def get_overview():
     """
     Get overview metrics for the dashboard.
     """
-    stats = get_collection_stats()
+    stats = await run_in_pool("search", get_collection_stats)
     
     # Calculate metrics
     total_docs = stats["total_documents"]
@@ -47,7 +48,7 @@ async def get_capex_mentions():
     Search for capital expenditure mentions across all companies.
     """
     # Search for CapEx-related content
-    results = search_documents(
+    results = await asearch_documents(
         query="capital expenditure property plant equipment investment",
         n_results=50,
     )
@@ -78,7 +79,7 @@ async def get_capex_analysis():
     Get CapEx mentions aggregated by company for the analysis page.
     """
     # Search for CapEx-related content
-    results = search_documents(
+    results = await asearch_documents(
         query="capital expenditure CapEx property plant equipment investment spending",
         n_results=100,
     )
@@ -123,31 +124,33 @@ async def get_company_data_summary():
         "strategy": "strategy outlook guidance forecast future",
     }
     
+    # Every (company, category) search in one batched retrieval
+    pairs = [
+        (company, category, query)
+        for company in companies
+        for category, query in data_categories.items()
+    ]
+    batched = await asearch_documents_batch(
+        [query for _, _, query in pairs],
+        [{"company_filter": company} for company, _, _ in pairs],
+        n_results=5,
+    )
+    
     summary = {}
     
-    for company in companies:
-        company_summary = {}
-        for category, query in data_categories.items():
-            results = search_documents(
-                query=query,
-                company_filter=company,
-                n_results=5,
-            )
-            
-            # Get sample excerpts
-            excerpts = []
-            for r in results[:2]:
-                excerpt = r["content"][:200].strip().replace("\n", " ")
-                if excerpt:
-                    excerpts.append(excerpt)
-            
-            company_summary[category] = {
-                "count": len(results),
-                "has_data": len(results) > 0,
-                "sample_excerpts": excerpts,
-            }
+    for (company, category, _), results in zip(pairs, batched):
+        # Get sample excerpts
+        excerpts = []
+        for r in results[:2]:
+            excerpt = r["content"][:200].strip().replace("\n", " ")
+            if excerpt:
+                excerpts.append(excerpt)
         
-        summary[company] = company_summary
+        summary.setdefault(company, {})[category] = {
+            "count": len(results),
+            "has_data": len(results) > 0,
+            "sample_excerpts": excerpts,
+        }
     
     return {"summary": summary}
 
@@ -157,15 +160,12 @@ async def get_ai_investments():
     """
     Search for AI and data center investment mentions aggregated by company.
     """
-    # Search for AI-related content
-    ai_results = search_documents(
-        query="AI artificial intelligence machine learning GPU neural network deep learning",
-        n_results=100,
-    )
-    
-    # Search for data center content
-    dc_results = search_documents(
-        query="data center datacenter hyperscale cloud infrastructure server",
+    # Search for AI-related and data center content in one batch
+    ai_results, dc_results = await asearch_documents_batch(
+        [
+            "AI artificial intelligence machine learning GPU neural network deep learning",
+            "data center datacenter hyperscale cloud infrastructure server",
+        ],
         n_results=100,
     )
     
@@ -212,23 +212,21 @@ async def get_company_analysis(ticker: str):
     
     company_name = COMPANIES[ticker]["name"].split()[0]
     
-    # Get CapEx mentions for this company
-    capex_results = search_documents(
-        query=f"{company_name} capital expenditure investment property equipment",
-        company_filter=company_name,
-        n_results=20,
-    )
-    
-    # Get AI mentions for this company
-    ai_results = search_documents(
-        query=f"{company_name} AI data center artificial intelligence investment",
-        company_filter=company_name,
+    # Get CapEx and AI mentions for this company in one batch
+    capex_results, ai_results = await asearch_documents_batch(
+        [
+            f"{company_name} capital expenditure investment property equipment",
+            f"{company_name} AI data center artificial intelligence investment",
+        ],
+        [{"company_filter": company_name}, {"company_filter": company_name}],
         n_results=20,
     )
     
     # Get recent filings
     collection = get_collection()
-    filings_result = collection.get(
+    filings_result = await run_in_pool(
+        "search",
+        collection.get,
         where={"company": company_name},
         include=["metadatas"],
         limit=100,
@@ -282,7 +280,7 @@ async def search_analysis(
     """
     Custom search across documents.
     """
-    results = search_documents(
+    results = await asearch_documents(
         query=query,
         company_filter=company,
         filing_type_filter=filing_type,
@@ -10,8 +10,8 @@ from fastapi import APIRouter, Request
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
-from backend.rag.retriever import search_documents, search_cross_company
-from backend.rag.generator import generate_response_streaming, SYSTEM_PROMPT
+from backend.rag.retriever import asearch_reranked
+from backend.rag.generator import agenerate_response, agenerate_response_streaming, SYSTEM_PROMPT
 from backend.rag.memory import (
     add_message,
     get_conversation_history,
@@ -21,7 +21,7 @@ from backend.rag.memory import (
     cleanup_expired_sessions,
 )
 from backend.rag.web_search import search_web, format_web_results_for_context
-from backend.core.config import COMPANIES, COMPANY_NAME_TO_TICKER
+from backend.core.config import COMPANIES, COMPANY_NAME_TO_TICKER, RERANK_TOP_K_COMPARISON
 
 router = APIRouter()
 
@@ -105,6 +105,8 @@ def _build_context(docs: list[dict]) -> str:
         header = f"[{doc['company']} | {doc['filing_type']} | {doc['fiscal_year']}"
         if doc.get("quarter"):
             header += f" {doc['quarter']}"
+        if doc.get("section"):
+            header += f" | {doc['section']}"
         header += f" | sim={doc['similarity']:.2f}]"
         parts.append(f"{header}\n{doc['content']}")
     return "\n\n---\n\n".join(parts)
@@ -159,12 +161,13 @@ async def _stream_response(request: ChatRequest):
         except ImportError:
             pass
 
+    # With the cross-encoder re-ranker on, only the best 6-8 chunks reach the LLM
     if companies and len(companies) == 1:
-        docs = search_documents(query, company_filter=companies[0], n_results=15)
+        docs = await asearch_reranked(query, company_filter=companies[0], n_results=15)
     elif is_comparison:
-        docs = search_cross_company(query, n_results=30)
+        docs = await asearch_reranked(query, n_results=30, top_k=RERANK_TOP_K_COMPARISON)
     else:
-        docs = search_documents(query, n_results=15)
+        docs = await asearch_reranked(query, n_results=15)
 
     yield _sse_event("step", {
         "icon": "📚",
@@ -209,7 +212,7 @@ async def _stream_response(request: ChatRequest):
 
     # Stream tokens
     full_response = ""
-    for chunk in generate_response_streaming(query, context, web_context):
+    async for chunk in agenerate_response_streaming(query, context, web_context):
         full_response += chunk
         yield _sse_event("token", {"text": chunk})
 
@@ -236,17 +239,15 @@ async def chat_stream(request: ChatRequest):
 @router.post("/chat")
 async def chat(request: ChatRequest):
     """Non-streaming chat endpoint (returns full response)."""
-    from backend.rag.generator import generate_response
-
     session_id = request.session_id or str(uuid.uuid4())
     query = request.query.strip()
 
     companies = _detect_companies(query)
 
     if companies and len(companies) == 1:
-        docs = search_documents(query, company_filter=companies[0], n_results=15)
+        docs = await asearch_reranked(query, company_filter=companies[0], n_results=15)
     else:
-        docs = search_documents(query, n_results=15)
+        docs = await asearch_reranked(query, n_results=15)
 
     context = _build_context(docs)
 
@@ -260,7 +261,7 @@ async def chat(request: ChatRequest):
             pass
 
     add_message(session_id, "user", query)
-    response_text = generate_response(query, context, web_context)
+    response_text = await agenerate_response(query, context, web_context)
     add_message(session_id, "assistant", response_text)
 
     return {
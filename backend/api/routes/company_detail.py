@@ -7,12 +7,17 @@ from typing import Optional
 
 from backend.core.config import COMPANIES, COMPANY_NAME_TO_TICKER
 from backend.core.database import get_collection_stats
-from backend.rag.retriever import search_documents, get_company_documents
-from backend.analytics.sentiment import analyze_company_sentiment
-from backend.analytics.trends import analyze_company_trends
-from backend.analytics.classifier import classify_company_investments
-from backend.analytics.geographic import get_company_facilities, get_regional_distribution
-from backend.analytics.anomaly import detect_capex_anomalies, detect_ai_investment_changes
+from backend.core.executor import run_in_pool
+from backend.rag.retriever import asearch_documents, aget_company_documents
+from backend.analytics.async_api import (
+    aanalyze_company_sentiment,
+    aanalyze_company_trends,
+    aclassify_company_investments,
+    aget_company_facilities,
+    adetect_capex_anomalies,
+    adetect_ai_investment_changes,
+)
+from backend.analytics.geographic import get_regional_distribution
 from backend.analytics.table_extractor import extract_company_financials, extract_capex_breakdown
 
 router = APIRouter()
@@ -56,14 +61,14 @@ async def get_company_overview(company: str):
             raise HTTPException(status_code=404, detail=f"Company {company} not found")
         
         # Get document stats
-        stats = get_collection_stats()
+        stats = await run_in_pool("search", get_collection_stats)
         doc_count = stats["companies"].get(company_title, 0)
         
         # Get all analytics in parallel conceptually (we're in async context)
-        sentiment = analyze_company_sentiment(company_title)
-        trends = analyze_company_trends(company_title)
-        classification = classify_company_investments(company_title)
-        facilities = get_company_facilities(company_title)
+        sentiment = await aanalyze_company_sentiment(company_title)
+        trends = await aanalyze_company_trends(company_title)
+        classification = await aclassify_company_investments(company_title)
+        facilities = await aget_company_facilities(company_title)
         
         return {
             "company": company_title,
@@ -104,7 +109,7 @@ async def get_company_filings(company: str, filing_type: Optional[str] = None, l
     try:
         company_title = company.title()
         
-        docs = get_company_documents(company_title, limit=limit * 5)  # Get more to filter
+        docs = await aget_company_documents(company_title, limit=limit * 5)  # Get more to filter
         
         # Group by source
         filings = {}
@@ -150,8 +155,8 @@ async def get_company_financial_data(company: str):
     try:
         company_title = company.title()
         
-        financials = extract_company_financials(company_title)
-        capex_breakdown = extract_capex_breakdown(company_title)
+        financials = await run_in_pool("search", extract_company_financials, company_title)
+        capex_breakdown = await run_in_pool("search", extract_capex_breakdown, company_title)
         
         return {
             "company": company_title,
@@ -171,11 +176,11 @@ async def get_company_ai_analysis(company: str):
     try:
         company_title = company.title()
         
-        classification = classify_company_investments(company_title, n_docs=100)
-        ai_changes = detect_ai_investment_changes(company_title)
+        classification = await aclassify_company_investments(company_title, n_docs=100)
+        ai_changes = await adetect_ai_investment_changes(company_title)
         
         # Search for AI-specific content
-        ai_docs = search_documents(
+        ai_docs = await asearch_documents(
             query=f"{company_title} AI artificial intelligence data center GPU machine learning hyperscale",
             company_filter=company_title,
             n_results=20,
@@ -210,11 +215,11 @@ async def get_company_capex_analysis(company: str):
     try:
         company_title = company.title()
         
-        anomalies = detect_capex_anomalies(company_title)
-        capex_breakdown = extract_capex_breakdown(company_title)
+        anomalies = await adetect_capex_anomalies(company_title)
+        capex_breakdown = await run_in_pool("search", extract_capex_breakdown, company_title)
         
         # Search for CapEx content
-        capex_docs = search_documents(
+        capex_docs = await asearch_documents(
             query=f"{company_title} capital expenditure CapEx investment property plant equipment",
             company_filter=company_title,
             n_results=20,
@@ -249,8 +254,8 @@ async def get_company_geographic_data(company: str):
     try:
         company_title = company.title()
         
-        facilities = get_company_facilities(company_title)
-        distribution = get_regional_distribution(company_title)
+        facilities = await aget_company_facilities(company_title)
+        distribution = await run_in_pool("search", get_regional_distribution, company_title)
         
         if "error" in facilities:
             raise HTTPException(status_code=404, detail=facilities["error"])
@@ -279,7 +284,7 @@ async def get_company_news(company: str, limit: int = 10):
         company_title = company.title()
         
         # Search for press releases and news
-        docs = search_documents(
+        docs = await asearch_documents(
             query=f"{company_title} announces reported quarterly results",
             company_filter=company_title,
             n_results=limit * 2,
@@ -2,20 +2,30 @@
 Optimized dashboard API endpoint.
 Provides pre-aggregated data for fast dashboard loading.
 """
+import asyncio
 from fastapi import APIRouter
 from datetime import datetime
 
 from backend.core.config import COMPANIES
-from backend.core.cache import api_cache, cached
+from backend.core.cache import api_cache, analytics_cache, search_cache, chat_cache, async_cached
 from backend.core.database import get_collection_stats
-from backend.analytics.sentiment import analyze_company_sentiment
-from backend.analytics.classifier import classify_company_investments, compare_investment_focus
-from backend.analytics.trends import analyze_company_trends, compare_company_trends
-from backend.analytics.geographic import get_company_facilities
-from backend.analytics.anomaly import get_all_anomalies
+from backend.core.executor import run_in_pool
+from backend.analytics.async_api import (
+    aanalyze_company_sentiment,
+    aclassify_company_investments,
+    acompare_investment_focus,
+    aanalyze_company_trends,
+    acompare_company_trends,
+    aget_company_facilities,
+    aget_all_anomalies,
+    aprefetch_company_analytics,
+)
 
 router = APIRouter()
 
+# Dashboards may be served this long past their TTL while one refresh runs
+DASHBOARD_STALE_TTL = 1800
+
 
 @router.get("/dashboard/quick")
 async def get_quick_dashboard():
@@ -23,14 +33,15 @@ async def get_quick_dashboard():
     Fast dashboard endpoint with minimal data.
     Use for initial page load.
     """
-    cache_key = "dashboard_quick"
-    cached_data = api_cache.get(cache_key)
-    if cached_data:
-        return cached_data
-    
+    return await _build_quick_dashboard()
+
+
+@async_cached(api_cache, prefix="dashboard_quick", stale_ttl=DASHBOARD_STALE_TTL)
+async def _build_quick_dashboard() -> dict:
+    """Build the quick dashboard payload (cached in api_cache)."""
     # Get basic stats only
     try:
-        stats = get_collection_stats()
+        stats = await run_in_pool("search", get_collection_stats)
     except:
         stats = {"total_documents": 0, "companies": {}}
     
@@ -49,7 +60,6 @@ async def get_quick_dashboard():
         "generated_at": datetime.now().isoformat(),
     }
     
-    api_cache.set(cache_key, data)
     return data
 
 
@@ -58,58 +68,45 @@ async def get_full_dashboard():
     """
     Full dashboard data with analytics.
     Use for complete dashboard view.
-    """
-    cache_key = "dashboard_full"
-    cached_data = api_cache.get(cache_key)
-    if cached_data:
-        return cached_data
     
+    Concurrent cold requests share one computation, and an expired dashboard
+    is served immediately while a single background refresh rebuilds it.
+    """
+    return await _build_full_dashboard()
+
+
+@async_cached(api_cache, prefix="dashboard_full", stale_ttl=DASHBOARD_STALE_TTL)
+async def _build_full_dashboard() -> dict:
+    """Build the full dashboard payload (cached in api_cache)."""
     # Get all analytics data
     try:
-        stats = get_collection_stats()
+        stats = await run_in_pool("search", get_collection_stats)
     except:
         stats = {"total_documents": 0, "companies": {}}
     
-    # Build company summaries
-    company_summaries = []
-    for ticker, config in COMPANIES.items():
-        company_name = config["name"].split()[0]
-        
-        try:
-            sentiment = analyze_company_sentiment(company_name)
-            classification = classify_company_investments(company_name)
-            trends = analyze_company_trends(company_name)
-            facilities = get_company_facilities(company_name)
-            
-            company_summaries.append({
-                "name": company_name,
-                "ticker": ticker,
-                "sentiment_score": sentiment.get("sentiment_score", 0),
-                "sentiment_label": sentiment.get("overall_sentiment", "neutral"),
-                "ai_focus": classification.get("overall_ai_focus_percentage", 0),
-                "investment_focus": classification.get("investment_focus", "balanced"),
-                "trend_outlook": trends.get("overall_outlook", "neutral"),
-                "facility_count": facilities.get("total_facilities", 0),
-                "headquarters": facilities.get("headquarters", {}).get("city", "N/A"),
-            })
-        except Exception as e:
-            company_summaries.append({
-                "name": company_name,
-                "ticker": ticker,
-                "error": str(e),
-            })
+    # One batched retrieval for every per-company analytics search below
+    await aprefetch_company_analytics(
+        [config["name"].split()[0] for config in COMPANIES.values()],
+        include_anomalies=True,
+    )
+    
+    # Build company summaries (companies run concurrently on the search pool)
+    company_summaries = list(await asyncio.gather(*(
+        _company_summary(ticker, config["name"].split()[0])
+        for ticker, config in COMPANIES.items()
+    )))
     
     # Get comparison data
     try:
-        investment_comparison = compare_investment_focus()
-        trends_comparison = compare_company_trends()
+        investment_comparison = await acompare_investment_focus()
+        trends_comparison = await acompare_company_trends()
     except:
         investment_comparison = {}
         trends_comparison = {}
     
     # Get anomalies summary
     try:
-        anomalies = get_all_anomalies()
+        anomalies = await aget_all_anomalies()
         total_anomalies = sum(
             len(a) for company_data in anomalies.values() 
             for a in company_data.values() if isinstance(a, list)
@@ -137,56 +134,45 @@ async def get_full_dashboard():
         "generated_at": datetime.now().isoformat(),
     }
     
-    api_cache.set(cache_key, data)
     return data
 
 
+async def _company_summary(ticker: str, company_name: str) -> dict:
+    """One company's row of the full dashboard."""
+    try:
+        sentiment = await aanalyze_company_sentiment(company_name)
+        classification = await aclassify_company_investments(company_name)
+        trends = await aanalyze_company_trends(company_name)
+        facilities = await aget_company_facilities(company_name)
+        
+        return {
+            "name": company_name,
+            "ticker": ticker,
+            "sentiment_score": sentiment.get("sentiment_score", 0),
+            "sentiment_label": sentiment.get("overall_sentiment", "neutral"),
+            "ai_focus": classification.get("overall_ai_focus_percentage", 0),
+            "investment_focus": classification.get("investment_focus", "balanced"),
+            "trend_outlook": trends.get("overall_outlook", "neutral"),
+            "facility_count": facilities.get("total_facilities", 0),
+            "headquarters": facilities.get("headquarters", {}).get("city", "N/A"),
+        }
+    except Exception as e:
+        return {
+            "name": company_name,
+            "ticker": ticker,
+            "error": str(e),
+        }
+
+
 @router.get("/dashboard/company/{company}")
 async def get_company_dashboard(company: str):
     """
     Single company dashboard data.
     """
-    cache_key = f"dashboard_company_{company.lower()}"
-    cached_data = api_cache.get(cache_key)
-    if cached_data:
-        return cached_data
-    
     company_title = company.title()
     
     try:
-        sentiment = analyze_company_sentiment(company_title)
-        classification = classify_company_investments(company_title)
-        trends = analyze_company_trends(company_title)
-        facilities = get_company_facilities(company_title)
-        
-        data = {
-            "company": company_title,
-            "sentiment": {
-                "score": sentiment.get("sentiment_score", 0),
-                "label": sentiment.get("overall_sentiment", "neutral"),
-                "positive_count": sentiment.get("positive_count", 0),
-                "negative_count": sentiment.get("negative_count", 0),
-            },
-            "investment": {
-                "ai_focus": classification.get("overall_ai_focus_percentage", 0),
-                "focus_label": classification.get("investment_focus", "balanced"),
-                "total_documents": classification.get("total_documents", 0),
-            },
-            "trends": {
-                "outlook": trends.get("overall_outlook", "neutral"),
-                "capex_direction": trends.get("capex_trend", {}).get("direction", "stable"),
-                "ai_focus_direction": trends.get("ai_focus_trend", {}).get("direction", "stable"),
-            },
-            "geographic": {
-                "facility_count": facilities.get("total_facilities", 0),
-                "headquarters": facilities.get("headquarters", {}),
-            },
-            "generated_at": datetime.now().isoformat(),
-        }
-        
-        api_cache.set(cache_key, data)
-        return data
-        
+        return await _build_company_dashboard(company.lower())
     except Exception as e:
         return {
             "company": company_title,
@@ -194,6 +180,56 @@ async def get_company_dashboard(company: str):
         }
 
 
+@async_cached(api_cache, prefix="dashboard_company", stale_ttl=DASHBOARD_STALE_TTL)
+async def _build_company_dashboard(company: str) -> dict:
+    """Build one company's dashboard payload (cached in api_cache)."""
+    company_title = company.title()
+    
+    await aprefetch_company_analytics([company_title])
+    sentiment = await aanalyze_company_sentiment(company_title)
+    classification = await aclassify_company_investments(company_title)
+    trends = await aanalyze_company_trends(company_title)
+    facilities = await aget_company_facilities(company_title)
+    
+    data = {
+        "company": company_title,
+        "sentiment": {
+            "score": sentiment.get("sentiment_score", 0),
+            "label": sentiment.get("overall_sentiment", "neutral"),
+            "positive_count": sentiment.get("positive_count", 0),
+            "negative_count": sentiment.get("negative_count", 0),
+        },
+        "investment": {
+            "ai_focus": classification.get("overall_ai_focus_percentage", 0),
+            "focus_label": classification.get("investment_focus", "balanced"),
+            "total_documents": classification.get("total_documents", 0),
+        },
+        "trends": {
+            "outlook": trends.get("overall_outlook", "neutral"),
+            "capex_direction": trends.get("capex_trend", {}).get("direction", "stable"),
+            "ai_focus_direction": trends.get("ai_focus_trend", {}).get("direction", "stable"),
+        },
+        "geographic": {
+            "facility_count": facilities.get("total_facilities", 0),
+            "headquarters": facilities.get("headquarters", {}),
+        },
+        "generated_at": datetime.now().isoformat(),
+    }
+    
+    return data
+
+
+@router.get("/dashboard/cache")
+async def get_cache_stats():
+    """Hit/miss, eviction and memory statistics for the in-memory caches."""
+    return {
+        "api": api_cache.stats(),
+        "analytics": analytics_cache.stats(),
+        "search": search_cache.stats(),
+        "chat": chat_cache.stats(),
+    }
+
+
 @router.delete("/dashboard/cache")
 async def clear_dashboard_cache():
     """Clear dashboard cache to force refresh."""
@@ -209,36 +245,38 @@ async def warmup_cache():
     """
     warmed = []
     
+    await aprefetch_company_analytics([config["name"].split()[0] for config in COMPANIES.values()])
+    
     # Warm up company data
     for ticker, config in COMPANIES.items():
         company_name = config["name"].split()[0]
         try:
-            analyze_company_sentiment(company_name)
+            await aanalyze_company_sentiment(company_name)
             warmed.append(f"sentiment:{company_name}")
         except:
             pass
         
         try:
-            classify_company_investments(company_name)
+            await aclassify_company_investments(company_name)
             warmed.append(f"classification:{company_name}")
         except:
             pass
         
         try:
-            analyze_company_trends(company_name)
+            await aanalyze_company_trends(company_name)
             warmed.append(f"trends:{company_name}")
         except:
             pass
     
     # Warm up comparison data
     try:
-        compare_investment_focus()
+        await acompare_investment_focus()
         warmed.append("investment_comparison")
     except:
         pass
     
     try:
-        compare_company_trends()
+        await acompare_company_trends()
         warmed.append("trends_comparison")
     except:
         pass
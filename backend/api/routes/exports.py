@@ -1,25 +1,29 @@
 """
 API routes for report exports.
+The export modules (openpyxl, python-pptx, WeasyPrint) are imported on first
+use, not at application startup.
 """
+from functools import lru_cache
+
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import Response
 
-from backend.exports.excel import generate_excel_report, generate_comparison_excel
-from backend.exports.powerpoint import generate_powerpoint_report
+router = APIRouter()
 
-try:
-    from backend.exports.pdf import generate_pdf_report, generate_html_preview
-    HAS_PDF = True
-except (ImportError, OSError):
-    generate_pdf_report = None
-    generate_html_preview = None
-    HAS_PDF = False
 
-router = APIRouter()
+@lru_cache(maxsize=1)
+def _pdf_exports() -> tuple:
+    """(generate_pdf_report, generate_html_preview), or (None, None) without WeasyPrint."""
+    try:
+        from backend.exports.pdf import generate_pdf_report, generate_html_preview
+        return generate_pdf_report, generate_html_preview
+    except (ImportError, OSError):
+        return None, None
 
 
 @router.get("/exports/excel/{company}")
 async def export_company_excel(company: str):
+    from backend.exports.excel import generate_excel_report
     try:
         excel_bytes = generate_excel_report(company)
         return Response(content=excel_bytes, media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
@@ -30,6 +34,7 @@ async def export_company_excel(company: str):
 
 @router.get("/exports/excel/comparison/all")
 async def export_comparison_excel():
+    from backend.exports.excel import generate_comparison_excel
     try:
         excel_bytes = generate_comparison_excel()
         return Response(content=excel_bytes, media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
@@ -40,6 +45,7 @@ async def export_comparison_excel():
 
 @router.get("/exports/powerpoint/{company}")
 async def export_company_powerpoint(company: str):
+    from backend.exports.powerpoint import generate_powerpoint_report
     try:
         pptx_bytes = generate_powerpoint_report(company)
         return Response(content=pptx_bytes, media_type="application/vnd.openxmlformats-officedocument.presentationml.presentation",
@@ -50,6 +56,7 @@ async def export_company_powerpoint(company: str):
 
 @router.get("/exports/pdf/{company}")
 async def export_company_pdf(company: str):
+    generate_pdf_report, _ = _pdf_exports()
     if not generate_pdf_report:
         raise HTTPException(status_code=501, detail="PDF export unavailable: WeasyPrint not installed")
     try:
@@ -62,6 +69,7 @@ async def export_company_pdf(company: str):
 
 @router.get("/exports/preview/{company}")
 async def preview_company_report(company: str):
+    _, generate_html_preview = _pdf_exports()
     if not generate_html_preview:
         raise HTTPException(status_code=501, detail="Preview unavailable")
     try:
@@ -75,6 +83,6 @@ async def get_available_formats():
     return {"formats": [
         {"id": "excel", "name": "Excel", "extension": ".xlsx", "available": True},
         {"id": "powerpoint", "name": "PowerPoint", "extension": ".pptx", "available": True},
-        {"id": "pdf", "name": "PDF", "extension": ".pdf", "available": HAS_PDF},
+        {"id": "pdf", "name": "PDF", "extension": ".pdf", "available": _pdf_exports()[0] is not None},
         {"id": "html", "name": "HTML Preview", "extension": ".html", "available": True},
     ]}
@@ -1,18 +1,18 @@
 """
 API routes for data ingestion management.
 """
-from fastapi import APIRouter, BackgroundTasks, HTTPException
+from fastapi import APIRouter, HTTPException
 from typing import Optional
 from pydantic import BaseModel
 
-from backend.ingestion.sec_downloader import SECDownloader
+from backend.ingestion.sec_downloader import SECDownloader, edgar_stats
 from backend.ingestion.scheduler import (
     start_scheduler,
     stop_scheduler,
     get_scheduler_status,
     run_manual_check,
 )
-from backend.ingestion.processor import process_new_filings
+from backend.ingestion.jobs import get_ingest_queue
 
 router = APIRouter()
 
@@ -25,7 +25,7 @@ class FilingCheckRequest(BaseModel):
 
 @router.get("/ingestion/status")
 async def get_ingestion_status():
-    """Get current ingestion scheduler status."""
+    """Get current ingestion scheduler status, ingest job progress and download stats."""
     scheduler_status = get_scheduler_status()
     
     downloader = SECDownloader()
@@ -33,10 +33,40 @@ async def get_ingestion_status():
     
     return {
         "scheduler": scheduler_status,
+        "ingest": get_ingest_queue().stats(),
         "downloads": download_stats,
+        "edgar": edgar_stats(),
     }
 
 
+@router.get("/ingestion/jobs")
+async def list_ingest_jobs(limit: int = 20):
+    """List recent ingest jobs (newest first)."""
+    return {"jobs": [job.to_dict(files=False) for job in get_ingest_queue().jobs()[:limit]]}
+
+
+@router.get("/ingestion/jobs/{job_id}")
+async def get_ingest_job(job_id: str):
+    """Get an ingest job with per-file progress."""
+    job = get_ingest_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job.to_dict()
+
+
+@router.post("/ingestion/jobs/{job_id}/retry")
+async def retry_ingest_job(job_id: str):
+    """Queue a new job for the files that failed in a finished job."""
+    queue = get_ingest_queue()
+    job = queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    retry = queue.retry_failed(job_id)
+    if retry is None:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is still running or has no failed files")
+    return {"status": "queued", "job": retry.to_dict()}
+
+
 @router.post("/ingestion/start-scheduler")
 async def api_start_scheduler():
     """Start the automated ingestion scheduler."""
@@ -61,30 +91,21 @@ async def api_stop_scheduler():
 
 
 @router.post("/ingestion/check-filings")
-async def check_filings(
-    background_tasks: BackgroundTasks,
-    request: FilingCheckRequest,
-):
+async def check_filings(request: FilingCheckRequest):
     """
     Manually trigger a check for new SEC filings.
-    Returns immediately and processes in background.
+    Returns immediately; an ingest job downloads and processes them.
     """
-    async def check_and_process():
-        downloader = SECDownloader()
-        new_filings = await downloader.check_and_download_new_filings(
-            filing_types=request.filing_types,
-            days_back=request.days_back,
-        )
-        
-        if new_filings:
-            await process_new_filings(new_filings)
-    
-    background_tasks.add_task(check_and_process)
+    job = get_ingest_queue().submit(
+        check={"filing_types": request.filing_types, "days_back": request.days_back},
+        source="api",
+    )
     
     return {
         "status": "checking",
         "message": f"Checking for filings from last {request.days_back} days",
         "filing_types": request.filing_types,
+        "job_id": job.id,
     }
 
 
@@ -102,13 +123,8 @@ async def get_available_filings(
         filings = await downloader.get_company_filings(ticker.upper(), days_back=days_back)
         return {"ticker": ticker, "filings": filings}
     
-    # Get for all companies
-    all_filings = {}
-    from backend.core.config import COMPANIES
-    
-    for company_ticker in COMPANIES.keys():
-        filings = await downloader.get_company_filings(company_ticker, days_back=days_back)
-        all_filings[company_ticker] = filings
+    # Get for all companies (fetched concurrently)
+    all_filings = await downloader.get_all_company_filings(days_back=days_back)
     
     return {"filings": all_filings}
 
@@ -118,7 +134,6 @@ async def download_specific_filing(
     ticker: str,
     form: str,
     filing_date: str,
-    background_tasks: BackgroundTasks,
 ):
     """
     Download a specific filing.
@@ -146,16 +161,11 @@ async def download_specific_filing(
             "filing": target,
         }
     
-    # Download in background
-    async def download_and_process():
-        path = await downloader.download_filing(target)
-        if path:
-            target["local_path"] = str(path)
-            await process_new_filings([target])
-    
-    background_tasks.add_task(download_and_process)
+    # Download and process as an ingest job
+    job = get_ingest_queue().submit([target], source="api")
     
     return {
         "status": "downloading",
         "filing": target,
+        "job_id": job.id,
     }
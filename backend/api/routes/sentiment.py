@@ -5,13 +5,10 @@ from fastapi import APIRouter, HTTPException, BackgroundTasks
 from typing import Optional
 from pydantic import BaseModel
 
-from backend.analytics.sentiment import (
-    analyze_company_sentiment,
-    compare_company_sentiments,
-    detect_sentiment_changes,
-    analyze_sentiment_llm,
-)
-from backend.rag.retriever import search_documents
+from backend.analytics.sentiment import detect_sentiment_changes, analyze_sentiment_llm
+from backend.analytics.async_api import aanalyze_company_sentiment, acompare_company_sentiments
+from backend.core.executor import run_in_pool
+from backend.rag.retriever import asearch_documents_batch
 
 router = APIRouter()
 
@@ -35,7 +32,7 @@ async def get_company_sentiment(
         company: Company name (Flex, Jabil, etc.)
         n_chunks: Number of document chunks to analyze
     """
-    result = analyze_company_sentiment(company, n_chunks)
+    result = await aanalyze_company_sentiment(company, n_chunks)
     
     if "error" in result:
         raise HTTPException(status_code=404, detail=result["error"])
@@ -58,7 +55,7 @@ async def compare_sentiments(
     else:
         company_list = None
     
-    results = compare_company_sentiments(company_list)
+    results = await acompare_company_sentiments(company_list)
     
     return {
         "comparison": results,
@@ -73,7 +70,7 @@ async def get_sentiment_trend(company: str):
     Get sentiment trend analysis for a company.
     Shows changes between recent and older documents.
     """
-    result = detect_sentiment_changes(company)
+    result = await run_in_pool("search", detect_sentiment_changes, company)
     
     if "error" in result:
         raise HTTPException(status_code=404, detail=result["error"])
@@ -111,15 +108,16 @@ async def get_ai_focus_by_company():
     """
     companies = ["Flex", "Jabil", "Celestica", "Benchmark", "Sanmina"]
     
+    # Search for AI-related content for every company in one batch
+    query = "AI artificial intelligence machine learning GPU neural network data center"
+    batched = await asearch_documents_batch(
+        [query] * len(companies),
+        [{"company_filter": company} for company in companies],
+        n_results=50,
+    )
+    
     results = []
-    for company in companies:
-        # Search for AI-related content
-        ai_docs = search_documents(
-            query="AI artificial intelligence machine learning GPU neural network data center",
-            company_filter=company,
-            n_results=50,
-        )
-        
+    for company, ai_docs in zip(companies, batched):
         # Count actual AI mentions
         ai_keywords = ["ai", "artificial intelligence", "machine learning", "gpu", "neural", 
                        "deep learning", "data center", "hyperscale", "inference"]
@@ -166,8 +164,8 @@ async def get_sentiment_dashboard():
     max_ai = 0
     
     for company in companies:
-        sentiment = analyze_company_sentiment(company)
-        trend = detect_sentiment_changes(company)
+        sentiment = await aanalyze_company_sentiment(company)
+        trend = await run_in_pool("search", detect_sentiment_changes, company)
         
         company_data = {
             "company": company,
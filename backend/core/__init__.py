@@ -1,3 +1,5 @@
 """Core module for configuration and database connections."""
 from .config import *
-from .database import get_collection, get_embedding_model, embed_text
+from .database import get_collection, get_embedding_model, embed_text, embed_queries
+from .executor import run_in_pool, run_blocking, executor_stats
+from .llm import get_anthropic_client, get_async_anthropic_client, create_message, acreate_message
@@ -2,64 +2,184 @@
 Simple in-memory cache for expensive computations.
 Reduces repeated API calls and analytics calculations.
 """
-from datetime import datetime
+import asyncio
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict
 from typing import Any, Optional
 from functools import wraps
 import hashlib
 import json
 
 
+# How often the background sweeper purges expired entries (seconds)
+SWEEP_INTERVAL = 60
+
+
+def _estimate_size(value: Any, _depth: int = 0) -> int:
+    """Rough deep size estimate in bytes (bounded recursion, no cycle tracking)."""
+    size = sys.getsizeof(value)
+    if _depth >= 4:
+        return size
+    if isinstance(value, dict):
+        size += sum(
+            _estimate_size(k, _depth + 1) + _estimate_size(v, _depth + 1)
+            for k, v in value.items()
+        )
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(_estimate_size(v, _depth + 1) for v in value)
+    return size
+
+
 class SimpleCache:
-    """Thread-safe in-memory cache with TTL support."""
+    """Thread-safe, size-bounded in-memory LRU cache with per-entry TTL."""
     
-    def __init__(self, default_ttl: int = 300):
-        self._cache: dict = {}
-        self._timestamps: dict = {}
+    def __init__(self, default_ttl: int = 300, max_entries: int = 1024):
+        # key -> (value, fresh_until, expires_at, size_bytes), ordered least ->
+        # most recently used. Between fresh_until and expires_at an entry is
+        # stale: get() misses, but lookup() can still serve it.
+        self._cache: "OrderedDict[str, tuple[Any, float, float, int]]" = OrderedDict()
+        self._lock = threading.RLock()
         self._default_ttl = default_ttl  # 5 minutes default
+        self._max_entries = max_entries
+        self._hits = 0
+        self._stale_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._bytes = 0
+        _register_for_sweep(self)
+    
+    def _remove(self, key: str) -> None:
+        """Drop an entry (caller holds the lock)."""
+        _, _, _, size = self._cache.pop(key)
+        self._bytes -= size
+    
+    def lookup(self, key: str) -> tuple[Optional[Any], str]:
+        """
+        Look up a key and report its state: "fresh", "stale" or "miss".
+        
+        Stale entries only exist when they were set with a stale_ttl.
+        """
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                self._misses += 1
+                return None, "miss"
+            
+            value, fresh_until, expires_at, _ = entry
+            now = time.monotonic()
+            if now >= expires_at:
+                # Expired
+                self._remove(key)
+                self._expirations += 1
+                self._misses += 1
+                return None, "miss"
+            
+            self._cache.move_to_end(key)
+            if now >= fresh_until:
+                self._stale_hits += 1
+                return value, "stale"
+            self._hits += 1
+            return value, "fresh"
     
     def get(self, key: str) -> Optional[Any]:
         """Get cached value if not expired."""
-        if key not in self._cache:
-            return None
-        
-        timestamp = self._timestamps.get(key, 0)
-        if datetime.now().timestamp() - timestamp > self._default_ttl:
-            # Expired
-            del self._cache[key]
-            del self._timestamps[key]
-            return None
-        
-        return self._cache[key]
+        value, state = self.lookup(key)
+        return value if state == "fresh" else None
     
-    def set(self, key: str, value: Any, ttl: Optional[int] = None):
-        """Set cached value with optional custom TTL."""
-        self._cache[key] = value
-        self._timestamps[key] = datetime.now().timestamp()
+    def set(self, key: str, value: Any, ttl: Optional[int] = None, stale_ttl: int = 0):
+        """Set cached value with optional custom TTL and stale-serving window."""
+        ttl = self._default_ttl if ttl is None else ttl
+        size = _estimate_size(value)
+        now = time.monotonic()
+        with self._lock:
+            if key in self._cache:
+                self._remove(key)
+            self._cache[key] = (value, now + ttl, now + ttl + stale_ttl, size)
+            self._bytes += size
+            while len(self._cache) > self._max_entries:
+                oldest = next(iter(self._cache))
+                self._remove(oldest)
+                self._evictions += 1
     
     def delete(self, key: str):
         """Delete cached value."""
-        self._cache.pop(key, None)
-        self._timestamps.pop(key, None)
+        with self._lock:
+            if key in self._cache:
+                self._remove(key)
     
     def clear(self):
         """Clear all cached values."""
-        self._cache.clear()
-        self._timestamps.clear()
+        with self._lock:
+            self._cache.clear()
+            self._bytes = 0
+    
+    def sweep(self) -> int:
+        """Remove all expired entries. Returns the number removed."""
+        now = time.monotonic()
+        with self._lock:
+            expired = [k for k, (_, _, expires_at, _) in self._cache.items() if now >= expires_at]
+            for key in expired:
+                self._remove(key)
+            self._expirations += len(expired)
+        return len(expired)
     
     def stats(self) -> dict:
         """Get cache statistics."""
-        return {
-            "entries": len(self._cache),
-            "keys": list(self._cache.keys())[:10],
-        }
+        with self._lock:
+            lookups = self._hits + self._stale_hits + self._misses
+            return {
+                "entries": len(self._cache),
+                "max_entries": self._max_entries,
+                "default_ttl": self._default_ttl,
+                "hits": self._hits,
+                "stale_hits": self._stale_hits,
+                "misses": self._misses,
+                "hit_rate": round((self._hits + self._stale_hits) / lookups, 3) if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "memory_bytes_estimate": self._bytes,
+                "keys": list(self._cache.keys())[-10:],
+            }
+
+
+# ---------------------------------------------------------------------------
+# BACKGROUND SWEEPER
+# ---------------------------------------------------------------------------
+_sweep_targets: "weakref.WeakSet[SimpleCache]" = weakref.WeakSet()
+_sweeper_thread: Optional[threading.Thread] = None
+_sweeper_lock = threading.Lock()
+
+
+def _sweep_loop():
+    while True:
+        time.sleep(SWEEP_INTERVAL)
+        for cache in list(_sweep_targets):
+            try:
+                cache.sweep()
+            except Exception as e:
+                print(f"Cache sweep failed: {e}")
+
+
+def _register_for_sweep(cache: SimpleCache) -> None:
+    """Track a cache and make sure the daemon sweeper thread is running."""
+    global _sweeper_thread
+    _sweep_targets.add(cache)
+    with _sweeper_lock:
+        if _sweeper_thread is None or not _sweeper_thread.is_alive():
+            _sweeper_thread = threading.Thread(target=_sweep_loop, name="cache-sweeper", daemon=True)
+            _sweeper_thread.start()
 
 
 # Global cache instances with different TTLs
 # Analytics data changes infrequently, so longer TTL
-analytics_cache = SimpleCache(default_ttl=1800)  # 30 min for analytics (sentiment, trends, etc.)
-api_cache = SimpleCache(default_ttl=600)  # 10 min for API responses (dashboard)
-search_cache = SimpleCache(default_ttl=1800)  # 30 min for document searches
-chat_cache = SimpleCache(default_ttl=600)  # 10 min for chat responses
+analytics_cache = SimpleCache(default_ttl=1800, max_entries=512)  # 30 min for analytics (sentiment, trends, etc.)
+api_cache = SimpleCache(default_ttl=600, max_entries=256)  # 10 min for API responses (dashboard)
+search_cache = SimpleCache(default_ttl=1800, max_entries=2048)  # 30 min for document searches
+chat_cache = SimpleCache(default_ttl=600, max_entries=512)  # 10 min for chat responses
 
 
 def cache_key(*args, **kwargs) -> str:
@@ -68,33 +188,186 @@ def cache_key(*args, **kwargs) -> str:
     return hashlib.md5(key_data.encode()).hexdigest()
 
 
-def cached(cache: SimpleCache, prefix: str = ""):
-    """Decorator to cache function results."""
+# ---------------------------------------------------------------------------
+# SINGLE-FLIGHT
+# ---------------------------------------------------------------------------
+# Concurrent callers computing the same key wait on one in-flight computation
+# instead of each recomputing (dogpile protection).
+class _Flight:
+    """One in-progress synchronous computation shared by waiting threads."""
+    
+    def __init__(self):
+        self.event = threading.Event()
+        self.owner = threading.get_ident()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+_flights: dict[str, _Flight] = {}
+_flights_lock = threading.Lock()
+_async_flights: dict[tuple[int, str], "asyncio.Task"] = {}
+_background_tasks: set = set()
+
+
+def _single_flight(key: str, compute):
+    """Run compute() once per key across threads; other callers share its result."""
+    with _flights_lock:
+        flight = _flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _Flight()
+            _flights[key] = flight
+        elif flight.owner == threading.get_ident():
+            # Re-entrant call from the computing thread: don't wait on ourselves
+            leader = None
+    
+    if leader is None:
+        return compute()
+    
+    if not leader:
+        flight.event.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+    
+    try:
+        flight.result = compute()
+        return flight.result
+    except BaseException as e:
+        flight.error = e
+        raise
+    finally:
+        with _flights_lock:
+            _flights.pop(key, None)
+        flight.event.set()
+
+
+async def _async_single_flight(key: str, compute):
+    """
+    Await compute() once per key on this event loop; other callers share its
+    result. The computation runs as its own task, so a caller that is
+    cancelled (e.g. its client disconnected) only stops waiting: the other
+    waiters still get the result.
+    """
+    loop = asyncio.get_running_loop()
+    flight_key = (id(loop), key)
+    task = _async_flights.get(flight_key)
+    if task is None:
+        task = loop.create_task(compute())
+        _async_flights[flight_key] = task
+        _background_tasks.add(task)
+        task.add_done_callback(lambda done: _end_async_flight(flight_key, done))
+    return await asyncio.shield(task)
+
+
+def _end_async_flight(flight_key: tuple[int, str], task: "asyncio.Task") -> None:
+    _background_tasks.discard(task)
+    if _async_flights.get(flight_key) is task:
+        del _async_flights[flight_key]
+    if not task.cancelled():
+        # Mark retrieved so a failure nobody is waiting for doesn't log a warning
+        task.exception()
+
+
+def _refresh_in_background(key: str, compute) -> None:
+    """Start one background thread to recompute a stale key (if none is running)."""
+    with _flights_lock:
+        if key in _flights:
+            return
+    
+    def run():
+        try:
+            _single_flight(key, compute)
+        except Exception as e:
+            print(f"Background cache refresh failed for {key}: {e}")
+    
+    threading.Thread(target=run, name="cache-refresh", daemon=True).start()
+
+
+def _async_refresh_in_background(key: str, compute) -> None:
+    """Schedule one task on the running loop to recompute a stale key."""
+    loop = asyncio.get_running_loop()
+    if (id(loop), key) in _async_flights:
+        return
+    
+    async def run():
+        try:
+            await _async_single_flight(key, compute)
+        except Exception as e:
+            print(f"Background cache refresh failed for {key}: {e}")
+    
+    task = loop.create_task(run())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+def cached(
+    cache: SimpleCache,
+    prefix: str = "",
+    ttl: Optional[int] = None,
+    stale_ttl: int = 0,
+    single_flight: bool = True,
+):
+    """
+    Decorator to cache function results.
+    
+    Concurrent misses for the same arguments share one computation. With
+    stale_ttl > 0, an expired result is returned immediately for up to
+    stale_ttl more seconds while a single background refresh runs.
+    """
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
             key = f"{prefix}:{cache_key(*args, **kwargs)}"
-            result = cache.get(key)
-            if result is not None:
+            result, state = cache.lookup(key)
+            if state == "fresh" and result is not None:
                 return result
-            result = func(*args, **kwargs)
-            cache.set(key, result)
-            return result
+            
+            def compute():
+                value = func(*args, **kwargs)
+                if value is not None:
+                    cache.set(key, value, ttl=ttl, stale_ttl=stale_ttl)
+                return value
+            
+            flight_key = f"{id(cache)}:{key}"
+            if state == "stale" and result is not None:
+                _refresh_in_background(flight_key, compute)
+                return result
+            if not single_flight:
+                return compute()
+            return _single_flight(flight_key, compute)
         return wrapper
     return decorator
 
 
-def async_cached(cache: SimpleCache, prefix: str = ""):
-    """Decorator to cache async function results."""
+def async_cached(
+    cache: SimpleCache,
+    prefix: str = "",
+    ttl: Optional[int] = None,
+    stale_ttl: int = 0,
+    single_flight: bool = True,
+):
+    """Decorator to cache async function results (same options as cached)."""
     def decorator(func):
         @wraps(func)
         async def wrapper(*args, **kwargs):
             key = f"{prefix}:{cache_key(*args, **kwargs)}"
-            result = cache.get(key)
-            if result is not None:
+            result, state = cache.lookup(key)
+            if state == "fresh" and result is not None:
+                return result
+            
+            async def compute():
+                value = await func(*args, **kwargs)
+                if value is not None:
+                    cache.set(key, value, ttl=ttl, stale_ttl=stale_ttl)
+                return value
+            
+            flight_key = f"{id(cache)}:{key}"
+            if state == "stale" and result is not None:
+                _async_refresh_in_background(flight_key, compute)
                 return result
-            result = await func(*args, **kwargs)
-            cache.set(key, result)
-            return result
+            if not single_flight:
+                return await compute()
+            return await _async_single_flight(flight_key, compute)
         return wrapper
     return decorator
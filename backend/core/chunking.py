@@ -0,0 +1,248 @@
+"""
+Streaming chunkers.
+The word-window chunker produces the same overlapping chunks as splitting the
+whole document into a word list and joining slices, but walks the text (or a
+stream of page texts) word by word, so only one window of words is held at a
+time. The structure-aware chunker additionally follows section headings and
+keeps Markdown tables whole (see iter_structured_chunks).
+"""
+import re
+from collections import deque
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional, Union
+
+
+CHUNK_WORDS = 250
+OVERLAP_WORDS = 50
+MIN_CHUNK_CHARS = 50        # shorter chunks (tiny trailing windows) are dropped
+
+_WORD = re.compile(r"\S+")
+
+
+def iter_words(source: Union[str, Iterable[str]]) -> Iterator[str]:
+    """Whitespace-separated words of a text or of consecutive text pieces (e.g. pages)."""
+    pieces = (source,) if isinstance(source, str) else source
+    for piece in pieces:
+        for match in _WORD.finditer(piece):
+            yield match.group()
+
+
+def iter_chunks(
+    source: Union[str, Iterable[str]],
+    chunk_words: int = CHUNK_WORDS,
+    overlap_words: int = OVERLAP_WORDS,
+    overlap_tail: bool = True,
+) -> Iterator[str]:
+    """
+    Yield overlapping word-window chunks.
+
+    Windows start every chunk_words - overlap_words words and hold up to
+    chunk_words words, as with `words[i:i + chunk_words]` for
+    i in range(0, len(words), step); chunks of MIN_CHUNK_CHARS or fewer
+    characters are skipped.
+
+    Args:
+        source: Document text, or an iterable of text pieces separated by whitespace
+        chunk_words: Words per chunk
+        overlap_words: Words shared by consecutive chunks
+        overlap_tail: Also yield a trailing window made only of words the
+            previous chunk already contains (the classic slicing behaviour)
+    """
+    step = chunk_words - overlap_words
+    window: deque = deque()
+    emitted_full = False
+
+    def emit():
+        chunk = " ".join(window)
+        return chunk if len(chunk) > MIN_CHUNK_CHARS else None
+
+    for word in iter_words(source):
+        window.append(word)
+        if len(window) == chunk_words:
+            chunk = emit()
+            if chunk:
+                yield chunk
+            emitted_full = True
+            for _ in range(step):
+                window.popleft()
+
+    # Windows that start before the end but run past it
+    if not window:
+        return
+    if not overlap_tail:
+        # Only the first of them adds words not in an earlier chunk
+        if not (emitted_full and len(window) <= overlap_words):
+            chunk = emit()
+            if chunk:
+                yield chunk
+        return
+    while True:
+        chunk = emit()
+        if chunk:
+            yield chunk
+        if len(window) <= step:
+            break
+        for _ in range(step):
+            window.popleft()
+
+
+def count_chunks(source: Union[str, Iterable[str]], **kwargs) -> int:
+    """Number of chunks iter_chunks() yields (streams; nothing is kept)."""
+    return sum(1 for _ in iter_chunks(source, **kwargs))
+
+
+# ---------------------------------------------------------------------------
+# STRUCTURE-AWARE CHUNKING
+# ---------------------------------------------------------------------------
+TABLE_MAX_WORDS = 400       # longer tables are split by rows, header repeated
+TABLE_MIN_WORDS = 12        # smaller tables stay inline with the prose
+MIN_SECTION_WORDS = 40      # shorter sections are merged into the next one
+
+# SEC item headings and financial statement / MD&A section titles
+_ITEM_HEADING = re.compile(r"^(?:part\s+[ivx]+\W{0,3}\s*)?item\s+\d{1,2}[a-c]?\b", re.IGNORECASE)
+_TITLE_HEADING = re.compile(
+    r"^(?:consolidated\s+|condensed\s+)*"
+    r"(?:statements?\s+of\s+(?:cash\s+flows|operations|income|comprehensive\s+income|"
+    r"(?:stock|share)holders'?\s+equity)|balance\s+sheets?|"
+    r"notes\s+to\s+(?:the\s+)?(?:condensed\s+)?consolidated\s+financial\s+statements|"
+    r"management'?s\s+discussion\s+and\s+analysis|liquidity\s+and\s+capital\s+resources|"
+    r"capital\s+expenditures|results\s+of\s+operations|risk\s+factors|"
+    r"(?:business\s+|financial\s+)?outlook|guidance)\b",
+    re.IGNORECASE,
+)
+_HEADING_MAX_WORDS = 14
+_CONTINUED = re.compile(r"\s*\(continued\)\s*$", re.IGNORECASE)
+_CAPTION_MAX_WORDS = 40
+
+
+@dataclass
+class Chunk:
+    text: str
+    section: Optional[str] = None       # None for the plain word-window strategy
+    kind: str = "text"                  # "text" or "table"
+
+
+def heading_title(line: str) -> Optional[str]:
+    """Normalized section title when the line is a section heading."""
+    line = " ".join(line.split())
+    if not line or line.startswith("|") or len(line.split()) > _HEADING_MAX_WORDS:
+        return None
+    if _ITEM_HEADING.match(line) or _TITLE_HEADING.match(line):
+        # Running page headers repeat the title with "(Continued)"
+        return _CONTINUED.sub("", line).rstrip(" .:")[:120]
+    return None
+
+
+def _caption(line: str) -> str:
+    """Last sentence of the line preceding a table, capped in length."""
+    if len(line.split()) > _CAPTION_MAX_WORDS:
+        line = re.split(r"(?<=[.!?])\s+", line)[-1]
+    return " ".join(line.split()[-_CAPTION_MAX_WORDS:])
+
+
+def _iter_lines(source: Union[str, Iterable[str]]) -> Iterator[str]:
+    pieces = (source,) if isinstance(source, str) else source
+    for piece in pieces:
+        yield from piece.splitlines()
+
+
+def _table_chunks(section: str, caption: str, rows: list[str], max_words: int) -> Iterator[Chunk]:
+    """One chunk per table (split by rows when too long), prefixed by its section/caption."""
+    prefix = [line for line in dict.fromkeys((section, caption)) if line]
+    header = rows[:2] if len(rows) > 1 and set(rows[1]) <= set("|-: ") else rows[:1]
+    body = rows[len(header):]
+    base_words = sum(len(line.split()) for line in prefix + header)
+
+    part, words = [], base_words
+    for row in body:
+        row_words = len(row.split())
+        if part and words + row_words > max_words:
+            yield Chunk("\n".join(prefix + header + part), section, "table")
+            part, words = [], base_words
+        part.append(row)
+        words += row_words
+    if part or not body:
+        yield Chunk("\n".join(prefix + header + part), section, "table")
+
+
+def iter_structured_chunks(
+    source: Union[str, Iterable[str]],
+    chunk_words: int = CHUNK_WORDS,
+    overlap_words: int = OVERLAP_WORDS,
+    table_max_words: int = TABLE_MAX_WORDS,
+) -> Iterator[Chunk]:
+    """
+    Yield chunks that follow the document's structure.
+
+    Prose is word-window chunked within each section (windows never span a
+    section heading such as "Item 7" or "Consolidated Statements of Cash
+    Flows"; headings with almost no text below them, e.g. a table of
+    contents, are merged forward). Markdown tables (as produced by layout
+    extraction) become their own chunks together with the header row, the
+    section title and the line preceding the table; tables over
+    table_max_words are split by rows with the header repeated. Every chunk
+    carries its section title.
+    """
+    section = ""
+    prose: list[str] = []
+    prose_words = 0
+    table: list[str] = []
+
+    def flush_prose():
+        nonlocal prose_words
+        for text in iter_chunks(prose, chunk_words, overlap_words, overlap_tail=False):
+            yield Chunk(text, section, "text")
+        prose.clear()
+        prose_words = 0
+
+    def flush_table():
+        nonlocal prose_words
+        rows = list(table)
+        table.clear()
+        words = sum(len(row.split()) for row in rows)
+        if words < TABLE_MIN_WORDS:
+            prose.extend(rows)
+            prose_words += words
+            return
+        # The line right above a table usually names it (a title, "(in millions)")
+        caption = _caption(prose[-1]) if prose else ""
+        yield from _table_chunks(section, caption, rows, table_max_words)
+
+    for line in _iter_lines(source):
+        stripped = line.strip()
+        if stripped.startswith("|"):
+            table.append(stripped)
+            continue
+        if table:
+            yield from flush_table()
+        if not stripped:
+            continue
+        title = heading_title(stripped)
+        if title and title != section:
+            if prose_words >= MIN_SECTION_WORDS:
+                yield from flush_prose()
+            section = title
+        prose.append(stripped)
+        prose_words += len(stripped.split())
+    if table:
+        yield from flush_table()
+    yield from flush_prose()
+
+
+CHUNKING_STRATEGIES = ("words", "structured")
+
+
+def iter_document_chunks(source: Union[str, Iterable[str]], strategy: str = "words") -> Iterator[Chunk]:
+    """Chunks of a document under the given strategy ("words" or "structured")."""
+    if strategy == "structured":
+        return iter_structured_chunks(source)
+    if strategy != "words":
+        raise ValueError(f"Unknown chunking strategy: {strategy}")
+    return (Chunk(text) for text in iter_chunks(source))
+
+
+def chunk_metadata(chunk: Chunk) -> dict:
+    """Extra metadata for a chunk (section fields only for the structured strategy)."""
+    if chunk.section is None:
+        return {}
+    return {"section": chunk.section, "chunk_type": chunk.kind}
@@ -26,8 +26,111 @@ EMBEDDING_MODEL = "all-mpnet-base-v2"
 # PATHS
 # ---------------------------------------------------------------------------
 CHROMADB_PATH = str(BASE_DIR / "chromadb_store")
+METADATA_INDEX_PATH = BASE_DIR / "chromadb_store_stats.json"
+CONTENT_MANIFEST_PATH = BASE_DIR / "chromadb_store_content.json"
+SPARSE_INDEX_PATH = BASE_DIR / "chromadb_store_sparse.json"
 DATA_DIR = BASE_DIR / "data"
 
+# ---------------------------------------------------------------------------
+# STARTUP
+# ---------------------------------------------------------------------------
+# Accept traffic immediately and load the embedding model / ChromaDB in the
+# background (/api/health reports "warming" meanwhile); false = load first
+FAST_START = os.getenv("FAST_START", "true").lower() == "true"
+
+# ---------------------------------------------------------------------------
+# EMBEDDING CACHE
+# ---------------------------------------------------------------------------
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "4096"))
+EMBEDDING_CACHE_PERSIST = os.getenv("EMBEDDING_CACHE_PERSIST", "true").lower() == "true"
+EMBEDDING_CACHE_DIR = Path(os.getenv("EMBEDDING_CACHE_DIR", str(DATA_DIR / "embedding_cache")))
+
+# ---------------------------------------------------------------------------
+# EMBEDDING BACKEND
+# ---------------------------------------------------------------------------
+# "torch" (full precision, what the index was built with), "torch-int8",
+# "onnx" or "onnx-int8" (ONNX Runtime; needs sentence-transformers[onnx])
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch").lower()
+EMBEDDING_ONNX_QUANTIZATION = os.getenv("EMBEDDING_ONNX_QUANTIZATION", "avx2")  # arm64, avx2, avx512, avx512_vnni
+EMBEDDING_MODEL_DIR = Path(os.getenv("EMBEDDING_MODEL_DIR", str(DATA_DIR / "embedding_models")))
+
+# ---------------------------------------------------------------------------
+# EMBEDDING SERVICE
+# ---------------------------------------------------------------------------
+# Unix socket of a shared embedding process (python -m backend.core.embedding_service);
+# empty = every API process loads its own model
+EMBEDDING_SERVICE_SOCKET = os.getenv("EMBEDDING_SERVICE_SOCKET", "")
+EMBEDDING_SERVICE_MAX_BATCH = int(os.getenv("EMBEDDING_SERVICE_MAX_BATCH", "64"))        # texts per model call
+EMBEDDING_SERVICE_MAX_WAIT_MS = float(os.getenv("EMBEDDING_SERVICE_MAX_WAIT_MS", "5"))   # wait for batch mates
+EMBEDDING_SERVICE_TIMEOUT = float(os.getenv("EMBEDDING_SERVICE_TIMEOUT", "120"))
+# Load the model locally when the service is not running (timeouts are raised)
+EMBEDDING_SERVICE_FALLBACK = os.getenv("EMBEDDING_SERVICE_FALLBACK", "true").lower() == "true"
+
+# ---------------------------------------------------------------------------
+# RETRIEVAL
+# ---------------------------------------------------------------------------
+# "dense": embedding search only
+# "hybrid": embedding search fused with BM25 (sparse index) by reciprocal rank fusion
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "hybrid").lower()
+RRF_K = int(os.getenv("RRF_K", "60"))   # rank offset in 1 / (RRF_K + rank)
+
+# ---------------------------------------------------------------------------
+# RE-RANKING (optional cross-encoder over the retriever's top candidates)
+# ---------------------------------------------------------------------------
+RERANKER_ENABLED = os.getenv("RERANKER_ENABLED", "false").lower() == "true"
+RERANKER_MODEL = os.getenv("RERANKER_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+RERANKER_CANDIDATES = int(os.getenv("RERANKER_CANDIDATES", "30"))    # retriever hits scored per query
+RERANKER_BATCH = int(os.getenv("RERANKER_BATCH", "16"))              # pairs per model call
+RERANKER_BUDGET_MS = float(os.getenv("RERANKER_BUDGET_MS", "400"))   # then keep the retriever order
+RERANKER_CACHE_SIZE = int(os.getenv("RERANKER_CACHE_SIZE", "20000")) # cached (query, chunk) scores
+RERANK_TOP_K = int(os.getenv("RERANK_TOP_K", "6"))                   # chunks sent to the LLM
+RERANK_TOP_K_COMPARISON = int(os.getenv("RERANK_TOP_K_COMPARISON", "8"))
+
+# ---------------------------------------------------------------------------
+# NEAR-DUPLICATE CHUNKS (SimHash fingerprints, see backend.core.near_duplicates)
+# ---------------------------------------------------------------------------
+SIMHASH_MAX_DISTANCE = int(os.getenv("SIMHASH_MAX_DISTANCE", "3"))   # differing bits of 64
+# Collapse near-duplicate chunks in every search (chat's search_reranked always does)
+DEDUP_SEARCH_RESULTS = os.getenv("DEDUP_SEARCH_RESULTS", "false").lower() == "true"
+
+# ---------------------------------------------------------------------------
+# CHUNKING
+# ---------------------------------------------------------------------------
+# "words": 250-word windows with 50-word overlap
+# "structured": windows within section headings, Markdown tables kept whole
+CHUNKING_STRATEGY = os.getenv("CHUNKING_STRATEGY", "words").lower()
+
+# ---------------------------------------------------------------------------
+# EXTRACTION CACHE (extracted text/tables keyed by file content hash)
+# ---------------------------------------------------------------------------
+EXTRACTION_CACHE_ENABLED = os.getenv("EXTRACTION_CACHE_ENABLED", "true").lower() == "true"
+EXTRACTION_CACHE_DIR = Path(os.getenv("EXTRACTION_CACHE_DIR", str(DATA_DIR / "extraction_cache")))
+
+# ---------------------------------------------------------------------------
+# PAGE-PARALLEL PDF EXTRACTION
+# ---------------------------------------------------------------------------
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(max(1, (os.cpu_count() or 2) - 1))))
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "40"))
+PDF_PAGES_PER_SHARD = int(os.getenv("PDF_PAGES_PER_SHARD", "16"))
+
+# ---------------------------------------------------------------------------
+# EXECUTION POOLS (blocking work offloaded from the event loop)
+# ---------------------------------------------------------------------------
+EMBEDDING_WORKERS = int(os.getenv("EMBEDDING_WORKERS", "1"))
+SEARCH_WORKERS = int(os.getenv("SEARCH_WORKERS", "8"))
+LLM_WORKERS = int(os.getenv("LLM_WORKERS", "16"))
+
+# ---------------------------------------------------------------------------
+# LLM CLIENT POOL
+# ---------------------------------------------------------------------------
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+LLM_KEEPALIVE_CONNECTIONS = int(os.getenv("LLM_KEEPALIVE_CONNECTIONS", "10"))
+LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "60"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "120"))
+LLM_STUB = os.getenv("LLM_STUB", "false").lower() == "true"
+
 # ---------------------------------------------------------------------------
 # WEB SEARCH
 # ---------------------------------------------------------------------------
@@ -45,6 +148,25 @@ SENTIMENT_SHIFT_THRESHOLD = 0.3
 # ---------------------------------------------------------------------------
 INGESTION_SCHEDULE = os.getenv("INGESTION_SCHEDULE", "0 16 * * 1-5")
 
+# ---------------------------------------------------------------------------
+# INGEST JOBS
+# ---------------------------------------------------------------------------
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "2"))                  # extraction processes
+INGEST_MAX_RETRIES = int(os.getenv("INGEST_MAX_RETRIES", "2"))          # extra attempts per failed file
+INGEST_RETRY_BACKOFF = float(os.getenv("INGEST_RETRY_BACKOFF", "30"))   # seconds, doubled per retry
+INGEST_JOB_HISTORY = int(os.getenv("INGEST_JOB_HISTORY", "50"))         # finished jobs kept for status
+
+# ---------------------------------------------------------------------------
+# SEC EDGAR CLIENT
+# ---------------------------------------------------------------------------
+SEC_DATA_URL = os.getenv("SEC_DATA_URL", "https://data.sec.gov").rstrip("/")
+SEC_ARCHIVES_URL = os.getenv("SEC_ARCHIVES_URL", "https://www.sec.gov/Archives").rstrip("/")
+SEC_RATE_LIMIT = float(os.getenv("SEC_RATE_LIMIT", "10"))          # requests/second (SEC fair-access limit)
+SEC_MAX_CONCURRENCY = int(os.getenv("SEC_MAX_CONCURRENCY", "8"))    # requests in flight
+SEC_HTTP2 = os.getenv("SEC_HTTP2", "true").lower() == "true"
+SEC_TIMEOUT = float(os.getenv("SEC_TIMEOUT", "60"))
+SEC_MAX_RETRIES = int(os.getenv("SEC_MAX_RETRIES", "3"))
+
 # ---------------------------------------------------------------------------
 # COMPANY DEFINITIONS
 # ---------------------------------------------------------------------------
@@ -54,30 +176,35 @@ COMPANIES = {
         "cik": "0000866374",
         "sector": "EMS",
         "description": "Global electronics manufacturing services provider",
+        "fiscal_year_end": "March",
     },
     "JBL": {
         "name": "Jabil Inc",
         "cik": "0000898293",
         "sector": "EMS",
         "description": "Worldwide manufacturing services and solutions provider",
+        "fiscal_year_end": "August",
     },
     "CLS": {
         "name": "Celestica Inc",
         "cik": "0001030894",
         "sector": "EMS",
         "description": "Global provider of electronics manufacturing services",
+        "fiscal_year_end": "December",
     },
     "BHE": {
         "name": "Benchmark Electronics",
         "cik": "0001080020",
         "sector": "EMS",
         "description": "Provider of integrated electronics manufacturing services",
+        "fiscal_year_end": "December",
     },
     "SANM": {
         "name": "Sanmina Corporation",
         "cik": "0000897723",
         "sector": "EMS",
         "description": "Global electronics manufacturing services company",
+        "fiscal_year_end": "September",
     },
 }
 
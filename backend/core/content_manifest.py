@@ -0,0 +1,243 @@
+"""
+File- and chunk-level content hashes for incremental (re-)indexing.
+Writers (processor, build_chromadb) consult the manifest to skip unchanged
+files, re-embed only chunks whose text changed, patch metadata-only changes
+and delete chunks that no longer exist. Persisted as JSON next to chromadb_store.
+"""
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from .config import BASE_DIR
+
+
+MANIFEST_VERSION = 1
+_HASH_BLOCK = 1 << 20
+
+
+def file_sha256(path: Path) -> str:
+    """Stream a file through SHA-256."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def metadata_hash(meta: dict) -> str:
+    return hashlib.sha1(json.dumps(meta, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def file_key(path: Path) -> str:
+    """Manifest key: path relative to the project root when possible."""
+    path = Path(path).resolve()
+    try:
+        return str(path.relative_to(BASE_DIR))
+    except ValueError:
+        return str(path)
+
+
+@dataclass
+class ChunkPlan:
+    """What to do with a file's freshly chunked content."""
+    embed: list[int] = field(default_factory=list)     # new or changed text
+    update: list[int] = field(default_factory=list)    # same text, new metadata
+    delete: list[str] = field(default_factory=list)    # ids that vanished
+    hashes: dict = field(default_factory=dict)         # id -> [text hash, metadata hash]
+    previous: dict = field(default_factory=dict, repr=False)
+
+    @property
+    def unchanged(self) -> int:
+        return len(self.hashes) - len(self.embed) - len(self.update)
+
+    def add(self, i: int, chunk_id: str, text: str, meta: dict) -> Optional[str]:
+        """Classify one chunk as it is produced: "embed", "update" or None (unchanged)."""
+        hashes = [text_hash(text), metadata_hash(meta)]
+        self.hashes[chunk_id] = hashes
+        old = self.previous.get(chunk_id)
+        if old is None or old[0] != hashes[0]:
+            self.embed.append(i)
+            return "embed"
+        if old[1] != hashes[1]:
+            self.update.append(i)
+            return "update"
+        return None
+
+    def finish(self) -> "ChunkPlan":
+        """Once every chunk was added: previously recorded ids that vanished get deleted."""
+        self.delete = [chunk_id for chunk_id in self.previous if chunk_id not in self.hashes]
+        return self
+
+
+class ContentManifest:
+    """
+    file key -> {"sha256", "size", "mtime", "chunking", "chunks": {id: [text hash, meta hash]}}.
+
+    The API process and build_chromadb share the file: when the other one
+    rewrote it, its entries are merged in (ours win for the keys we changed)
+    before reading or saving.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._files: dict[str, dict] = {}
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._changed: set[str] = set()     # keys changed since the last save
+        self._cleared = False
+        self._loaded_mtime = 0
+
+    def disk_changed(self) -> bool:
+        """True when the persisted manifest was rewritten since we loaded/saved it."""
+        try:
+            return self.path.stat().st_mtime_ns != self._loaded_mtime
+        except OSError:
+            return False
+
+    def _read(self) -> Optional[dict]:
+        """The files recorded on disk (None when missing or unreadable)."""
+        if not self.path.exists():
+            return None
+        try:
+            mtime = self.path.stat().st_mtime_ns
+            with open(self.path) as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"⚠ Content manifest load failed: {e}")
+            return None
+        self._loaded_mtime = mtime
+        if data.get("version") != MANIFEST_VERSION:
+            return None
+        return data.get("files", {})
+
+    def _merge_from_disk(self) -> None:
+        """Take another process's entries, keeping the ones changed here since the last save."""
+        files = self._read()
+        if files is None or self._cleared:
+            return
+        for key in self._changed:
+            if key in self._files:
+                files[key] = self._files[key]
+            else:
+                files.pop(key, None)
+        self._files = files
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded and not self.disk_changed():
+            return
+        with self._lock:
+            if self._loaded:
+                if self.disk_changed():
+                    self._merge_from_disk()
+                return
+            self._loaded = True
+            self._files = self._read() or {}
+
+    # ------------------------------------------------------------------
+    # File level
+    # ------------------------------------------------------------------
+    def known_sha(self, key: str, path: Path, chunking: str = "words") -> Optional[str]:
+        """
+        The recorded hash when the file on disk still matches it.
+
+        Size + mtime equal to the recorded values is trusted without hashing;
+        otherwise the file is re-hashed. Returns None for new/changed files
+        and for files chunked with a different strategy.
+        """
+        self._ensure_loaded()
+        with self._lock:
+            entry = self._files.get(key)
+        if not entry or entry.get("chunking", "words") != chunking:
+            return None
+        st = Path(path).stat()
+        if entry["size"] == st.st_size and entry["mtime"] == st.st_mtime:
+            return entry["sha256"]
+        sha = file_sha256(path)
+        if sha != entry["sha256"]:
+            return None
+        with self._lock:
+            entry["mtime"] = st.st_mtime       # touched but identical
+            self._changed.add(key)
+        return sha
+
+    def chunk_ids(self, key: str) -> list[str]:
+        self._ensure_loaded()
+        with self._lock:
+            entry = self._files.get(key)
+            return list(entry["chunks"]) if entry else []
+
+    # ------------------------------------------------------------------
+    # Chunk level
+    # ------------------------------------------------------------------
+    def start_plan(self, key: str) -> ChunkPlan:
+        """Empty plan against the recorded chunks, for streaming add() / finish()."""
+        self._ensure_loaded()
+        with self._lock:
+            entry = self._files.get(key)
+            previous = dict(entry["chunks"]) if entry else {}
+        return ChunkPlan(previous=previous)
+
+    def plan(self, key: str, ids: list[str], texts: list[str], metadatas: list[dict]) -> ChunkPlan:
+        """Diff new chunks against the recorded ones."""
+        plan = self.start_plan(key)
+        for i, (chunk_id, text, meta) in enumerate(zip(ids, texts, metadatas)):
+            plan.add(i, chunk_id, text, meta)
+        return plan.finish()
+
+    def record(self, key: str, path: Path, sha: str, hashes: dict, chunking: str = "words") -> None:
+        """Record a file once all of its chunks are in the collection."""
+        self._ensure_loaded()
+        st = Path(path).stat()
+        with self._lock:
+            self._files[key] = {
+                "sha256": sha,
+                "size": st.st_size,
+                "mtime": st.st_mtime,
+                "chunking": chunking,
+                "chunks": hashes,
+            }
+            self._changed.add(key)
+
+    def forget(self, key: str) -> None:
+        self._ensure_loaded()
+        with self._lock:
+            if self._files.pop(key, None) is not None:
+                self._changed.add(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._files = {}
+            self._loaded = True
+            self._cleared = True
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def save(self) -> None:
+        """Write the manifest atomically (a no-op when nothing changed since the last save)."""
+        if not self._loaded:
+            return
+        with self._lock:
+            if not self._changed and not self._cleared:
+                return
+            if self.disk_changed():
+                self._merge_from_disk()
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+                with open(tmp, "w") as f:
+                    json.dump({"version": MANIFEST_VERSION, "files": self._files}, f)
+                os.replace(tmp, self.path)
+                self._loaded_mtime = self.path.stat().st_mtime_ns
+                self._changed.clear()
+                self._cleared = False
+            except Exception as e:
+                print(f"⚠ Content manifest save failed: {e}")
@@ -1,9 +1,31 @@
 """
 Database connections for ChromaDB and SQLite.
+chromadb and the embedding model are imported/loaded on first use
+(or in the background at startup, see main.lifespan).
 """
-import chromadb
-from sentence_transformers import SentenceTransformer
-from .config import CHROMADB_PATH, EMBEDDING_MODEL
+import threading
+import time
+from typing import Optional
+
+from .config import (
+    CHROMADB_PATH,
+    METADATA_INDEX_PATH,
+    CONTENT_MANIFEST_PATH,
+    SPARSE_INDEX_PATH,
+    EMBEDDING_MODEL,
+    EMBEDDING_BACKEND,
+    EMBEDDING_SERVICE_FALLBACK,
+    EMBEDDING_CACHE_SIZE,
+    EMBEDDING_CACHE_PERSIST,
+    EMBEDDING_CACHE_DIR,
+)
+from .embedding_cache import EmbeddingCache, normalize_query_text
+from .embedding_backends import load_embedding_model, embedding_model_id
+from .embedding_service import get_embedding_service_client
+from .stats_index import MetadataIndex, sync_index
+from .sparse_index import SparseIndex, sync_sparse_index
+from .content_manifest import ContentManifest
+from .executor import run_blocking
 
 # ---------------------------------------------------------------------------
 # CHROMADB CLIENT
@@ -11,13 +33,29 @@ from .config import CHROMADB_PATH, EMBEDDING_MODEL
 _chroma_client = None
 _collection = None
 _embedding_model = None
+_embedding_cache = None
+_metadata_index = None
+_sparse_index = None
+_generation = 0
+_content_manifest = None
+_load_lock = threading.RLock()     # one loader for the client/collection/model, however many callers
+_service_fallbacks = 0
+_sparse_sync_lock = threading.Lock()
+_sparse_sync_thread: Optional[threading.Thread] = None
+_sparse_sync_started = 0.0
+# Don't start another background sparse sync within this many seconds of the last
+# (a build_chromadb run in another process keeps the collection moving)
+SPARSE_SYNC_INTERVAL_SECONDS = 60
 
 
 def get_chroma_client():
     """Get or create ChromaDB client."""
     global _chroma_client
     if _chroma_client is None:
-        _chroma_client = chromadb.PersistentClient(path=CHROMADB_PATH)
+        with _load_lock:
+            if _chroma_client is None:
+                import chromadb
+                _chroma_client = chromadb.PersistentClient(path=CHROMADB_PATH)
     return _chroma_client
 
 
@@ -25,11 +63,13 @@ def get_collection():
     """Get the main document collection."""
     global _collection
     if _collection is None:
-        client = get_chroma_client()
-        _collection = client.get_or_create_collection(
-            name="capex_docs",
-            metadata={"hnsw:space": "cosine"}
-        )
+        with _load_lock:
+            if _collection is None:
+                client = get_chroma_client()
+                _collection = client.get_or_create_collection(
+                    name="capex_docs",
+                    metadata={"hnsw:space": "cosine"}
+                )
     return _collection
 
 
@@ -37,54 +77,236 @@ def get_embedding_model():
     """Get or load the embedding model."""
     global _embedding_model
     if _embedding_model is None:
-        print("Loading embedding model...")
-        _embedding_model = SentenceTransformer(EMBEDDING_MODEL)
-        print(f"✓ Loaded {EMBEDDING_MODEL}")
+        with _load_lock:
+            if _embedding_model is None:
+                print(f"Loading embedding model ({EMBEDDING_BACKEND})...")
+                _embedding_model = load_embedding_model(EMBEDDING_MODEL, EMBEDDING_BACKEND)
+                print(f"✓ Loaded {EMBEDDING_MODEL} ({EMBEDDING_BACKEND})")
     return _embedding_model
 
 
-def embed_text(text: str) -> list[float]:
-    """Embed a single text string."""
+def get_embedding_cache() -> EmbeddingCache:
+    """Get the process-wide query embedding cache."""
+    global _embedding_cache
+    if _embedding_cache is None:
+        _embedding_cache = EmbeddingCache(
+            model_name=embedding_model_id(EMBEDDING_MODEL, EMBEDDING_BACKEND),
+            max_entries=EMBEDDING_CACHE_SIZE,
+            persist_dir=EMBEDDING_CACHE_DIR if EMBEDDING_CACHE_PERSIST else None,
+        )
+    return _embedding_cache
+
+
+def _service_unreachable(error: OSError) -> None:
+    """Count (and report the first) fallback from the embedding service to the local model."""
+    global _service_fallbacks
+    if not EMBEDDING_SERVICE_FALLBACK:
+        raise error
+    if _service_fallbacks == 0:
+        print(f"⚠ Embedding service unreachable ({error}); encoding with a local model")
+    _service_fallbacks += 1
+
+
+def _encode(texts: list[str], priority: str = "query"):
+    """
+    Encode texts on the shared embedding service when EMBEDDING_SERVICE_SOCKET
+    is set (batched there with other processes' requests), otherwise with
+    this process's model on the embedding pool.
+    """
+    client = get_embedding_service_client()
+    if client is not None:
+        try:
+            return client.encode(texts, priority)
+        except (ConnectionRefusedError, FileNotFoundError) as e:
+            # Only a service that is not running; timeouts (a busy service) propagate
+            _service_unreachable(e)
     model = get_embedding_model()
-    return model.encode(text).tolist()
+    return run_blocking("embedding", model.encode, texts)
+
+
+def warm_up_embeddings() -> str:
+    """Make the first encode fast: reach the embedding service, or load the local model."""
+    client = get_embedding_service_client()
+    if client is not None:
+        try:
+            client.stats()
+            return "service"
+        except OSError as e:
+            _service_unreachable(e)
+    get_embedding_model()
+    return "local"
+
+
+def embedding_stats() -> dict:
+    """Where embeddings are computed, with the service's batching counters when it is used."""
+    client = get_embedding_service_client()
+    stats = {"model": EMBEDDING_MODEL, "backend": EMBEDDING_BACKEND, "service": None}
+    if client is not None:
+        stats["service"] = {"socket": client.socket_path, "requests": client.requests,
+                            "failures": client.failures, "timeouts": client.timeouts,
+                            "fallbacks": _service_fallbacks}
+        try:
+            stats["service"]["server"] = client.stats()
+        except OSError as e:
+            stats["service"]["server"] = {"error": str(e)}
+    return stats
+
+
+def embed_text(text: str) -> list[float]:
+    """Embed a single query string (served from the embedding cache when possible)."""
+    return embed_queries([text])[0]
+
+
+def embed_queries(texts: list[str]) -> list[list[float]]:
+    """
+    Embed query strings through the LRU embedding cache.
+
+    Only texts missing from the cache are encoded, in a single batch.
+    Use embed_texts() for document chunks, which should not evict queries.
+    """
+    texts = [normalize_query_text(t) for t in texts]
+    cache = get_embedding_cache()
+    vectors = cache.get_many(texts)
+    missing = [i for i, v in enumerate(vectors) if v is None]
+    if missing:
+        missing_texts = list(dict.fromkeys(texts[i] for i in missing))
+        encoded = _encode(missing_texts, "query")
+        cache.put_many(missing_texts, encoded)
+        by_text = dict(zip(missing_texts, encoded))
+        for i in missing:
+            vectors[i] = by_text[texts[i]]
+    return [v.tolist() for v in vectors]
 
 
 def embed_texts(texts: list[str]) -> list[list[float]]:
-    """Embed multiple text strings."""
-    model = get_embedding_model()
-    return model.encode(texts).tolist()
+    """Embed multiple text strings (document chunks; queued behind queries on the service)."""
+    return _encode(texts, "bulk").tolist()
 
 
 # ---------------------------------------------------------------------------
 # COLLECTION STATS
 # ---------------------------------------------------------------------------
+def get_metadata_index() -> MetadataIndex:
+    """Get the persisted metadata statistics index (loaded on first use)."""
+    global _metadata_index
+    if _metadata_index is None:
+        _metadata_index = MetadataIndex(METADATA_INDEX_PATH)
+        _metadata_index.load()
+    return _metadata_index
+
+
+def get_synced_metadata_index(expected_total: Optional[int] = None) -> MetadataIndex:
+    """The metadata index, reloaded or rebuilt first when it is out of sync with the collection."""
+    index = get_metadata_index()
+    sync_index(index, get_collection(), expected_total)
+    return index
+
+
+def get_sparse_index() -> SparseIndex:
+    """Get the persisted BM25 index (loaded on first use)."""
+    global _sparse_index
+    if _sparse_index is None:
+        _sparse_index = SparseIndex(SPARSE_INDEX_PATH)
+        _sparse_index.load()
+    return _sparse_index
+
+
+def get_synced_sparse_index(expected_total: Optional[int] = None) -> SparseIndex:
+    """The BM25 index, reloaded or rebuilt first when it is out of sync with the collection."""
+    index = get_sparse_index()
+    sync_sparse_index(index, get_collection(), expected_total)
+    return index
+
+
+def get_ready_sparse_index(expected_total: Optional[int] = None) -> Optional[SparseIndex]:
+    """
+    The BM25 index if it is in sync with the collection, else None (searches
+    then run dense-only) after starting a background reload/rebuild.
+    Searches never wait for a rebuild.
+    """
+    index = get_sparse_index()
+    count = get_collection().count() if expected_total is None else expected_total
+    if index.in_sync(count):
+        return index
+    _sync_sparse_in_background()
+    return None
+
+
+def _sync_sparse_in_background() -> None:
+    """Start one background thread to bring the sparse index in sync (if none is running)."""
+    global _sparse_sync_thread, _sparse_sync_started
+    with _sparse_sync_lock:
+        if _sparse_sync_thread is not None and _sparse_sync_thread.is_alive():
+            return
+        if time.monotonic() - _sparse_sync_started < SPARSE_SYNC_INTERVAL_SECONDS:
+            return
+        _sparse_sync_started = time.monotonic()
+
+        def run():
+            try:
+                get_synced_sparse_index()
+            except Exception as e:
+                print(f"⚠ Background sparse index sync failed: {e}")
+
+        _sparse_sync_thread = threading.Thread(target=run, name="sparse-sync", daemon=True)
+        _sparse_sync_thread.start()
+
+
+def collection_generation() -> tuple[int, int]:
+    """
+    Changes whenever the collection does: a counter bumped by record_upsert /
+    record_delete in this process, plus the metadata index file's mtime for
+    writes by other processes (build_chromadb). Version cached search results with it.
+    """
+    try:
+        mtime = METADATA_INDEX_PATH.stat().st_mtime_ns
+    except OSError:
+        mtime = 0
+    return _generation, mtime
+
+
+def _bump_generation() -> None:
+    global _generation
+    _generation += 1
+
+
+def record_upsert(ids: list[str], metadatas: list[dict], documents: Optional[list[str]] = None) -> None:
+    """
+    Update the metadata and sparse indexes after upserting chunks (call
+    save_metadata_index when done). Pass documents for upserts; leave them
+    out for metadata-only collection.update() calls.
+    """
+    get_metadata_index().record_upsert(ids, metadatas)
+    get_sparse_index().record_upsert(ids, metadatas, documents)
+    _bump_generation()
+
+
+def record_delete(ids: list[str]) -> None:
+    """Update the metadata and sparse indexes after deleting chunks."""
+    get_metadata_index().record_delete(ids)
+    get_sparse_index().record_delete(ids)
+    _bump_generation()
+
+
+def save_metadata_index() -> None:
+    """Persist the metadata and sparse indexes to disk."""
+    get_metadata_index().save()
+    get_sparse_index().save()
+
+
+def get_content_manifest() -> ContentManifest:
+    """Get the file/chunk content-hash manifest used for incremental indexing."""
+    global _content_manifest
+    if _content_manifest is None:
+        _content_manifest = ContentManifest(CONTENT_MANIFEST_PATH)
+    return _content_manifest
+
+
 def get_collection_stats() -> dict:
-    """Get statistics about the ChromaDB collection."""
-    collection = get_collection()
-    count = collection.count()
-    
-    if count == 0:
-        return {
-            "total_documents": 0,
-            "companies": {},
-            "filing_types": {},
-        }
-    
-    # Get all metadata to compute stats
-    results = collection.get(include=["metadatas"], limit=count)
-    
-    companies = {}
-    filing_types = {}
-    
-    for meta in results["metadatas"]:
-        company = meta.get("company", "Unknown")
-        ftype = meta.get("filing_type", "Unknown")
-        
-        companies[company] = companies.get(company, 0) + 1
-        filing_types[ftype] = filing_types.get(ftype, 0) + 1
-    
-    return {
-        "total_documents": count,
-        "companies": companies,
-        "filing_types": filing_types,
-    }
+    """
+    Get statistics about the ChromaDB collection.
+
+    Served from the incremental metadata index; only falls back to a full
+    metadata scan when the index is missing or out of sync with the collection.
+    """
+    return get_synced_metadata_index().stats()
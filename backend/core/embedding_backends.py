@@ -0,0 +1,72 @@
+"""
+Embedding model backends.
+The same sentence-transformers model can be served by:
+  torch       full-precision PyTorch (what the index was built with)
+  torch-int8  PyTorch with int8 dynamic quantization of the Linear layers
+  onnx        ONNX Runtime (needs sentence-transformers[onnx])
+  onnx-int8   ONNX Runtime with an int8 dynamically quantized model,
+              exported once under data/embedding_models
+Every backend returns the same encode() interface. Non-torch backends give
+vectors close to, not identical to, the indexed ones; measure the drift with
+`python -m backend.core.embedding_parity` before switching.
+"""
+from pathlib import Path
+
+from .config import EMBEDDING_MODEL, EMBEDDING_BACKEND, EMBEDDING_ONNX_QUANTIZATION, EMBEDDING_MODEL_DIR
+
+
+EMBEDDING_BACKENDS = ("torch", "torch-int8", "onnx", "onnx-int8")
+
+
+def embedding_model_id(model_name: str = EMBEDDING_MODEL, backend: str = EMBEDDING_BACKEND) -> str:
+    """Identifier for vectors produced by a model/backend pair (e.g. embedding cache keys)."""
+    return model_name if backend == "torch" else f"{model_name}+{backend}"
+
+
+def _quantized_onnx_dir(model_name: str) -> Path:
+    return EMBEDDING_MODEL_DIR / f"{model_name.replace('/', '__')}-onnx"
+
+
+def _load_onnx_int8(model_name: str, quantization: str):
+    """Load the int8 ONNX model, exporting and quantizing it on first use."""
+    from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+
+    model_dir = _quantized_onnx_dir(model_name)
+    file_name = f"onnx/model_qint8_{quantization}.onnx"
+    if not (model_dir / file_name).exists():
+        print(f"Exporting int8 ONNX model ({quantization}) to {model_dir}...")
+        model = SentenceTransformer(model_name, backend="onnx")
+        model.save(str(model_dir))
+        export_dynamic_quantized_onnx_model(
+            model, quantization, str(model_dir), file_suffix=f"qint8_{quantization}",
+        )
+    return SentenceTransformer(str(model_dir), backend="onnx", model_kwargs={"file_name": file_name})
+
+
+def load_embedding_model(
+    model_name: str = EMBEDDING_MODEL,
+    backend: str = EMBEDDING_BACKEND,
+    quantization: str = EMBEDDING_ONNX_QUANTIZATION,
+):
+    """
+    Load a sentence-transformers model on the given backend.
+
+    Args:
+        model_name: Hugging Face model name or local path
+        backend: One of EMBEDDING_BACKENDS
+        quantization: ONNX Runtime quantization target for "onnx-int8"
+            (arm64, avx2, avx512, avx512_vnni)
+    """
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown embedding backend: {backend} (expected one of {', '.join(EMBEDDING_BACKENDS)})")
+    from sentence_transformers import SentenceTransformer
+
+    if backend == "torch":
+        return SentenceTransformer(model_name)
+    if backend == "torch-int8":
+        import torch
+        model = SentenceTransformer(model_name, device="cpu")
+        return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    if backend == "onnx":
+        return SentenceTransformer(model_name, backend="onnx")
+    return _load_onnx_int8(model_name, quantization)
@@ -0,0 +1,151 @@
+"""
+Bounded LRU cache for query embeddings.
+Keyed by embedding model name + whitespace-normalized text, with an optional
+compact on-disk float32 store so warm restarts skip the encoder for known queries.
+"""
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+
+def normalize_query_text(text: str) -> str:
+    """Collapse whitespace so trivially different strings share one entry."""
+    return " ".join(text.split())
+
+
+class EmbeddingCache:
+    """Thread-safe LRU of text -> float32 vector with hit/miss counters."""
+
+    def __init__(
+        self,
+        model_name: str,
+        max_entries: int = 4096,
+        persist_dir: Optional[Path] = None,
+        persist_every: int = 64,
+    ):
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.persist_dir = Path(persist_dir) if persist_dir else None
+        self.persist_every = persist_every
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._unsaved = 0
+        self._loaded = False
+
+    def _key(self, text: str) -> str:
+        return f"{self.model_name}:{normalize_query_text(text)}"
+
+    # ------------------------------------------------------------------
+    # Lookup / insert
+    # ------------------------------------------------------------------
+    def get_many(self, texts: list[str]) -> list[Optional[np.ndarray]]:
+        """Return cached vectors (or None) for each text, updating recency."""
+        self._ensure_loaded()
+        out = []
+        with self._lock:
+            for text in texts:
+                key = self._key(text)
+                vec = self._entries.get(key)
+                if vec is None:
+                    self._misses += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                out.append(vec)
+        return out
+
+    def put_many(self, texts: list[str], vectors) -> None:
+        """Insert vectors for texts, evicting least recently used entries."""
+        self._ensure_loaded()
+        should_save = False
+        with self._lock:
+            for text, vec in zip(texts, vectors):
+                key = self._key(text)
+                self._entries[key] = np.asarray(vec, dtype=np.float32)
+                self._entries.move_to_end(key)
+                self._unsaved += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+            if self.persist_dir and self._unsaved >= self.persist_every:
+                should_save = True
+        if should_save:
+            self.save()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._unsaved = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "model": self.model_name,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 3) if lookups else 0.0,
+                "evictions": self._evictions,
+                "persistent": self.persist_dir is not None,
+            }
+
+    # ------------------------------------------------------------------
+    # Persistence: keys.json + vectors.npy (float32 matrix, same order)
+    # ------------------------------------------------------------------
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            if not self.persist_dir:
+                return
+            keys_path = self.persist_dir / "keys.json"
+            vectors_path = self.persist_dir / "vectors.npy"
+            if not keys_path.exists() or not vectors_path.exists():
+                return
+            try:
+                with open(keys_path) as f:
+                    meta = json.load(f)
+                vectors = np.load(vectors_path)
+            except Exception as e:
+                print(f"⚠ Embedding cache load failed: {e}")
+                return
+            if meta.get("model") != self.model_name or len(meta.get("keys", [])) != len(vectors):
+                return
+            for key, vec in zip(meta["keys"][-self.max_entries:], vectors[-self.max_entries:]):
+                self._entries[key] = vec
+
+    def save(self) -> None:
+        """Write the cache to disk atomically (no-op when not persistent)."""
+        if not self.persist_dir:
+            return
+        with self._lock:
+            keys = list(self._entries.keys())
+            vectors = list(self._entries.values())
+            self._unsaved = 0
+        if not keys:
+            return
+        try:
+            self.persist_dir.mkdir(parents=True, exist_ok=True)
+            matrix = np.stack(vectors).astype(np.float32)
+            tmp_vectors = self.persist_dir / "vectors.tmp.npy"
+            tmp_keys = self.persist_dir / "keys.json.tmp"
+            np.save(tmp_vectors, matrix)
+            with open(tmp_keys, "w") as f:
+                json.dump({"model": self.model_name, "keys": keys}, f)
+            os.replace(tmp_vectors, self.persist_dir / "vectors.npy")
+            os.replace(tmp_keys, self.persist_dir / "keys.json")
+        except Exception as e:
+            print(f"⚠ Embedding cache save failed: {e}")
@@ -0,0 +1,179 @@
+"""
+Embedding backend parity check.
+Re-encodes a sample of indexed chunks with a candidate backend and reports
+the cosine drift from the vectors stored in ChromaDB, plus how much the
+top-k search results for a set of queries change when the query is encoded
+by the candidate instead of the index's own backend. Use it before switching
+EMBEDDING_BACKEND, to decide whether the existing index can be kept.
+
+Usage:
+    python -m backend.core.embedding_parity --backend onnx-int8
+    python -m backend.core.embedding_parity --backend torch-int8 --sample 1000 --min-cosine 0.99
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from .config import EMBEDDING_MODEL, EMBEDDING_ONNX_QUANTIZATION
+from .embedding_backends import EMBEDDING_BACKENDS, load_embedding_model
+
+
+PARITY_QUERIES = [
+    "Flex capital expenditure property equipment",
+    "capital expenditure purchases property equipment manufacturing",
+    "Jabil capital investment facility expansion",
+    "Celestica data center AI infrastructure investment",
+    "Sanmina new manufacturing facility",
+    "Benchmark Electronics capex guidance fiscal year",
+    "automation and robotics investment in factories",
+    "revenue outlook and margin guidance",
+    "supply chain risk and tariffs",
+    "free cash flow and liquidity",
+]
+
+
+def _sample_chunks(collection, sample: int, batch: int = 64) -> tuple[list[str], np.ndarray]:
+    """Documents and stored embeddings of `sample` chunks spread evenly over the collection."""
+    total = collection.count()
+    if total == 0:
+        return [], np.zeros((0, 0), dtype=np.float32)
+    windows = max(1, -(-min(sample, total) // batch))
+    stride = max(batch, total // windows)
+    docs, vectors = [], []
+    for offset in range(0, total, stride):
+        result = collection.get(
+            offset=offset, limit=min(batch, sample - len(docs)), include=["documents", "embeddings"],
+        )
+        docs.extend(result["documents"])
+        vectors.extend(result["embeddings"])
+        if len(docs) >= sample:
+            break
+    return docs, np.asarray(vectors, dtype=np.float32)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _encode(model, texts: list[str], batch_size: int = 32) -> tuple[np.ndarray, float]:
+    """Embeddings and seconds per text."""
+    start = time.perf_counter()
+    vectors = np.asarray(model.encode(texts, batch_size=batch_size), dtype=np.float32)
+    return vectors, (time.perf_counter() - start) / max(1, len(texts))
+
+
+def check_parity(
+    backend: str,
+    reference: str = "torch",
+    sample: int = 256,
+    top_k: int = 10,
+    queries: list[str] = PARITY_QUERIES,
+    quantization: str = EMBEDDING_ONNX_QUANTIZATION,
+) -> dict:
+    """
+    Compare a candidate embedding backend against the index.
+
+    Args:
+        backend: Candidate backend (one of EMBEDDING_BACKENDS)
+        reference: Backend the index was built with (encodes the baseline queries)
+        sample: Number of indexed chunks to re-encode
+        top_k: Results compared per query
+        queries: Queries for the top-k overlap check
+        quantization: ONNX quantization target for "onnx-int8"
+
+    Returns:
+        Report with document cosine statistics, query top-k overlap and encode speed
+    """
+    from .database import get_collection
+    collection = get_collection()
+
+    docs, stored = _sample_chunks(collection, sample)
+    if not docs:
+        raise ValueError("Collection is empty; nothing to compare against")
+
+    candidate = load_embedding_model(EMBEDDING_MODEL, backend, quantization)
+    encoded, candidate_speed = _encode(candidate, docs)
+    cosines = np.sum(_normalize(encoded) * _normalize(stored), axis=1)
+
+    report = {
+        "model": EMBEDDING_MODEL,
+        "backend": backend,
+        "reference": reference,
+        "documents": {
+            "sampled": len(docs),
+            "mean_cosine": round(float(cosines.mean()), 5),
+            "p5_cosine": round(float(np.percentile(cosines, 5)), 5),
+            "min_cosine": round(float(cosines.min()), 5),
+            "mean_drift": round(float(1 - cosines.mean()), 5),
+        },
+        "encode_ms_per_chunk": {backend: round(candidate_speed * 1000, 2)},
+    }
+
+    if queries and reference != backend:
+        baseline = load_embedding_model(EMBEDDING_MODEL, reference, quantization)
+        ref_vectors, _ = _encode(baseline, queries)
+        new_vectors, _ = _encode(candidate, queries)
+        _, ref_doc_speed = _encode(baseline, docs[:64])
+        report["encode_ms_per_chunk"][reference] = round(ref_doc_speed * 1000, 2)
+
+        n = min(top_k, collection.count())
+        ref_hits = collection.query(query_embeddings=ref_vectors.tolist(), n_results=n, include=[])["ids"]
+        new_hits = collection.query(query_embeddings=new_vectors.tolist(), n_results=n, include=[])["ids"]
+        overlaps = [len(set(a) & set(b)) / max(1, len(a)) for a, b in zip(ref_hits, new_hits)]
+        same_top1 = [bool(a) and bool(b) and a[0] == b[0] for a, b in zip(ref_hits, new_hits)]
+        query_cosines = np.sum(_normalize(ref_vectors) * _normalize(new_vectors), axis=1)
+        report["queries"] = {
+            "count": len(queries),
+            "top_k": n,
+            "mean_overlap_at_k": round(float(np.mean(overlaps)), 4),
+            "min_overlap_at_k": round(float(np.min(overlaps)), 4),
+            "same_top1": sum(same_top1),
+            "mean_cosine": round(float(query_cosines.mean()), 5),
+        }
+    return report
+
+
+def print_report(report: dict) -> None:
+    docs = report["documents"]
+    print("=" * 60)
+    print(f"  EMBEDDING PARITY: {report['backend']} vs index ({report['reference']})")
+    print("=" * 60)
+    print(f"  Model:             {report['model']}")
+    print(f"  Chunks sampled:    {docs['sampled']}")
+    print(f"  Cosine mean/p5/min {docs['mean_cosine']:.5f} / {docs['p5_cosine']:.5f} / {docs['min_cosine']:.5f}")
+    print(f"  Mean drift:        {docs['mean_drift']:.5f}")
+    queries = report.get("queries")
+    if queries:
+        print(f"  Query top-{queries['top_k']} overlap: mean {queries['mean_overlap_at_k']:.2%}, "
+              f"min {queries['min_overlap_at_k']:.2%}")
+        print(f"  Same top-1 result: {queries['same_top1']}/{queries['count']}")
+    for backend, ms in report["encode_ms_per_chunk"].items():
+        print(f"  Encode ({backend}):   {ms} ms/chunk")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compare an embedding backend against the ChromaDB index")
+    parser.add_argument("--backend", required=True, choices=EMBEDDING_BACKENDS)
+    parser.add_argument("--reference", default="torch", choices=EMBEDDING_BACKENDS,
+                        help="Backend the index was built with (default: torch)")
+    parser.add_argument("--sample", type=int, default=256, help="Indexed chunks to re-encode")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--quantization", default=EMBEDDING_ONNX_QUANTIZATION,
+                        help="ONNX int8 target: arm64, avx2, avx512, avx512_vnni")
+    parser.add_argument("--min-cosine", type=float, default=None,
+                        help="Exit with status 1 when the mean document cosine is below this")
+    args = parser.parse_args(argv)
+
+    report = check_parity(args.backend, args.reference, args.sample, args.top_k, quantization=args.quantization)
+    print_report(report)
+    if args.min_cosine is not None and report["documents"]["mean_cosine"] < args.min_cosine:
+        print(f"\n⚠ Mean cosine below {args.min_cosine}: re-embed the index before switching backends")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
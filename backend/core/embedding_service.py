@@ -0,0 +1,308 @@
+"""
+Shared embedding service.
+One local process owns the embedding model and serves encode requests over a
+Unix socket, so several API worker processes share a single copy of the
+model instead of loading ~420MB each. Requests that arrive while the model
+is busy are micro-batched: the next encode call takes every queued request
+(query requests before bulk ingest requests) up to EMBEDDING_SERVICE_MAX_BATCH
+texts, after waiting at most EMBEDDING_SERVICE_MAX_WAIT_MS for company.
+
+Run it with:
+    python -m backend.core.embedding_service
+and set EMBEDDING_SERVICE_SOCKET in the API's environment; embed_text(),
+embed_queries() and embed_texts() in backend.core.database then use it.
+
+Wire format (both directions): a 5-byte header, struct ">BI" (kind, length),
+followed by `length` bytes. Requests are JSON (kind REQUEST):
+{"op": "encode", "texts": [...], "priority": "query"|"bulk"} or {"op": "stats"}.
+Responses are VECTORS (">II" rows, dim + float32 row-major data), JSON or ERROR.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import struct
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from .config import (
+    EMBEDDING_MODEL,
+    EMBEDDING_BACKEND,
+    EMBEDDING_SERVICE_SOCKET,
+    EMBEDDING_SERVICE_MAX_BATCH,
+    EMBEDDING_SERVICE_MAX_WAIT_MS,
+    EMBEDDING_SERVICE_TIMEOUT,
+)
+
+
+REQUEST, VECTORS, JSON, ERROR = range(4)
+_HEADER = struct.Struct(">BI")
+_SHAPE = struct.Struct(">II")
+
+
+class EmbeddingServiceError(RuntimeError):
+    """The service answered with an error (as opposed to being unreachable)."""
+
+
+# ---------------------------------------------------------------------------
+# SERVER
+# ---------------------------------------------------------------------------
+@dataclass
+class _Pending:
+    texts: list[str]
+    future: asyncio.Future
+    queued_at: float = field(default_factory=time.perf_counter)
+
+
+class EmbeddingServer:
+    """Owns the model; batches concurrent encode requests into shared model calls."""
+
+    def __init__(self, model, max_batch: int = EMBEDDING_SERVICE_MAX_BATCH, max_wait_ms: float = EMBEDDING_SERVICE_MAX_WAIT_MS):
+        self.model = model
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait_ms / 1000
+        self._queues = {"query": deque(), "bulk": deque()}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._encoder = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedding-service")
+        self.requests = 0
+        self.batches = 0
+        self.texts = 0
+        self.encode_seconds = 0.0
+        self.started = time.time()
+
+    # -- batching ----------------------------------------------------------
+    def _queued_texts(self) -> int:
+        return sum(len(p.texts) for queue in self._queues.values() for p in queue)
+
+    def _take_batch(self) -> list[_Pending]:
+        """Queued requests up to max_batch texts, queries first (always at least one request)."""
+        batch, size = [], 0
+        for queue in (self._queues["query"], self._queues["bulk"]):
+            while queue and (not batch or size + len(queue[0].texts) <= self.max_batch):
+                pending = queue.popleft()
+                batch.append(pending)
+                size += len(pending.texts)
+        return batch
+
+    async def _batcher(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            if not any(self._queues.values()):
+                self._wakeup.clear()
+                await self._wakeup.wait()
+            # Give concurrent callers a moment to join this batch
+            if self.max_wait and self._queued_texts() < self.max_batch:
+                await asyncio.sleep(self.max_wait)
+            batch = self._take_batch()
+            texts = list(dict.fromkeys(t for p in batch for t in p.texts))
+            start = time.perf_counter()
+            try:
+                vectors = await loop.run_in_executor(self._encoder, self._encode, texts)
+            except Exception as e:
+                for pending in batch:
+                    if not pending.future.done():
+                        pending.future.set_exception(e)
+                continue
+            self.batches += 1
+            self.texts += len(texts)
+            self.encode_seconds += time.perf_counter() - start
+            row = {text: i for i, text in enumerate(texts)}
+            for pending in batch:
+                if not pending.future.done():
+                    pending.future.set_result(vectors[[row[t] for t in pending.texts]])
+
+    def _encode(self, texts: list[str]) -> np.ndarray:
+        return np.asarray(self.model.encode(texts), dtype=np.float32)
+
+    async def encode(self, texts: list[str], priority: str = "query") -> np.ndarray:
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        pending = _Pending(texts, asyncio.get_running_loop().create_future())
+        self._queues["bulk" if priority == "bulk" else "query"].append(pending)
+        self.requests += 1
+        self._wakeup.set()
+        return await pending.future
+
+    def stats(self) -> dict:
+        return {
+            "model": EMBEDDING_MODEL,
+            "backend": EMBEDDING_BACKEND,
+            "pid": os.getpid(),
+            "uptime_seconds": round(time.time() - self.started, 1),
+            "requests": self.requests,
+            "batches": self.batches,
+            "texts_encoded": self.texts,
+            "avg_batch_texts": round(self.texts / self.batches, 2) if self.batches else 0,
+            "encode_seconds": round(self.encode_seconds, 3),
+            "queued_texts": self._queued_texts(),
+            "max_batch": self.max_batch,
+            "max_wait_ms": self.max_wait * 1000,
+        }
+
+    # -- connections -------------------------------------------------------
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    kind, length = _HEADER.unpack(await reader.readexactly(_HEADER.size))
+                    body = await reader.readexactly(length)
+                except asyncio.IncompleteReadError:
+                    return
+                try:
+                    request = json.loads(body)
+                    if request.get("op") == "stats":
+                        writer.write(_frame(JSON, json.dumps(self.stats()).encode()))
+                    else:
+                        vectors = await self.encode(request["texts"], request.get("priority", "query"))
+                        writer.write(_frame(VECTORS, _SHAPE.pack(*vectors.shape) + vectors.tobytes()))
+                except Exception as e:
+                    writer.write(_frame(ERROR, json.dumps({"error": str(e) or type(e).__name__}).encode()))
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self, socket_path: str) -> None:
+        self._wakeup = asyncio.Event()
+        path = Path(socket_path)
+        if path.exists():
+            path.unlink()       # stale socket from a previous run
+        server = await asyncio.start_unix_server(self._handle, path=str(path))
+        batcher = asyncio.create_task(self._batcher())
+        print(f"✓ Embedding service listening on {path} ({EMBEDDING_MODEL}, {EMBEDDING_BACKEND})")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher.cancel()
+            self._encoder.shutdown(wait=False, cancel_futures=True)
+            if path.exists():
+                path.unlink()
+
+
+def _frame(kind: int, payload: bytes) -> bytes:
+    return _HEADER.pack(kind, len(payload)) + payload
+
+
+# ---------------------------------------------------------------------------
+# CLIENT
+# ---------------------------------------------------------------------------
+class EmbeddingServiceClient:
+    """Blocking client; one connection per calling thread, reconnected on failure."""
+
+    def __init__(self, socket_path: str, timeout: float = EMBEDDING_SERVICE_TIMEOUT):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.failures = 0
+        self.timeouts = 0
+
+    def _connection(self) -> socket.socket:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            conn.settimeout(self.timeout)
+            try:
+                conn.connect(self.socket_path)
+            except OSError:
+                conn.close()
+                raise
+            self._local.conn = conn
+        return conn
+
+    def _drop_connection(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        self._local.conn = None
+        if conn is not None:
+            conn.close()
+
+    def _recv_exactly(self, conn: socket.socket, size: int) -> bytes:
+        buf = bytearray()
+        while len(buf) < size:
+            chunk = conn.recv(size - len(buf))
+            if not chunk:
+                raise ConnectionError("embedding service closed the connection")
+            buf += chunk
+        return bytes(buf)
+
+    def _call(self, request: dict) -> tuple[int, bytes]:
+        payload = _frame(REQUEST, json.dumps(request).encode())
+        for attempt in range(2):
+            try:
+                conn = self._connection()
+                conn.sendall(payload)
+                kind, length = _HEADER.unpack(self._recv_exactly(conn, _HEADER.size))
+                body = self._recv_exactly(conn, length)
+                break
+            except (socket.timeout, TimeoutError):
+                # The service is up but busy: retrying (or loading a local
+                # model) would only add load. The half-read reply makes the
+                # connection unusable.
+                self._drop_connection()
+                with self._lock:
+                    self.failures += 1
+                    self.timeouts += 1
+                raise
+            except OSError:
+                # A kept-alive connection may have gone stale (service restarted): retry once
+                self._drop_connection()
+                if attempt:
+                    with self._lock:
+                        self.failures += 1
+                    raise
+        with self._lock:
+            self.requests += 1
+        if kind == ERROR:
+            raise EmbeddingServiceError(json.loads(body)["error"])
+        return kind, body
+
+    def encode(self, texts: list[str], priority: str = "query") -> np.ndarray:
+        """float32 matrix with one row per text (same as model.encode(texts))."""
+        _, body = self._call({"op": "encode", "texts": list(texts), "priority": priority})
+        rows, dim = _SHAPE.unpack(body[:_SHAPE.size])
+        return np.frombuffer(body, dtype=np.float32, offset=_SHAPE.size).reshape(rows, dim)
+
+    def stats(self) -> dict:
+        """The service's counters (raises OSError when it is unreachable)."""
+        _, body = self._call({"op": "stats"})
+        return json.loads(body)
+
+
+_client: Optional[EmbeddingServiceClient] = None
+
+
+def get_embedding_service_client() -> Optional[EmbeddingServiceClient]:
+    """The service client when EMBEDDING_SERVICE_SOCKET is set, else None."""
+    global _client
+    if _client is None and EMBEDDING_SERVICE_SOCKET:
+        _client = EmbeddingServiceClient(EMBEDDING_SERVICE_SOCKET)
+    return _client
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Serve embedding requests over a Unix socket")
+    parser.add_argument("--socket", default=EMBEDDING_SERVICE_SOCKET or "/tmp/capex-embedding.sock")
+    parser.add_argument("--max-batch", type=int, default=EMBEDDING_SERVICE_MAX_BATCH)
+    parser.add_argument("--max-wait-ms", type=float, default=EMBEDDING_SERVICE_MAX_WAIT_MS)
+    args = parser.parse_args(argv)
+
+    from .embedding_backends import load_embedding_model
+    print(f"Loading embedding model ({EMBEDDING_BACKEND})...")
+    server = EmbeddingServer(load_embedding_model(EMBEDDING_MODEL, EMBEDDING_BACKEND), args.max_batch, args.max_wait_ms)
+    try:
+        asyncio.run(server.serve(args.socket))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Bounded thread pools for blocking work (embedding, vector search, LLM calls,
+ingest upserts).
+Async route handlers await run_in_pool() instead of calling SentenceTransformer,
+ChromaDB or the synchronous Anthropic client directly, so one slow request
+never stalls the event loop (and the SSE streams it is serving).
+"""
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Iterator
+
+from .config import EMBEDDING_WORKERS, SEARCH_WORKERS, LLM_WORKERS
+
+
+# Pool name -> max worker threads
+POOL_SIZES = {
+    "embedding": EMBEDDING_WORKERS,
+    "search": SEARCH_WORKERS,
+    "llm": LLM_WORKERS,
+    "ingest": 1,    # filings are applied to the collection one at a time
+}
+
+_executors: dict[str, ThreadPoolExecutor] = {}
+_executors_lock = threading.Lock()
+_counters = {pool: {"submitted": 0, "active": 0, "completed": 0, "failed": 0} for pool in POOL_SIZES}
+_counters_lock = threading.Lock()
+
+
+def _thread_prefix(pool: str) -> str:
+    return f"{pool}-pool"
+
+
+def get_executor(pool: str) -> ThreadPoolExecutor:
+    """Get (or lazily create) the named thread pool."""
+    if pool not in POOL_SIZES:
+        raise ValueError(f"Unknown executor pool: {pool}")
+    executor = _executors.get(pool)
+    if executor is None:
+        with _executors_lock:
+            executor = _executors.get(pool)
+            if executor is None:
+                executor = ThreadPoolExecutor(
+                    max_workers=POOL_SIZES[pool],
+                    thread_name_prefix=_thread_prefix(pool),
+                )
+                _executors[pool] = executor
+    return executor
+
+
+def in_pool(pool: str) -> bool:
+    """True when the current thread is a worker of the named pool."""
+    return threading.current_thread().name.startswith(_thread_prefix(pool))
+
+
+def _tracked(pool: str, fn: Callable, *args, **kwargs):
+    counters = _counters[pool]
+    with _counters_lock:
+        counters["active"] += 1
+    outcome = "failed"
+    try:
+        result = fn(*args, **kwargs)
+        outcome = "completed"
+        return result
+    finally:
+        with _counters_lock:
+            counters["active"] -= 1
+            counters[outcome] += 1
+
+
+def _submit(pool: str, fn: Callable, *args, **kwargs):
+    executor = get_executor(pool)
+    with _counters_lock:
+        _counters[pool]["submitted"] += 1
+    # Carry context variables (request-scoped state) into the worker thread
+    ctx = contextvars.copy_context()
+    return executor.submit(ctx.run, _tracked, pool, fn, *args, **kwargs)
+
+
+def run_blocking(pool: str, fn: Callable, *args, **kwargs):
+    """
+    Run fn on the named pool from synchronous code and wait for the result.
+
+    Bounds concurrency for callers that are already on a worker thread (e.g.
+    analytics running on the search pool asking for embeddings). Runs inline
+    when called from a thread of the same pool, so nested calls can't deadlock.
+    """
+    if in_pool(pool):
+        return fn(*args, **kwargs)
+    return _submit(pool, fn, *args, **kwargs).result()
+
+
+async def run_in_pool(pool: str, fn: Callable, *args, **kwargs):
+    """Await fn(*args, **kwargs) executed on the named pool."""
+    return await asyncio.wrap_future(_submit(pool, fn, *args, **kwargs))
+
+
+async def iterate_in_pool(pool: str, iterator: Iterator) -> AsyncIterator:
+    """
+    Drive a blocking iterator (e.g. a streaming LLM response) from async code.
+
+    Each next() runs on the named pool; the iterator is closed on the pool if
+    the consumer stops early (client disconnect).
+    """
+    sentinel = object()
+    iterator = iter(iterator)
+    try:
+        while True:
+            item = await run_in_pool(pool, next, iterator, sentinel)
+            if item is sentinel:
+                break
+            yield item
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            await run_in_pool(pool, close)
+
+
+def offloaded(pool: str, fn: Callable) -> Callable:
+    """Build an async wrapper that runs fn on the named pool."""
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        return await run_in_pool(pool, fn, *args, **kwargs)
+    wrapper.__name__ = f"a{fn.__name__}"
+    wrapper.__qualname__ = wrapper.__name__
+    return wrapper
+
+
+def executor_stats() -> dict:
+    """Per-pool size, queue depth and task counters."""
+    with _counters_lock:
+        stats = {pool: {"max_workers": size, **_counters[pool]} for pool, size in POOL_SIZES.items()}
+    for pool, executor in list(_executors.items()):
+        stats[pool]["queued"] = executor._work_queue.qsize()
+    return stats
+
+
+def shutdown_executors(wait: bool = False) -> None:
+    """Stop all pools (called on application shutdown)."""
+    with _executors_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,118 @@
+"""
+On-disk cache of extracted document content (text, tables).
+PDF/HTML extraction is the slowest CPU step of every consumer (build script,
+ingestion processor, table extractor, analysis tool), so results are stored
+once per file content hash and extractor version and reused by all of them.
+Renaming/moving a file keeps its cache entry; editing it or bumping the
+extractor version misses. Entries are JSON files under data/extraction_cache.
+"""
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from .config import EXTRACTION_CACHE_ENABLED, EXTRACTION_CACHE_DIR
+from .content_manifest import file_sha256
+
+
+# Plain-text extractors shared by several consumers: (namespace, version).
+# Bump the version when the extraction logic behind a namespace changes.
+HTML_TEXT = ("html_text", 1)    # BeautifulSoup get_text("\n", strip=True), scripts/styles removed
+PDF_TEXT = ("pdf_text", 1)      # pdfplumber extract_text() per page joined by blank lines (PyPDF2 fallback)
+PDF_LAYOUT = ("pdf_layout", 1)  # layout_text.read_pdf_layout(): tables as Markdown
+HTML_LAYOUT = ("html_layout", 1)  # layout_text.read_html_layout(): tables as Markdown
+
+
+class ExtractionCache:
+    """extractor name + version + file SHA-256 -> extracted value (JSON-serializable)."""
+
+    def __init__(self, root: Path, enabled: bool = True):
+        self.root = Path(root)
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+
+    def _entry_path(self, extractor: str, version: int, sha: str) -> Path:
+        return self.root / extractor / f"v{version}" / sha[:2] / f"{sha}.json"
+
+    def get(self, extractor: str, version: int, sha: str) -> Optional[Any]:
+        """The cached value, or None on a miss (or unreadable entry)."""
+        if not self.enabled:
+            return None
+        path = self._entry_path(extractor, version, sha)
+        try:
+            with open(path, encoding="utf-8") as f:
+                value = json.load(f)["value"]
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception as e:
+            print(f"⚠ Extraction cache entry unreadable ({path.name}): {e}")
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def contains(self, extractor: str, version: int, sha: str) -> bool:
+        return self.enabled and self._entry_path(extractor, version, sha).exists()
+
+    def put(self, extractor: str, version: int, sha: str, value: Any) -> None:
+        """Store a value atomically (safe with concurrent writer processes)."""
+        if not self.enabled:
+            return
+        path = self._entry_path(extractor, version, sha)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"extractor": extractor, "version": version, "sha256": sha, "value": value}, f)
+            os.replace(tmp, path)
+        except Exception as e:
+            print(f"⚠ Extraction cache save failed: {e}")
+
+    def stats(self) -> dict:
+        return {"enabled": self.enabled, "hits": self.hits, "misses": self.misses}
+
+
+_cache: Optional[ExtractionCache] = None
+
+
+def get_extraction_cache() -> ExtractionCache:
+    """Get the process-wide extraction cache."""
+    global _cache
+    if _cache is None:
+        _cache = ExtractionCache(EXTRACTION_CACHE_DIR, enabled=EXTRACTION_CACHE_ENABLED)
+    return _cache
+
+
+def cached_extract(
+    path: Path,
+    extractor: str,
+    version: int,
+    extract_fn: Callable[[Path], Any],
+    sha: Optional[str] = None,
+) -> Any:
+    """
+    Return extract_fn(path), served from the cache when possible.
+
+    Empty results are returned but not cached: extractors that swallow
+    errors return "" / [] on failure, and that shouldn't stick.
+
+    Args:
+        path: File to extract
+        extractor: Cache namespace; consumers producing identical output share one
+        version: Bump whenever the extractor's output changes
+        extract_fn: The actual extraction; exceptions propagate and are not cached
+        sha: Content hash when the caller already computed it
+    """
+    cache = get_extraction_cache()
+    if not cache.enabled:
+        return extract_fn(path)
+    sha = sha or file_sha256(path)
+    value = cache.get(extractor, version, sha)
+    if value is None:
+        value = extract_fn(path)
+        if value:
+            cache.put(extractor, version, sha, value)
+    return value
@@ -0,0 +1,152 @@
+"""
+Layout-preserving text extraction: tables rendered as Markdown.
+Used by the build script for every PDF and by the structure-aware chunker
+(which keeps each Markdown table, with its header row, in one chunk).
+"""
+from pathlib import Path
+from typing import Optional
+
+from .pdf_parallel import extract_pdf_pages
+
+
+# ---------------------------------------------------------------------------
+# PDF
+# ---------------------------------------------------------------------------
+def _markdown_table(rows: list[list[str]]) -> str:
+    header = rows[0]
+    md_lines = ["| " + " | ".join(header) + " |"]
+    md_lines.append("| " + " | ".join(["---"] * len(header)) + " |")
+    for cells in rows[1:]:
+        if any(cells):
+            md_lines.append("| " + " | ".join(cells) + " |")
+    return "\n".join(md_lines)
+
+
+def _extract_page_with_tables(page) -> str:
+    """Extract text from a single pdfplumber page, rendering tables as Markdown."""
+    parts = []
+    tables = page.find_tables()
+    table_bboxes = [t.bbox for t in tables]
+
+    # Extract non-table text
+    if table_bboxes:
+        non_table_page = page
+        for bbox in table_bboxes:
+            clipped = (
+                max(0, bbox[0]), max(0, bbox[1]),
+                min(page.width, bbox[2]), min(page.height, bbox[3]),
+            )
+            try:
+                non_table_page = non_table_page.outside_bbox(clipped)
+            except Exception:
+                pass
+        text = non_table_page.extract_text() or ""
+        if text.strip():
+            parts.append(text)
+    else:
+        text = page.extract_text() or ""
+        if text.strip():
+            parts.append(text)
+
+    # Extract tables as Markdown
+    for table in tables:
+        rows = table.extract()
+        if not rows or len(rows) < 2:
+            continue
+        parts.append(_markdown_table([[cell.strip() if cell else "" for cell in row] for row in rows]))
+
+    return "\n\n".join(parts)
+
+
+def _extract_page_words(page) -> str:
+    """Word-level extraction for multi-column pages (correct reading order)."""
+    words = page.extract_words(x_tolerance=3, y_tolerance=3)
+    if not words:
+        return ""
+    # Group by y-position (lines), then sort each line by x
+    lines = {}
+    for w in words:
+        y_key = round(w["top"] / 3) * 3
+        lines.setdefault(y_key, []).append(w)
+    sorted_lines = sorted(lines.items())
+    result = []
+    for _, line_words in sorted_lines:
+        line_words.sort(key=lambda w: w["x0"])
+        result.append(" ".join(w["text"] for w in line_words))
+    return "\n".join(result)
+
+
+def layout_page_text(page) -> str:
+    """Tables-as-Markdown layout, word-level fallback for multi-column pages."""
+    page_text = _extract_page_with_tables(page)
+    if not page_text or len(page_text.strip()) < 20:
+        page_text = _extract_page_words(page)
+    return page_text
+
+
+def read_pdf_layout(path: Path, pages: Optional[list[str]] = None) -> str:
+    """
+    Layout text of a PDF (page-parallel for long documents).
+
+    Args:
+        path: PDF file
+        pages: Per-page layout text already extracted (e.g. by page-sharded workers)
+
+    Falls back to PyPDF2's plain text if pdfplumber fails entirely.
+    """
+    try:
+        if pages is None:
+            pages = extract_pdf_pages(path, layout_page_text)
+        text = "".join(page_text + "\n\n" for page_text in pages if page_text)
+        if text.strip():
+            return text
+    except Exception as e:
+        print(f" ⚠️  pdfplumber error, falling back to PyPDF2: {e}")
+
+    import PyPDF2
+    text = ""
+    try:
+        with open(path, "rb") as f:
+            for page in PyPDF2.PdfReader(f).pages:
+                t = page.extract_text()
+                if t:
+                    text += t + "\n"
+    except Exception as e:
+        print(f" ⚠️  PDF error: {e}")
+    return text
+
+
+# ---------------------------------------------------------------------------
+# HTML
+# ---------------------------------------------------------------------------
+def _html_table_rows(table) -> list[list[str]]:
+    """Non-empty rows of an HTML table, with columns empty in every row dropped."""
+    rows = []
+    for tr in table.find_all("tr"):
+        cells = [cell.get_text(" ", strip=True) for cell in tr.find_all(["td", "th"])]
+        if any(cells):
+            rows.append(cells)
+    if not rows:
+        return []
+    width = max(len(row) for row in rows)
+    rows = [row + [""] * (width - len(row)) for row in rows]
+    keep = [col for col in range(width) if any(row[col] for row in rows)]
+    return [[row[col] for col in keep] for row in rows]
+
+
+def read_html_layout(path: Path) -> str:
+    """Text of an HTML filing with each (innermost) table rendered as Markdown."""
+    from bs4 import BeautifulSoup
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        soup = BeautifulSoup(f.read(), "html.parser")
+    for el in soup(["script", "style", "head", "meta"]):
+        el.decompose()
+    for table in reversed(soup.find_all("table")):     # innermost first
+        if table.find("table"):
+            continue
+        rows = _html_table_rows(table)
+        if len(rows) < 2:
+            table.replace_with(" ".join(" ".join(row) for row in rows))
+        else:
+            table.replace_with("\n" + _markdown_table(rows) + "\n")
+    return soup.get_text(separator="\n", strip=True)
@@ -0,0 +1,276 @@
+"""
+Process-wide Anthropic client registry.
+One keep-alive connection pool per process (and one async pool per event loop)
+instead of a new client, connection pool and TLS handshake on every call, with
+a configurable cap on concurrent LLM requests and SDK retry/backoff.
+Set LLM_STUB=true (or call use_stub_transport()) to answer every request
+locally without network access, e.g. for tests.
+"""
+import asyncio
+import functools
+import inspect
+import json
+import threading
+import weakref
+from contextlib import asynccontextmanager, contextmanager
+from typing import TYPE_CHECKING, AsyncIterator, Callable, Iterator, Optional, Union
+
+import httpx
+
+if TYPE_CHECKING:
+    import anthropic    # imported on first client use
+
+from .config import (
+    ANTHROPIC_API_KEY,
+    LLM_MODEL,
+    LLM_MAX_CONNECTIONS,
+    LLM_KEEPALIVE_CONNECTIONS,
+    LLM_KEEPALIVE_EXPIRY,
+    LLM_MAX_CONCURRENCY,
+    LLM_MAX_RETRIES,
+    LLM_TIMEOUT,
+    LLM_STUB,
+)
+
+
+_client: Optional["anthropic.Anthropic"] = None
+_client_lock = threading.Lock()
+_sync_slots = threading.BoundedSemaphore(LLM_MAX_CONCURRENCY)
+
+# event loop -> (AsyncAnthropic, asyncio.Semaphore); httpx async pools are loop-bound
+_async_clients: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+_stub_responder: Optional[Callable] = None
+_use_stub = LLM_STUB
+
+
+# ---------------------------------------------------------------------------
+# STUB TRANSPORT
+# ---------------------------------------------------------------------------
+def _default_stub_responder(payload: dict) -> str:
+    return f"Stub response ({payload.get('model', LLM_MODEL)})"
+
+
+def _stub_content(payload: dict) -> list[dict]:
+    result = (_stub_responder or _default_stub_responder)(payload)
+    if isinstance(result, str):
+        return [{"type": "text", "text": result}]
+    return result
+
+
+def _stub_message(payload: dict, content: list[dict]) -> dict:
+    stop_reason = "tool_use" if any(b.get("type") == "tool_use" for b in content) else "end_turn"
+    return {
+        "id": "msg_stub",
+        "type": "message",
+        "role": "assistant",
+        "model": payload.get("model", LLM_MODEL),
+        "content": content,
+        "stop_reason": stop_reason,
+        "stop_sequence": None,
+        "usage": {"input_tokens": 0, "output_tokens": 0},
+    }
+
+
+def _stub_sse(payload: dict, content: list[dict]) -> bytes:
+    """Render a Messages API event stream for text content."""
+    def event(name: str, data: dict) -> str:
+        return f"event: {name}\ndata: {json.dumps(data)}\n\n"
+
+    message = _stub_message(payload, [])
+    parts = [event("message_start", {"type": "message_start", "message": message})]
+    text_blocks = [b for b in content if b.get("type") == "text"]
+    for index, block in enumerate(text_blocks):
+        parts.append(event("content_block_start", {
+            "type": "content_block_start", "index": index,
+            "content_block": {"type": "text", "text": ""},
+        }))
+        for word in block["text"].split(" "):
+            parts.append(event("content_block_delta", {
+                "type": "content_block_delta", "index": index,
+                "delta": {"type": "text_delta", "text": word + " "},
+            }))
+        parts.append(event("content_block_stop", {"type": "content_block_stop", "index": index}))
+    parts.append(event("message_delta", {
+        "type": "message_delta",
+        "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+        "usage": {"output_tokens": 0},
+    }))
+    parts.append(event("message_stop", {"type": "message_stop"}))
+    return "".join(parts).encode()
+
+
+def _stub_response(request: httpx.Request) -> httpx.Response:
+    payload = json.loads(request.content or b"{}")
+    content = _stub_content(payload)
+    if payload.get("stream"):
+        return httpx.Response(
+            200,
+            headers={"content-type": "text/event-stream"},
+            content=_stub_sse(payload, content),
+            request=request,
+        )
+    return httpx.Response(200, json=_stub_message(payload, content), request=request)
+
+
+class StubTransport(httpx.BaseTransport):
+    """Answers Messages API requests locally (no network)."""
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        return _stub_response(request)
+
+
+class AsyncStubTransport(httpx.AsyncBaseTransport):
+    """Async counterpart of StubTransport."""
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return _stub_response(request)
+
+
+def use_stub_transport(responder: Optional[Callable[[dict], Union[str, list]]] = None) -> None:
+    """
+    Route all LLM calls to the local stub transport.
+
+    Args:
+        responder: Optional callable receiving the request payload and
+            returning reply text or a list of content blocks
+    """
+    global _use_stub, _stub_responder
+    close_llm_clients()
+    _use_stub = True
+    _stub_responder = responder
+
+
+def use_live_transport() -> None:
+    """Undo use_stub_transport()."""
+    global _use_stub, _stub_responder
+    close_llm_clients()
+    _use_stub = False
+    _stub_responder = None
+
+
+# ---------------------------------------------------------------------------
+# CLIENT REGISTRY
+# ---------------------------------------------------------------------------
+def llm_available() -> bool:
+    """True when LLM calls can be made (API key set or stub transport active)."""
+    return bool(ANTHROPIC_API_KEY) or _use_stub
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=LLM_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=LLM_KEEPALIVE_EXPIRY,
+    )
+
+
+def get_anthropic_client() -> "anthropic.Anthropic":
+    """Get the shared synchronous Anthropic client."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                import anthropic
+                http_client = httpx.Client(
+                    limits=_limits(),
+                    transport=StubTransport() if _use_stub else None,
+                )
+                _client = anthropic.Anthropic(
+                    api_key=ANTHROPIC_API_KEY or "stub",
+                    max_retries=LLM_MAX_RETRIES,
+                    timeout=LLM_TIMEOUT,
+                    http_client=http_client,
+                )
+    return _client
+
+
+def _async_entry() -> tuple:
+    loop = asyncio.get_running_loop()
+    entry = _async_clients.get(loop)
+    if entry is None:
+        import anthropic
+        http_client = httpx.AsyncClient(
+            limits=_limits(),
+            transport=AsyncStubTransport() if _use_stub else None,
+        )
+        client = anthropic.AsyncAnthropic(
+            api_key=ANTHROPIC_API_KEY or "stub",
+            max_retries=LLM_MAX_RETRIES,
+            timeout=LLM_TIMEOUT,
+            http_client=http_client,
+        )
+        entry = (client, asyncio.Semaphore(LLM_MAX_CONCURRENCY))
+        _async_clients[loop] = entry
+    return entry
+
+
+def get_async_anthropic_client() -> "anthropic.AsyncAnthropic":
+    """Get the shared AsyncAnthropic client for the running event loop."""
+    return _async_entry()[0]
+
+
+def close_llm_clients() -> None:
+    """Close pooled connections (called on shutdown and when switching transports)."""
+    global _client
+    with _client_lock:
+        client, _client = _client, None
+    if client is not None:
+        client.close()
+    for loop, (async_client, _) in list(_async_clients.items()):
+        if loop.is_running() and not loop.is_closed():
+            loop.create_task(async_client.close())
+    _async_clients.clear()
+
+
+# ---------------------------------------------------------------------------
+# CALL HELPERS (apply the concurrency cap)
+# ---------------------------------------------------------------------------
+@functools.lru_cache(maxsize=1)
+def _create_params() -> frozenset:
+    import anthropic
+    return frozenset(inspect.signature(anthropic.resources.Messages.create).parameters) - {"self"}
+
+
+def _prepare(kwargs: dict) -> dict:
+    """Default the model and pass request fields the pinned SDK lacks (e.g. tools) via extra_body."""
+    kwargs.setdefault("model", LLM_MODEL)
+    create_params = _create_params()
+    unknown = {key: kwargs.pop(key) for key in list(kwargs) if key not in create_params}
+    if unknown:
+        kwargs["extra_body"] = {**(kwargs.get("extra_body") or {}), **unknown}
+    return kwargs
+
+
+def create_message(**kwargs):
+    """client.messages.create() on the shared client (model defaults to LLM_MODEL)."""
+    kwargs = _prepare(kwargs)
+    with _sync_slots:
+        return get_anthropic_client().messages.create(**kwargs)
+
+
+@contextmanager
+def stream_message(**kwargs) -> Iterator:
+    """client.messages.stream() on the shared client, holding a concurrency slot."""
+    kwargs = _prepare(kwargs)
+    with _sync_slots:
+        with get_anthropic_client().messages.stream(**kwargs) as stream:
+            yield stream
+
+
+async def acreate_message(**kwargs):
+    """Async client.messages.create() on the loop's shared client."""
+    kwargs = _prepare(kwargs)
+    client, slots = _async_entry()
+    async with slots:
+        return await client.messages.create(**kwargs)
+
+
+@asynccontextmanager
+async def astream_message(**kwargs) -> AsyncIterator:
+    """Async client.messages.stream() on the loop's shared client."""
+    kwargs = _prepare(kwargs)
+    client, slots = _async_entry()
+    async with slots:
+        async with client.messages.stream(**kwargs) as stream:
+            yield stream
@@ -0,0 +1,239 @@
+"""
+Near-duplicate chunk detection.
+Duplicated 8-K press releases, earnings presentations and transcripts put many
+almost identical chunks into capex_docs. Every chunk gets a 64-bit SimHash of
+its word 3-shingles at ingest (metadata "simhash", 16 hex digits); two chunks
+whose fingerprints differ in at most SIMHASH_MAX_DISTANCE bits are treated as
+near-duplicates.
+
+- search_reranked (and search_documents with dedup) collapses near-duplicates
+  so each result slot carries new information (collapse_near_duplicates).
+  Chunks without a stored fingerprint are only collapsed by their dup_of mark.
+- The dedup pass fingerprints chunks indexed before fingerprints existed and
+  marks every duplicate with "dup_of" (the id of the chunk kept for its
+  cluster). Chunks are marked rather than deleted, because deleted chunks
+  would be re-added the next time their file is indexed.
+
+Usage:
+    python -m backend.core.near_duplicates            # fingerprint + mark
+    python -m backend.core.near_duplicates --dry-run  # report only
+"""
+import argparse
+import hashlib
+import re
+from typing import Callable, Optional
+
+import numpy as np
+
+from .config import SIMHASH_MAX_DISTANCE
+
+
+_WORD = re.compile(r"[a-z0-9]+")
+_BITS = np.arange(64, dtype=np.uint64)
+SHINGLE_WORDS = 3
+# Filing types whose copy of a duplicated passage is kept (press releases and
+# exhibits usually repeat text from the periodic reports)
+PRIMARY_FILING_TYPES = ("10-K", "10-Q")
+
+
+def simhash(text: str) -> int:
+    """64-bit SimHash of the lowercase word 3-shingles of text (0 for empty text)."""
+    words = _WORD.findall((text or "").lower())
+    if not words:
+        return 0
+    shingles = [" ".join(words[i:i + SHINGLE_WORDS]) for i in range(max(1, len(words) - SHINGLE_WORDS + 1))]
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "little") for s in shingles),
+        dtype=np.uint64,
+        count=len(shingles),
+    )
+    ones = ((hashes[:, None] >> _BITS) & np.uint64(1)).sum(axis=0)
+    value = 0
+    for bit in np.nonzero(ones * 2 > len(shingles))[0]:
+        value |= 1 << int(bit)
+    return value
+
+
+def simhash_hex(text: str) -> str:
+    """simhash() as the 16-hex-digit string stored in chunk metadata."""
+    return f"{simhash(text):016x}"
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def _fingerprint(doc: dict) -> Optional[int]:
+    """The stored fingerprint (None for chunks indexed before fingerprints; run the dedup pass)."""
+    value = doc.get("simhash")
+    return int(value, 16) if value else None
+
+
+def collapse_near_duplicates(
+    docs: list[dict],
+    n_results: int,
+    max_distance: int = SIMHASH_MAX_DISTANCE,
+) -> list[dict]:
+    """
+    Walk ranked docs and keep the first n_results that are not near-duplicates
+    of a doc already kept (same dup_of cluster or SimHash within max_distance).
+    Nothing is hashed here: docs without a stored simhash only match by dup_of.
+    """
+    kept: list[dict] = []
+    fingerprints: list[int] = []
+    clusters: set[str] = set()
+    for doc in docs:
+        cluster = doc.get("dup_of") or doc.get("id")
+        fp = _fingerprint(doc)
+        if cluster in clusters:
+            continue
+        if fp and any(hamming(fp, other) <= max_distance for other in fingerprints):
+            continue
+        kept.append(doc)
+        if fp:
+            fingerprints.append(fp)
+        if cluster:
+            clusters.add(cluster)
+        if len(kept) >= n_results:
+            break
+    return kept
+
+
+# ---------------------------------------------------------------------------
+# DEDUP PASS
+# ---------------------------------------------------------------------------
+def _clusters(fingerprints: dict[str, int], max_distance: int) -> list[list[str]]:
+    """
+    Near-duplicate clusters (size > 1). Fingerprints are split into
+    max_distance + 1 bands; two within max_distance bits agree on at least one
+    band exactly, so only chunks sharing a band value are compared.
+    """
+    bands = max_distance + 1
+    width = 64 // bands
+    parent = {chunk_id: chunk_id for chunk_id in fingerprints}
+
+    def find(x: str) -> str:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for band in range(bands):
+        shift = band * width
+        mask = (1 << (64 - shift if band == bands - 1 else width)) - 1
+        buckets: dict[int, list[str]] = {}
+        for chunk_id, fp in fingerprints.items():
+            buckets.setdefault((fp >> shift) & mask, []).append(chunk_id)
+        for members in buckets.values():
+            for i, a in enumerate(members):
+                for b in members[i + 1:]:
+                    if find(a) != find(b) and hamming(fingerprints[a], fingerprints[b]) <= max_distance:
+                        parent[find(a)] = find(b)
+
+    groups: dict[str, list[str]] = {}
+    for chunk_id in fingerprints:
+        groups.setdefault(find(chunk_id), []).append(chunk_id)
+    return [members for members in groups.values() if len(members) > 1]
+
+
+def dedup_collection(
+    collection,
+    max_distance: int = SIMHASH_MAX_DISTANCE,
+    dry_run: bool = False,
+    page_size: int = 2000,
+    on_update: Optional[Callable[[list[str], list[dict]], None]] = None,
+) -> dict:
+    """
+    Fingerprint unfingerprinted chunks and mark near-duplicates with dup_of.
+    on_update(ids, metadatas) is called after every collection.update() so
+    the caller can keep its indexes (and cache generation) in step, e.g.
+    database.record_upsert.
+
+    Returns counts of chunks, newly fingerprinted chunks, clusters and
+    duplicates (chunks other than the one kept per cluster).
+    """
+    fingerprints: dict[str, int] = {}
+    metadatas: dict[str, dict] = {}
+    fingerprinted = 0
+    offset = 0
+    while True:
+        page = collection.get(include=["documents", "metadatas"], limit=page_size, offset=offset)
+        ids = page.get("ids") or []
+        if not ids:
+            break
+        new_ids, new_meta = [], []
+        for chunk_id, text, meta in zip(ids, page.get("documents") or [], page.get("metadatas") or []):
+            meta = dict(meta or {})
+            if not meta.get("simhash"):
+                meta["simhash"] = simhash_hex(text)
+                new_ids.append(chunk_id)
+                new_meta.append(meta)
+            fingerprints[chunk_id] = int(meta["simhash"], 16)
+            metadatas[chunk_id] = meta
+        if new_ids and not dry_run:
+            collection.update(ids=new_ids, metadatas=new_meta)
+            if on_update:
+                on_update(new_ids, new_meta)
+        fingerprinted += len(new_ids)
+        offset += len(ids)
+        if len(ids) < page_size:
+            break
+
+    # Empty chunks all hash to 0; they are not duplicates of each other
+    clusters = _clusters({k: v for k, v in fingerprints.items() if v}, max_distance)
+
+    update_ids, update_meta = [], []
+    duplicates = 0
+    for members in clusters:
+        keep = min(members, key=lambda chunk_id: (
+            metadatas[chunk_id].get("filing_type") not in PRIMARY_FILING_TYPES, chunk_id,
+        ))
+        for chunk_id in members:
+            dup_of = "" if chunk_id == keep else keep
+            duplicates += bool(dup_of)
+            if metadatas[chunk_id].get("dup_of", "") != dup_of:
+                update_ids.append(chunk_id)
+                update_meta.append({**metadatas[chunk_id], "dup_of": dup_of})
+    # Chunks whose cluster dissolved (e.g. the kept chunk changed) are unmarked
+    clustered = {chunk_id for members in clusters for chunk_id in members}
+    for chunk_id, meta in metadatas.items():
+        if meta.get("dup_of") and chunk_id not in clustered:
+            update_ids.append(chunk_id)
+            update_meta.append({**meta, "dup_of": ""})
+
+    if update_ids and not dry_run:
+        for start in range(0, len(update_ids), page_size):
+            ids, metas = update_ids[start:start + page_size], update_meta[start:start + page_size]
+            collection.update(ids=ids, metadatas=metas)
+            if on_update:
+                on_update(ids, metas)
+    return {
+        "chunks": len(fingerprints),
+        "fingerprinted": fingerprinted,
+        "clusters": len(clusters),
+        "duplicates": duplicates,
+        "marked": len(update_ids),
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Fingerprint chunks and mark near-duplicates in capex_docs")
+    parser.add_argument("--max-distance", type=int, default=SIMHASH_MAX_DISTANCE,
+                        help="Max differing SimHash bits for near-duplicates")
+    parser.add_argument("--dry-run", action="store_true", help="Report without updating the collection")
+    args = parser.parse_args(argv)
+
+    from .database import get_collection, record_upsert, save_metadata_index
+    print("Scanning capex_docs for near-duplicate chunks...")
+    report = dedup_collection(get_collection(), args.max_distance, args.dry_run, on_update=record_upsert)
+    if not args.dry_run:
+        save_metadata_index()
+    share = report["duplicates"] / report["chunks"] if report["chunks"] else 0
+    print(f"✓ {report['chunks']} chunks, {report['fingerprinted']} newly fingerprinted")
+    print(f"✓ {report['clusters']} near-duplicate clusters, {report['duplicates']} duplicates ({share:.1%})")
+    if not args.dry_run:
+        print(f"✓ Updated dup_of on {report['marked']} chunks")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Page-parallel PDF extraction.
+A long PDF (e.g. a 300-page 10-K) is split into page ranges that worker
+processes extract independently; the per-page text comes back in page order.
+Short PDFs, and calls made from inside a worker process, run serially.
+
+Page functions (page -> str) must be module-level so they can be pickled.
+"""
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Optional
+
+from .config import PDF_WORKERS, PDF_PARALLEL_MIN_PAGES, PDF_PAGES_PER_SHARD
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_in_worker = False
+
+
+def mark_worker_process() -> None:
+    """Pool initializer: extraction inside this process stays serial (no nested pools)."""
+    global _in_worker
+    _in_worker = True
+
+
+def get_pdf_pool() -> ProcessPoolExecutor:
+    """Get (or lazily create) the shared extraction process pool."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(max_workers=PDF_WORKERS, initializer=mark_worker_process)
+    return _pool
+
+
+def shutdown_pdf_pool(wait: bool = False) -> None:
+    """Stop the extraction pool (called on application shutdown)."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=wait, cancel_futures=True)
+
+
+# ---------------------------------------------------------------------------
+# PAGE FUNCTIONS / SHARDS
+# ---------------------------------------------------------------------------
+def plain_page_text(page) -> str:
+    """pdfplumber's default text layout for one page."""
+    return page.extract_text() or ""
+
+
+def page_count(path: Path) -> int:
+    import pdfplumber
+    with pdfplumber.open(path) as pdf:
+        return len(pdf.pages)
+
+
+def extract_page_range(path: Path, start: int, end: int, page_fn: Callable = plain_page_text) -> list[str]:
+    """Text of pages [start, end), one entry per page."""
+    import pdfplumber
+    texts = []
+    with pdfplumber.open(path) as pdf:
+        for page in pdf.pages[start:end]:
+            texts.append(page_fn(page) or "")
+            page.flush_cache()      # keep worker memory flat on long ranges
+    return texts
+
+
+def shard_ranges(pages: int, per_shard: int = PDF_PAGES_PER_SHARD) -> list[tuple[int, int]]:
+    per_shard = max(1, per_shard)
+    return [(start, min(start + per_shard, pages)) for start in range(0, pages, per_shard)]
+
+
+def should_shard(path: Path, pages: Optional[int] = None) -> bool:
+    """True when the PDF is long enough to be worth splitting across processes."""
+    if _in_worker or PDF_WORKERS <= 1 or Path(path).suffix.lower() != ".pdf":
+        return False
+    if pages is None:
+        pages = page_count(path)
+    return pages >= PDF_PARALLEL_MIN_PAGES
+
+
+def submit_page_shards(
+    executor: Executor,
+    path: Path,
+    page_fn: Callable = plain_page_text,
+    pages: Optional[int] = None,
+) -> list[Future]:
+    """
+    Submit one extract_page_range() task per shard to an existing pool.
+
+    For callers that schedule shards alongside their own work (e.g. the
+    build pipeline); join the futures, in order, with join_shards().
+    """
+    if pages is None:
+        pages = page_count(path)
+    return [
+        executor.submit(extract_page_range, path, start, end, page_fn)
+        for start, end in shard_ranges(pages)
+    ]
+
+
+def join_shards(futures: list[Future]) -> list[str]:
+    """Per-page text in page order (re-raises the first shard error)."""
+    return [text for future in futures for text in future.result()]
+
+
+# ---------------------------------------------------------------------------
+# PUBLIC API
+# ---------------------------------------------------------------------------
+def extract_pdf_pages(path: Path, page_fn: Callable = plain_page_text) -> list[str]:
+    """
+    Extract every page of a PDF, page-parallel when it is long enough.
+
+    Args:
+        path: PDF file
+        page_fn: Module-level function turning a pdfplumber page into text
+
+    Returns:
+        One text entry per page, in page order
+    """
+    pages = page_count(path)
+    if not should_shard(path, pages):
+        return extract_page_range(path, 0, pages, page_fn)
+    return join_shards(submit_page_shards(get_pdf_pool(), path, page_fn, pages))
+
+
+def extract_pdf_text(path: Path, page_fn: Callable = plain_page_text, separator: str = "\n\n") -> str:
+    """Non-empty pages of extract_pdf_pages(), each followed by the separator."""
+    return "".join(text + separator for text in extract_pdf_pages(path, page_fn) if text)
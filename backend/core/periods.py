@@ -0,0 +1,128 @@
+"""
+Numeric fiscal periods for chunk metadata.
+Chunks carry fiscal_year/quarter as strings ("FY25", "2024", "Q3", "").
+At ingest they also get integer fields ChromaDB can filter on:
+  fy_int          four-digit fiscal year (0 = unknown)
+  q_int           quarter 1-4 (0 = unknown / annual)
+  period_ordinal  consecutive quarter number, fy_int * 4 + quarter - 1
+                  (annual/unknown quarter counts as Q4; 0 = unknown year)
+so year questions become `where={"fy_int": 2024}` and recency questions a
+`period_ordinal >= ...` range instead of post-hoc string matching.
+
+Backfill an existing collection with:
+    python -m backend.core.periods
+"""
+import re
+from typing import Callable, Optional
+
+
+PERIOD_FIELDS = ("fy_int", "q_int", "period_ordinal")
+
+
+def parse_fiscal_year(value) -> int:
+    """"FY25", "FY2025", "fiscal 2025", "2025" -> 2025; 0 when there is no year."""
+    text = str(value or "")
+    match = re.search(r"(?<!\d)(20\d{2}|19\d{2})(?!\d)", text)
+    if match:
+        return int(match.group(1))
+    match = re.search(r"FY\s*'?(\d{2})(?!\d)", text, re.IGNORECASE)
+    if match:
+        return 2000 + int(match.group(1))
+    return 0
+
+
+def parse_quarter(value) -> int:
+    """"Q3" -> 3; 0 when there is no quarter."""
+    match = re.search(r"Q([1-4])", str(value or ""), re.IGNORECASE)
+    return int(match.group(1)) if match else 0
+
+
+def period_ordinal(fy_int: int, q_int: int) -> int:
+    if not fy_int:
+        return 0
+    return fy_int * 4 + (q_int or 4) - 1
+
+
+def fiscal_period(period_end: str, fiscal_year_end_month: int = 12) -> tuple[str, str]:
+    """
+    ("FY25", "Q1") for a reporting period ending on period_end ("2024-06-30")
+    at a company whose fiscal year ends in fiscal_year_end_month. The fiscal
+    year is named for the calendar year it ends in, so Flex (March year end)
+    labels June 2024 as FY25 Q1 and a December year end keeps the calendar year.
+    """
+    year, month = int(period_end[:4]), int(period_end[5:7])
+    fy = year + 1 if month > fiscal_year_end_month else year
+    quarter = (month - fiscal_year_end_month - 1) % 12 // 3 + 1
+    return f"FY{fy % 100:02d}", f"Q{quarter}"
+
+
+def last_quarter_end(filing_date: str, fiscal_year_end_month: int = 12) -> str:
+    """
+    "YYYY-MM" of the last fiscal quarter end before filing_date, the period a
+    10-K/10-Q filed that day most likely covers (when EDGAR gives no reportDate).
+    """
+    year, month = int(filing_date[:4]), int(filing_date[5:7])
+    while True:
+        month -= 1
+        if month == 0:
+            year, month = year - 1, 12
+        if (month - fiscal_year_end_month) % 3 == 0:
+            return f"{year:04d}-{month:02d}"
+
+
+def period_fields(fiscal_year, quarter) -> dict:
+    """Numeric period metadata for a chunk's fiscal_year/quarter strings."""
+    fy_int = parse_fiscal_year(fiscal_year)
+    q_int = parse_quarter(quarter)
+    return {"fy_int": fy_int, "q_int": q_int, "period_ordinal": period_ordinal(fy_int, q_int)}
+
+
+def with_period_fields(meta: dict) -> dict:
+    """meta plus the numeric fields (computed from its strings when missing)."""
+    if all(field in meta for field in PERIOD_FIELDS):
+        return meta
+    return {**meta, **period_fields(meta.get("fiscal_year"), meta.get("quarter"))}
+
+
+def backfill_period_fields(
+    collection,
+    page_size: int = 2000,
+    on_update: Optional[Callable[[list[str], list[dict]], None]] = None,
+) -> int:
+    """
+    Add the numeric period fields to chunks indexed before they existed.
+    on_update(ids, metadatas) is called after every collection.update() so
+    the caller can keep its indexes (and cache generation) in step, e.g.
+    database.record_upsert. Returns the number of chunks updated.
+    """
+    updated = 0
+    offset = 0
+    while True:
+        page = collection.get(include=["metadatas"], limit=page_size, offset=offset)
+        ids = page.get("ids") or []
+        if not ids:
+            break
+        missing_ids, missing_meta = [], []
+        for chunk_id, meta in zip(ids, page.get("metadatas") or [{}] * len(ids)):
+            meta = meta or {}
+            if not all(field in meta for field in PERIOD_FIELDS):
+                missing_ids.append(chunk_id)
+                missing_meta.append(with_period_fields(meta))
+        if missing_ids:
+            collection.update(ids=missing_ids, metadatas=missing_meta)
+            if on_update:
+                on_update(missing_ids, missing_meta)
+            updated += len(missing_ids)
+        offset += len(ids)
+        if len(ids) < page_size:
+            break
+    return updated
+
+
+if __name__ == "__main__":
+    from .database import get_collection, record_upsert, save_metadata_index
+    print("Backfilling fy_int / q_int / period_ordinal...")
+    updated = backfill_period_fields(get_collection(), on_update=record_upsert)
+    if updated:
+        save_metadata_index()
+    print(f"✓ Updated {updated} chunks")
@@ -0,0 +1,49 @@
+"""
+Token-bucket rate limiting for outbound API calls (e.g. SEC EDGAR's 10 req/s).
+One bucket is shared by every coroutine and thread in the process; callers
+reserve a slot under a lock and sleep until it comes due, so requests are
+spread evenly instead of bursting into 429s.
+"""
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    """Allows `rate` acquisitions per second with bursts of up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.acquired = 0
+        self.waited = 0.0
+
+    def _reserve(self) -> float:
+        """Take a token (possibly borrowing from the future); returns seconds to wait."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            self.acquired += 1
+            self.waited += delay
+            return delay
+
+    async def acquire(self) -> None:
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def acquire_sync(self) -> None:
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    def stats(self) -> dict:
+        return {"rate": self.rate, "acquired": self.acquired, "waited_seconds": round(self.waited, 3)}
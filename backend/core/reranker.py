@@ -0,0 +1,154 @@
+"""
+Optional cross-encoder re-ranking.
+A small CPU cross-encoder scores (query, chunk) pairs for the retriever's top
+candidates so chat and agentic answers can be grounded on 5-8 chunks instead
+of 15-30. Scoring runs in batches against a time budget (RERANKER_BUDGET_MS);
+when the budget runs out, or the model is not loaded yet, callers keep the
+retriever's ordering. Scores are cached per (query, chunk id).
+"""
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Optional
+
+from .config import (
+    RERANKER_ENABLED,
+    RERANKER_MODEL,
+    RERANKER_BATCH,
+    RERANKER_BUDGET_MS,
+    RERANKER_CACHE_SIZE,
+)
+from .embedding_cache import normalize_query_text
+
+
+class CrossEncoderReranker:
+    """Budgeted cross-encoder scoring with an LRU of (query, chunk id) -> score."""
+
+    def __init__(
+        self,
+        model_name: str = RERANKER_MODEL,
+        batch_size: int = RERANKER_BATCH,
+        budget_ms: float = RERANKER_BUDGET_MS,
+        cache_size: int = RERANKER_CACHE_SIZE,
+    ):
+        self.model_name = model_name
+        self.batch_size = max(1, batch_size)
+        self.budget_ms = budget_ms
+        self.cache_size = cache_size
+        self.model = None
+        self._cache: "OrderedDict[tuple, tuple[int, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self.calls = 0
+        self.reranked = 0
+        self.fallbacks = {"budget": 0, "not_ready": 0, "error": 0}
+        self.pairs_scored = 0
+        self.cache_hits = 0
+        self.score_seconds = 0.0
+
+    def load(self) -> None:
+        """Load the cross-encoder (call from startup warm-up, not per request)."""
+        with self._load_lock:
+            if self.model is None:
+                from sentence_transformers import CrossEncoder
+                self.model = CrossEncoder(self.model_name, device="cpu")
+
+    # ------------------------------------------------------------------
+    # Cache
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _key(query: str, doc: dict) -> tuple:
+        return normalize_query_text(query).lower(), doc.get("id") or doc["content"][:200]
+
+    def _cached(self, key: tuple, content: str) -> Optional[float]:
+        with self._lock:
+            entry = self._cache.get(key)
+            # A re-ingested chunk keeps its id; its text checksum tells us the score is stale
+            if entry is None or entry[0] != zlib.crc32(content.encode()):
+                return None
+            self._cache.move_to_end(key)
+            self.cache_hits += 1
+            return entry[1]
+
+    def _store(self, keys: list[tuple], contents: list[str], scores) -> None:
+        with self._lock:
+            for key, content, score in zip(keys, contents, scores):
+                self._cache[key] = (zlib.crc32(content.encode()), float(score))
+                self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    # ------------------------------------------------------------------
+    # Re-ranking
+    # ------------------------------------------------------------------
+    def rerank(self, query: str, docs: list[dict], top_k: int, budget_ms: Optional[float] = None) -> Optional[list[dict]]:
+        """
+        The top_k docs by cross-encoder score (each gets "rerank_score"), or
+        None when the model is not ready, scoring fails, or the budget runs
+        out before every candidate is scored.
+        """
+        self.calls += 1
+        if self.model is None:
+            self.fallbacks["not_ready"] += 1
+            return None
+        budget = (self.budget_ms if budget_ms is None else budget_ms) / 1000
+        deadline = time.perf_counter() + budget
+
+        keys = [self._key(query, doc) for doc in docs]
+        scores = [self._cached(key, doc["content"]) for key, doc in zip(keys, docs)]
+        missing = [i for i, score in enumerate(scores) if score is None]
+
+        for start in range(0, len(missing), self.batch_size):
+            if time.perf_counter() >= deadline:
+                self.fallbacks["budget"] += 1
+                return None
+            batch = missing[start:start + self.batch_size]
+            began = time.perf_counter()
+            try:
+                batch_scores = self.model.predict(
+                    [(query, docs[i]["content"]) for i in batch],
+                    batch_size=self.batch_size,
+                    show_progress_bar=False,
+                )
+            except Exception as e:
+                print(f"⚠ Re-ranking failed: {e}")
+                self.fallbacks["error"] += 1
+                return None
+            self.score_seconds += time.perf_counter() - began
+            self.pairs_scored += len(batch)
+            # Scores are cached as they arrive, so an over-budget query is cheaper next time
+            self._store([keys[i] for i in batch], [docs[i]["content"] for i in batch], batch_scores)
+            for i, score in zip(batch, batch_scores):
+                scores[i] = float(score)
+
+        self.reranked += 1
+        ranked = sorted(zip(scores, range(len(docs))), key=lambda item: item[0], reverse=True)[:top_k]
+        return [{**docs[i], "rerank_score": round(score, 4)} for score, i in ranked]
+
+    def stats(self) -> dict:
+        with self._lock:
+            cached = len(self._cache)
+        return {
+            "model": self.model_name,
+            "loaded": self.model is not None,
+            "budget_ms": self.budget_ms,
+            "calls": self.calls,
+            "reranked": self.reranked,
+            "fallbacks": dict(self.fallbacks),
+            "pairs_scored": self.pairs_scored,
+            "cache_hits": self.cache_hits,
+            "cache_entries": cached,
+            "avg_pair_ms": round(self.score_seconds * 1000 / self.pairs_scored, 2) if self.pairs_scored else 0,
+        }
+
+
+_reranker: Optional[CrossEncoderReranker] = None
+
+
+def get_reranker() -> Optional[CrossEncoderReranker]:
+    """The process-wide re-ranker when RERANKER_ENABLED, else None."""
+    global _reranker
+    if _reranker is None and RERANKER_ENABLED:
+        _reranker = CrossEncoderReranker()
+    return _reranker
@@ -0,0 +1,260 @@
+"""
+Persistent BM25 inverted index over the ChromaDB chunks.
+Dense retrieval matches exact financial labels ("Purchases of property and
+equipment") and tickers poorly; this sparse index scores them lexically so the
+retriever can fuse both rankings (see RETRIEVAL_MODE in config).
+Writers (processor, build_chromadb) record upserts and deletes here alongside
+the metadata index. Persisted as JSON next to chromadb_store.
+"""
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+
+from .periods import with_period_fields
+
+
+INDEX_VERSION = 2
+
+# BM25 parameters
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset("""
+a an and are as at be but by for from has have in is it its of on or that the
+their this to was were which will with we our us not no than these those such
+""".split())
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase alphanumeric terms without stopwords (shared by chunks and queries)."""
+    return [t for t in _TOKEN_RE.findall((text or "").lower()) if t not in STOPWORDS]
+
+
+class SparseIndex:
+    """Term frequencies per chunk plus postings (term -> {chunk id: tf}) for BM25 scoring."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._docs: dict[str, dict] = {}        # chunk id -> {"tf": {...}, "len": n, filter fields}
+        self._postings: dict[str, dict[str, int]] = {}
+        self._total_len = 0
+        self._loaded_mtime = 0.0
+        self._lock = threading.RLock()
+        self._sync_lock = threading.Lock()     # one reload/rebuild at a time
+
+    @property
+    def total(self) -> int:
+        return len(self._docs)
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+    def _add(self, chunk_id: str, entry: dict) -> None:
+        self._docs[chunk_id] = entry
+        self._total_len += entry["len"]
+        for term, tf in entry["tf"].items():
+            self._postings.setdefault(term, {})[chunk_id] = tf
+
+    def _discard(self, chunk_id: str) -> None:
+        entry = self._docs.pop(chunk_id, None)
+        if entry is None:
+            return
+        self._total_len -= entry["len"]
+        for term in entry["tf"]:
+            posting = self._postings.get(term)
+            if posting is not None:
+                posting.pop(chunk_id, None)
+                if not posting:
+                    del self._postings[term]
+
+    @staticmethod
+    def _filter_fields(meta: dict) -> dict:
+        meta = with_period_fields(meta)
+        return {
+            "company": meta.get("company", ""),
+            "filing_type": meta.get("filing_type", ""),
+            "fy": meta["fy_int"],
+            "period": meta["period_ordinal"],
+        }
+
+    def record_upsert(
+        self,
+        ids: list[str],
+        metadatas: list[dict],
+        documents: Optional[list[str]] = None,
+    ) -> None:
+        """
+        Account for chunks written with collection.upsert()/add().
+        Without documents (collection.update() of metadata only) the filter
+        fields of already indexed chunks are refreshed.
+        """
+        with self._lock:
+            for i, (chunk_id, meta) in enumerate(zip(ids, metadatas)):
+                meta = meta or {}
+                if documents is None:
+                    entry = self._docs.get(chunk_id)
+                    if entry is not None:
+                        entry.update(self._filter_fields(meta))
+                    continue
+                terms = tokenize(documents[i])
+                self._discard(chunk_id)
+                self._add(chunk_id, {
+                    "tf": dict(Counter(terms)),
+                    "len": len(terms),
+                    **self._filter_fields(meta),
+                })
+
+    def record_delete(self, ids: list[str]) -> None:
+        """Account for chunks removed with collection.delete()."""
+        with self._lock:
+            for chunk_id in ids:
+                self._discard(chunk_id)
+
+    def _swap(self, other: "SparseIndex") -> None:
+        """Take over other's contents (built without holding our lock, so searches keep running)."""
+        with self._lock:
+            self._docs, self._postings, self._total_len = other._docs, other._postings, other._total_len
+
+    def rebuild(self, collection, page_size: int = 2000) -> None:
+        """Rebuild from a (paged) full scan of the collection documents."""
+        fresh = SparseIndex(self.path)
+        offset = 0
+        while True:
+            page = collection.get(include=["documents", "metadatas"], limit=page_size, offset=offset)
+            ids = page.get("ids") or []
+            if not ids:
+                break
+            fresh.record_upsert(
+                ids,
+                page.get("metadatas") or [{}] * len(ids),
+                page.get("documents") or [""] * len(ids),
+            )
+            offset += len(ids)
+            if len(ids) < page_size:
+                break
+        self._swap(fresh)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    def search(
+        self,
+        query: str,
+        n_results: int = 20,
+        company_filter: Optional[str] = None,
+        filing_type_filter: Optional[str] = None,
+        fy_int: Optional[int] = None,
+        min_period: Optional[int] = None,
+    ) -> list[tuple[str, float]]:
+        """Top chunk ids by BM25 score, honouring the same filters as the dense search."""
+        terms = list(dict.fromkeys(tokenize(query)))
+        with self._lock:
+            n_docs = len(self._docs)
+            if not terms or not n_docs:
+                return []
+            avg_len = self._total_len / n_docs or 1.0
+            scores: dict[str, float] = {}
+            for term in terms:
+                posting = self._postings.get(term)
+                if not posting:
+                    continue
+                df = len(posting)
+                idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+                for chunk_id, tf in posting.items():
+                    entry = self._docs[chunk_id]
+                    if company_filter and entry["company"] != company_filter:
+                        continue
+                    if filing_type_filter and entry["filing_type"] != filing_type_filter:
+                        continue
+                    if fy_int and entry["fy"] != fy_int:
+                        continue
+                    if min_period and entry["period"] < min_period:
+                        continue
+                    norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * entry["len"] / avg_len)
+                    scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * tf * (BM25_K1 + 1) / norm
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return ranked[:n_results]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "chunks": len(self._docs),
+                "terms": len(self._postings),
+                "avg_chunk_terms": round(self._total_len / len(self._docs), 1) if self._docs else 0,
+            }
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def in_sync(self, count: int) -> bool:
+        """True when the index covers count chunks and nobody rewrote it on disk since."""
+        return self.total == count and not self.disk_changed()
+
+    def disk_changed(self) -> bool:
+        """True when the persisted index was rewritten since we loaded/saved it."""
+        try:
+            return self.path.stat().st_mtime > self._loaded_mtime
+        except OSError:
+            return False
+
+    def load(self) -> bool:
+        """Load from disk. Returns False when missing or unreadable."""
+        if not self.path.exists():
+            return False
+        try:
+            mtime = self.path.stat().st_mtime
+            with open(self.path) as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"⚠ Sparse index load failed: {e}")
+            return False
+        if data.get("version") != INDEX_VERSION:
+            return False
+
+        fresh = SparseIndex(self.path)
+        for chunk_id, entry in data.get("docs", {}).items():
+            fresh._add(chunk_id, entry)
+        self._swap(fresh)
+        self._loaded_mtime = mtime
+        return True
+
+    def save(self) -> None:
+        """Write the index atomically (postings are rebuilt from the per-chunk terms on load)."""
+        with self._lock:
+            data = json.dumps({"version": INDEX_VERSION, "docs": self._docs}, separators=(",", ":"))
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+            with open(tmp, "w") as f:
+                f.write(data)
+            os.replace(tmp, self.path)
+            self._loaded_mtime = self.path.stat().st_mtime
+        except Exception as e:
+            print(f"⚠ Sparse index save failed: {e}")
+
+
+def sync_sparse_index(index: SparseIndex, collection, expected_total: Optional[int] = None) -> None:
+    """
+    Make sure the sparse index matches the collection size.
+
+    Reloads from disk first (another process may have written it) and falls
+    back to a full rebuild only when the persisted index is also out of date.
+    Blocking: run it at build/startup time or in the background (searches
+    keep using the old contents until the new ones are swapped in).
+    """
+    count = collection.count() if expected_total is None else expected_total
+    with index._sync_lock:     # one rebuild, however many callers notice the mismatch
+        if index.in_sync(count):
+            return
+        if index.load() and index.total == count:
+            return
+        print(f"Rebuilding sparse index ({count} chunks)...")
+        index.rebuild(collection)
+        index.save()
@@ -0,0 +1,77 @@
+"""
+Startup phase timings and readiness.
+With FAST_START the API accepts traffic as soon as the routes are imported;
+the embedding model, ChromaDB and the collection stats load in the
+background. Each phase is timed here, and /api/health reports "warming"
+until the background phases have finished.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+
+class StartupTracker:
+    """Ordered phase timings plus the overall state (starting, warming, ready, degraded)."""
+
+    def __init__(self, started: Optional[float] = None):
+        self.started = started if started is not None else time.perf_counter()
+        self.state = "starting"
+        self.ready_after: Optional[float] = None
+        self._phases: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, seconds: float, error: Optional[str] = None) -> None:
+        with self._lock:
+            self._phases[name] = {
+                "seconds": round(seconds, 3),
+                "status": "failed" if error else "ok",
+                **({"error": error} if error else {}),
+            }
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a block as a startup phase; errors are recorded and re-raised."""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.record(name, time.perf_counter() - start, str(e) or type(e).__name__)
+            raise
+        self.record(name, time.perf_counter() - start)
+
+    def serving(self) -> None:
+        """The app accepts traffic; background phases may still be running."""
+        self.state = "warming"
+        self.record("accepting_traffic", time.perf_counter() - self.started)
+
+    def finished(self) -> None:
+        """All startup phases are done."""
+        with self._lock:
+            failed = any(phase["status"] == "failed" for phase in self._phases.values())
+        self.ready_after = round(time.perf_counter() - self.started, 3)
+        self.state = "degraded" if failed else "ready"
+
+    @property
+    def warming(self) -> bool:
+        return self.state in ("starting", "warming")
+
+    def report(self) -> dict:
+        with self._lock:
+            phases = {name: dict(phase) for name, phase in self._phases.items()}
+        return {"state": self.state, "ready_after_seconds": self.ready_after, "phases": phases}
+
+    def summary(self) -> str:
+        with self._lock:
+            return ", ".join(f"{name} {phase['seconds']:.2f}s" for name, phase in self._phases.items())
+
+
+_tracker: Optional[StartupTracker] = None
+
+
+def get_startup_tracker(started: Optional[float] = None) -> StartupTracker:
+    """Get the process-wide startup tracker (started: perf_counter() at process start)."""
+    global _tracker
+    if _tracker is None:
+        _tracker = StartupTracker(started)
+    return _tracker
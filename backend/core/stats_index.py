@@ -0,0 +1,256 @@
+"""
+Incrementally maintained metadata statistics for the ChromaDB collection.
+Writers (processor, build_chromadb) record upserts and deletes here so that
+collection stats are O(1) reads instead of a full-collection metadata scan.
+Persisted as JSON next to chromadb_store.
+"""
+import json
+import os
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+
+from .periods import parse_fiscal_year, parse_quarter, period_ordinal
+
+
+# Metadata fields aggregated by the index (stats key -> metadata key)
+STAT_FIELDS = {
+    "companies": "company",
+    "filing_types": "filing_type",
+    "fiscal_years": "fiscal_year",
+    "quarters": "quarter",
+    "source_files": "source_file",
+}
+# Fields reported by stats(); per-file counts grow with the corpus (see file_counts)
+SUMMARY_FIELDS = ("companies", "filing_types", "fiscal_years", "quarters")
+
+INDEX_VERSION = 1
+
+
+def _fields(meta: dict) -> dict:
+    return {
+        field: str(meta.get(key) or ("Unknown" if key != "quarter" else ""))
+        for field, key in STAT_FIELDS.items()
+    }
+
+
+def _group_key(fields: dict) -> str:
+    """Chunks sharing every aggregated field value are grouped together."""
+    return "\x1f".join(fields[field] for field in STAT_FIELDS)
+
+
+class MetadataIndex:
+    """Chunk ids grouped by metadata values plus running counters per field."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._groups: dict[str, dict] = {}      # group key -> {"fields": {...}, "ids": set()}
+        self._id_to_group: dict[str, str] = {}
+        self._counters: dict[str, Counter] = {field: Counter() for field in STAT_FIELDS}
+        self._total = 0
+        self._periods: Optional[dict[str, dict[int, int]]] = None   # derived, see company_periods()
+        self._loaded_mtime = 0.0
+        self._lock = threading.RLock()
+
+    @property
+    def total(self) -> int:
+        return self._total
+
+    # ------------------------------------------------------------------
+    # Counter bookkeeping
+    # ------------------------------------------------------------------
+    def _apply(self, fields: dict, delta: int) -> None:
+        for field, value in fields.items():
+            counter = self._counters[field]
+            counter[value] += delta
+            if counter[value] <= 0:
+                del counter[value]
+        self._total += delta
+        self._periods = None
+
+    def _reset(self) -> None:
+        self._groups.clear()
+        self._id_to_group.clear()
+        self._counters = {field: Counter() for field in STAT_FIELDS}
+        self._total = 0
+        self._periods = None
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+    def record_upsert(self, ids: list[str], metadatas: list[dict]) -> None:
+        """Account for chunks written with collection.upsert()/add()."""
+        with self._lock:
+            for chunk_id, meta in zip(ids, metadatas):
+                fields = _fields(meta or {})
+                key = _group_key(fields)
+                previous = self._id_to_group.get(chunk_id)
+                if previous == key:
+                    continue
+                if previous is not None:
+                    # Chunk re-upserted with different metadata: move its counts
+                    self._discard(chunk_id)
+
+                entry = self._groups.get(key)
+                if entry is None:
+                    entry = {"fields": fields, "ids": set()}
+                    self._groups[key] = entry
+                entry["ids"].add(chunk_id)
+                self._id_to_group[chunk_id] = key
+                self._apply(fields, 1)
+
+    def _discard(self, chunk_id: str) -> None:
+        key = self._id_to_group.pop(chunk_id, None)
+        if key is None:
+            return
+        entry = self._groups[key]
+        entry["ids"].discard(chunk_id)
+        self._apply(entry["fields"], -1)
+        if not entry["ids"]:
+            del self._groups[key]
+
+    def record_delete(self, ids: list[str]) -> None:
+        """Account for chunks removed with collection.delete()."""
+        with self._lock:
+            for chunk_id in ids:
+                self._discard(chunk_id)
+
+    def rebuild(self, collection, page_size: int = 5000) -> None:
+        """Rebuild from a (paged) full scan of the collection metadata."""
+        with self._lock:
+            self._reset()
+            offset = 0
+            while True:
+                page = collection.get(include=["metadatas"], limit=page_size, offset=offset)
+                ids = page.get("ids") or []
+                if not ids:
+                    break
+                self.record_upsert(ids, page.get("metadatas") or [{}] * len(ids))
+                offset += len(ids)
+                if len(ids) < page_size:
+                    break
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    def stats(self) -> dict:
+        """Total and per-field chunk counts (fixed size, whatever the corpus)."""
+        with self._lock:
+            result = {"total_documents": self._total}
+            for field in SUMMARY_FIELDS:
+                result[field] = dict(self._counters[field])
+            return result
+
+    def file_counts(self) -> dict[str, int]:
+        """Chunks per source file."""
+        with self._lock:
+            return dict(self._counters["source_files"])
+
+    def company_periods(self) -> dict[str, dict[int, int]]:
+        """
+        Per-company period index: company -> {period_ordinal: chunks}
+        (see backend.core.periods). Derived from the groups and cached until
+        the next write.
+        """
+        with self._lock:
+            if self._periods is None:
+                periods: dict[str, dict[int, int]] = {}
+                for entry in self._groups.values():
+                    fields = entry["fields"]
+                    ordinal = period_ordinal(
+                        parse_fiscal_year(fields["fiscal_years"]), parse_quarter(fields["quarters"]),
+                    )
+                    if ordinal:
+                        counts = periods.setdefault(fields["companies"], {})
+                        counts[ordinal] = counts.get(ordinal, 0) + len(entry["ids"])
+                self._periods = periods
+            return self._periods
+
+    def contains(self, ids: list[str]) -> bool:
+        """True when every id is currently indexed."""
+        with self._lock:
+            return all(chunk_id in self._id_to_group for chunk_id in ids)
+
+    def file_ids(self, company: str, source_file: str) -> set[str]:
+        """Chunk ids currently indexed for one source file."""
+        with self._lock:
+            ids = set()
+            for entry in self._groups.values():
+                fields = entry["fields"]
+                if fields["companies"] == company and fields["source_files"] == source_file:
+                    ids |= entry["ids"]
+            return ids
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def disk_changed(self) -> bool:
+        """True when the persisted index was rewritten since we loaded/saved it."""
+        try:
+            return self.path.stat().st_mtime > self._loaded_mtime
+        except OSError:
+            return False
+
+    def load(self) -> bool:
+        """Load from disk. Returns False when missing or unreadable."""
+        if not self.path.exists():
+            return False
+        try:
+            mtime = self.path.stat().st_mtime
+            with open(self.path) as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"⚠ Metadata index load failed: {e}")
+            return False
+        if data.get("version") != INDEX_VERSION:
+            return False
+
+        with self._lock:
+            self._reset()
+            for entry in data.get("groups", []):
+                ids = set(entry["ids"])
+                key = _group_key(entry["fields"])
+                self._groups[key] = {"fields": entry["fields"], "ids": ids}
+                for chunk_id in ids:
+                    self._id_to_group[chunk_id] = key
+                self._apply(entry["fields"], len(ids))
+            self._loaded_mtime = mtime
+        return True
+
+    def save(self) -> None:
+        """Write the index atomically."""
+        with self._lock:
+            data = {
+                "version": INDEX_VERSION,
+                "groups": [
+                    {"fields": entry["fields"], "ids": sorted(entry["ids"])}
+                    for entry in self._groups.values()
+                ],
+            }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+            with open(tmp, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp, self.path)
+            self._loaded_mtime = self.path.stat().st_mtime
+        except Exception as e:
+            print(f"⚠ Metadata index save failed: {e}")
+
+
+def sync_index(index: MetadataIndex, collection, expected_total: Optional[int] = None) -> None:
+    """
+    Make sure the index matches the collection size.
+
+    Reloads from disk first (another process may have written it) and falls
+    back to a full rebuild only when the persisted index is also out of date.
+    """
+    count = collection.count() if expected_total is None else expected_total
+    if index.total == count and not index.disk_changed():
+        return
+    if index.load() and index.total == count:
+        return
+    print(f"Rebuilding metadata index ({count} chunks)...")
+    index.rebuild(collection)
+    index.save()
@@ -100,9 +100,9 @@ def extract_capex(
     Returns:
         Dict with capex_value, unit, raw_value, confidence, etc.
     """
-    from backend.core.config import ANTHROPIC_API_KEY, LLM_MODEL
+    from backend.core.llm import llm_available, create_message
 
-    if not ANTHROPIC_API_KEY:
+    if not llm_available():
         return {"error": "ANTHROPIC_API_KEY not configured"}
 
     # Locate the Cash Flow Statement section
@@ -127,12 +127,8 @@ def extract_capex(
         + section
     )
 
-    import anthropic
-    client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
-
     try:
-        response = client.messages.create(
-            model=LLM_MODEL,
+        response = create_message(
             max_tokens=500,
             system=CAPEX_EXTRACTION_PROMPT,
             messages=[{"role": "user", "content": user_prompt}],
@@ -4,6 +4,7 @@ Ingestion module for automated data collection and processing.
 from .sec_downloader import SECDownloader, check_new_filings_sync
 from .scheduler import start_scheduler, stop_scheduler, get_scheduler_status
 from .processor import process_new_filings, process_filing
+from .jobs import IngestQueue, get_ingest_queue
 from .earnings_scraper import (
     EarningsCalendar,
     TranscriptScraper,
@@ -20,6 +21,8 @@ __all__ = [
     "get_scheduler_status",
     "process_new_filings",
     "process_filing",
+    "IngestQueue",
+    "get_ingest_queue",
     "EarningsCalendar",
     "TranscriptScraper",
     "EarningsDataManager",
@@ -7,7 +7,6 @@ import httpx
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
-from bs4 import BeautifulSoup
 
 from backend.core.config import COMPANIES, DATA_DIR
 
@@ -139,6 +138,7 @@ class TranscriptScraper:
             return []
         
         # Parse the page
+        from bs4 import BeautifulSoup
         soup = BeautifulSoup(response.text, "lxml")
         
         # Look for press release links
@@ -0,0 +1,372 @@
+"""
+Ingest job queue.
+New filings (from the scheduler or the ingestion API) are processed as jobs.
+One async runner takes jobs off the queue in order. For each file, text
+extraction (GIL-bound HTML/PDF parsing) runs in worker processes, a few
+files ahead, while the previous file is chunked, embedded and upserted on
+the single "ingest" thread, so the event loop never does ingest work.
+Files that fail are retried with doubling backoff. Job status and per-file
+progress are kept in memory for /api/ingestion/status.
+"""
+import asyncio
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from backend.core.config import INGEST_WORKERS, INGEST_MAX_RETRIES, INGEST_RETRY_BACKOFF, INGEST_JOB_HISTORY
+from backend.core.executor import run_in_pool
+from backend.core.pdf_parallel import mark_worker_process
+from backend.ingestion.processor import filing_fields, filing_is_current, prefetch_extraction, process_filing
+from backend.ingestion.sec_downloader import SECDownloader
+
+
+@dataclass
+class FileProgress:
+    filing: dict
+    path: str = ""
+    # queued, downloading, extracting, embedding, retrying, done, skipped, failed
+    status: str = "queued"
+    attempts: int = 0
+    chunks_done: int = 0
+    chunks_total: int = 0
+    embedded: int = 0
+    error: Optional[str] = None
+    extraction: Optional[asyncio.Future] = field(default=None, repr=False)
+
+    def __post_init__(self):
+        self.path = self.path or self.filing.get("filepath") or self.filing.get("local_path") or ""
+
+    @property
+    def name(self) -> str:
+        return Path(self.path).name if self.path else self.filing.get("filing_id", "unknown")
+
+    def to_dict(self) -> dict:
+        return {
+            "file": self.name,
+            "status": self.status,
+            "attempts": self.attempts,
+            "chunks_done": self.chunks_done,
+            "chunks_total": self.chunks_total,
+            "embedded": self.embedded,
+            "error": self.error,
+        }
+
+
+@dataclass
+class IngestJob:
+    id: str
+    source: str
+    files: list[FileProgress] = field(default_factory=list)
+    check: Optional[dict] = None        # filing_types / days_back for an EDGAR check
+    # queued, checking, running, completed, partial, failed, cancelled
+    status: str = "queued"
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("completed", "partial", "failed", "cancelled")
+
+    def progress(self) -> dict:
+        counts = {}
+        for item in self.files:
+            counts[item.status] = counts.get(item.status, 0) + 1
+        settled = sum(counts.get(s, 0) for s in ("done", "skipped", "failed"))
+        return {
+            "files_total": len(self.files),
+            "files_settled": settled,
+            "by_status": counts,
+            "chunks_embedded": sum(item.embedded for item in self.files),
+        }
+
+    def to_dict(self, files: bool = True) -> dict:
+        def ts(value):
+            return datetime.fromtimestamp(value).isoformat(timespec="seconds") if value else None
+
+        out = {
+            "id": self.id,
+            "source": self.source,
+            "status": self.status,
+            "created_at": ts(self.created_at),
+            "started_at": ts(self.started_at),
+            "finished_at": ts(self.finished_at),
+            "error": self.error,
+            **self.progress(),
+        }
+        if files:
+            out["files"] = [item.to_dict() for item in self.files]
+        return out
+
+
+class IngestQueue:
+    """FIFO of ingest jobs served by one runner task on the application's event loop."""
+
+    def __init__(
+        self,
+        workers: int = INGEST_WORKERS,
+        max_retries: int = INGEST_MAX_RETRIES,
+        retry_backoff: float = INGEST_RETRY_BACKOFF,
+        history: int = INGEST_JOB_HISTORY,
+    ):
+        self.workers = max(1, workers)
+        self.max_retries = max(0, max_retries)
+        self.retry_backoff = retry_backoff
+        self.history = history
+        self._jobs: "OrderedDict[str, IngestJob]" = OrderedDict()
+        self._ids = itertools.count(1)
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._current: Optional[str] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Submission / status
+    # ------------------------------------------------------------------
+    def submit(
+        self,
+        filings: Optional[list[dict]] = None,
+        check: Optional[dict] = None,
+        source: str = "api",
+    ) -> IngestJob:
+        """
+        Queue a job (must be called on the event loop).
+
+        Args:
+            filings: Filing dicts (downloaded or not; missing files are downloaded)
+            check: check_and_download_new_filings() arguments; the job first
+                checks EDGAR and then processes whatever was downloaded
+            source: Who queued the job ("scheduled", "api", ...)
+        """
+        job = IngestJob(
+            id=f"{datetime.now():%Y%m%d-%H%M%S}-{next(self._ids)}",
+            source=source,
+            files=[FileProgress(filing) for filing in filings or []],
+            check=check,
+        )
+        self._jobs[job.id] = job
+        self._trim_history()
+        self._ensure_runner()
+        self._queue.put_nowait(job.id)
+        print(f"✓ Ingest job {job.id} queued ({source}, {len(job.files)} files)")
+        return job
+
+    def retry_failed(self, job_id: str) -> Optional[IngestJob]:
+        """Queue a new job for the files that failed in a finished job."""
+        job = self._jobs.get(job_id)
+        if job is None or not job.finished:
+            return None
+        failed = [item.filing for item in job.files if item.status == "failed"]
+        if not failed:
+            return None
+        return self.submit(failed, source=f"retry:{job.id}")
+
+    def get(self, job_id: str) -> Optional[IngestJob]:
+        return self._jobs.get(job_id)
+
+    def jobs(self) -> list[IngestJob]:
+        """Known jobs, newest first."""
+        return list(reversed(self._jobs.values()))
+
+    def stats(self, recent: int = 10) -> dict:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "current_job": self._current,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "workers": self.workers,
+            "max_retries": self.max_retries,
+            "jobs": [job.to_dict(files=job.id == self._current) for job in self.jobs()[:recent]],
+        }
+
+    def _trim_history(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - self.history)]:
+            del self._jobs[job_id]
+
+    # ------------------------------------------------------------------
+    # Runner lifecycle
+    # ------------------------------------------------------------------
+    def _ensure_runner(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._queue = asyncio.Queue()
+            self._loop = loop
+            self._task = None
+            # Jobs queued on a previous loop are re-queued on this one
+            for job in self._jobs.values():
+                if job.status == "queued":
+                    self._queue.put_nowait(job.id)
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._run())
+
+    def start(self) -> None:
+        """Start the runner (called on application startup; submit() also starts it)."""
+        self._ensure_runner()
+
+    async def stop(self) -> None:
+        """Cancel the runner and stop the extraction workers (application shutdown)."""
+        task, self._task = self._task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._shutdown_pool()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                # Workers extract serially (no nested page pools)
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=mark_worker_process)
+            return self._pool
+
+    def _shutdown_pool(self) -> None:
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    # ------------------------------------------------------------------
+    # Processing
+    # ------------------------------------------------------------------
+    async def _run(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            job = self._jobs.get(job_id)
+            if job is None or job.status != "queued":
+                continue
+            self._current = job.id
+            job.started_at = time.time()
+            try:
+                await self._run_job(job)
+            except asyncio.CancelledError:
+                job.status = "cancelled"
+                raise
+            except Exception as e:
+                job.status = "failed"
+                job.error = str(e)
+                print(f"⚠ Ingest job {job.id} failed: {e}")
+            finally:
+                job.finished_at = time.time()
+                self._current = None
+            progress = job.progress()
+            print(f"✓ Ingest job {job.id} {job.status}: {progress['files_total']} files, "
+                  f"{progress['chunks_embedded']} chunks embedded")
+
+    async def _run_job(self, job: IngestJob) -> None:
+        if job.check is not None:
+            job.status = "checking"
+            new_filings = await SECDownloader().check_and_download_new_filings(**job.check)
+            job.files.extend(FileProgress(filing) for filing in new_filings)
+        job.status = "running"
+
+        items = job.files
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                items = [item for item in items if item.status == "failed"]
+                if not items:
+                    break
+                delay = self.retry_backoff * 2 ** (attempt - 1)
+                for item in items:
+                    item.status = "retrying"
+                print(f"  Ingest job {job.id}: retrying {len(items)} files in {delay:.0f}s")
+                await asyncio.sleep(delay)
+            await self._process_files(items)
+
+        failed = sum(1 for item in job.files if item.status == "failed")
+        if not failed:
+            job.status = "completed"
+        else:
+            job.status = "failed" if failed == len(job.files) else "partial"
+
+    async def _process_files(self, items: list[FileProgress]) -> None:
+        """Extract up to `workers` files ahead of the one being embedded."""
+        upcoming = iter(items)
+        extracting: list[FileProgress] = []
+
+        async def start_next():
+            for item in upcoming:
+                if await self._start(item):
+                    extracting.append(item)
+                    return
+
+        for _ in range(self.workers):
+            await start_next()
+        while extracting:
+            item = extracting.pop(0)
+            await start_next()
+            await self._finish(item)
+
+    async def _start(self, item: FileProgress) -> bool:
+        """Download if needed and hand the file to an extraction worker; False if nothing to do."""
+        item.attempts += 1
+        item.error = None
+        try:
+            if not item.path:
+                item.status = "downloading"
+                path = await SECDownloader().download_filing(item.filing)
+                if path is None:
+                    raise RuntimeError("download failed")
+                item.filing["local_path"] = item.path = str(path)
+            path = Path(item.path)
+            if not path.is_file():
+                raise FileNotFoundError(f"File not found: {path}")
+            if await run_in_pool("ingest", filing_is_current, path):
+                item.status = "skipped"
+                return False
+            item.status = "extracting"
+            item.extraction = asyncio.wrap_future(self._get_pool().submit(prefetch_extraction, item.path))
+            return True
+        except Exception as e:
+            self._fail(item, e)
+            return False
+
+    async def _finish(self, item: FileProgress) -> None:
+        """Wait for the file's extraction, then chunk/embed/upsert it on the ingest thread."""
+        try:
+            try:
+                await item.extraction
+            except BrokenProcessPool:
+                self._shutdown_pool()       # a worker died; the next file gets a fresh pool
+                raise
+            finally:
+                item.extraction = None
+
+            def progress(done: int, total: int):
+                item.chunks_done, item.chunks_total = done, total
+
+            item.status = "embedding"
+            item.embedded = await run_in_pool(
+                "ingest", process_filing, progress=progress, **filing_fields({**item.filing, "filepath": item.path}),
+            )
+            item.status = "done"
+        except Exception as e:
+            self._fail(item, e)
+
+    @staticmethod
+    def _fail(item: FileProgress, error: Exception) -> None:
+        item.status = "failed"
+        item.error = str(error) or type(error).__name__
+        print(f"⚠ Ingest failed for {item.name} (attempt {item.attempts}): {item.error}")
+
+
+_ingest_queue: Optional[IngestQueue] = None
+
+
+def get_ingest_queue() -> IngestQueue:
+    """Get the process-wide ingest job queue."""
+    global _ingest_queue
+    if _ingest_queue is None:
+        _ingest_queue = IngestQueue()
+    return _ingest_queue
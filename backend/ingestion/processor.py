@@ -3,64 +3,138 @@ Document processing pipeline for new SEC filings.
 Extracts text, chunks, embeds, and upserts into ChromaDB.
 """
 import re
+from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
 
-from backend.core.database import get_collection, embed_texts
+from backend.core.database import (
+    get_collection,
+    embed_texts,
+    get_metadata_index,
+    get_content_manifest,
+    record_upsert,
+    record_delete,
+    save_metadata_index,
+)
+from backend.core.content_manifest import file_key, file_sha256
+from backend.core.config import CHUNKING_STRATEGY, COMPANIES
+from backend.core.extraction_cache import cached_extract, HTML_TEXT, PDF_TEXT, HTML_LAYOUT, PDF_LAYOUT
+from backend.core.pdf_parallel import extract_pdf_text
+from backend.core.layout_text import read_html_layout, read_pdf_layout
+from backend.core.chunking import iter_document_chunks, chunk_metadata
+from backend.core.periods import period_fields, fiscal_period, last_quarter_end
+from backend.core.near_duplicates import simhash_hex
 
 
-def _extract_text(filepath: Path) -> str:
-    """Extract text from HTML or PDF files."""
-    suffix = filepath.suffix.lower()
+# Chunks per embedding call / upsert while streaming a filing
+EMBED_BATCH = 64
 
-    if suffix in (".html", ".htm"):
-        from bs4 import BeautifulSoup
-        with open(filepath, "r", encoding="utf-8", errors="ignore") as f:
-            soup = BeautifulSoup(f.read(), "html.parser")
-        for el in soup(["script", "style", "head", "meta"]):
-            el.decompose()
-        return soup.get_text(separator="\n", strip=True)
 
-    elif suffix == ".pdf":
-        try:
-            import pdfplumber
-            text = ""
-            with pdfplumber.open(filepath) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n\n"
-            if text.strip():
-                return text
-        except Exception:
-            pass
+def _read_html_text(filepath: Path) -> str:
+    from bs4 import BeautifulSoup
+    with open(filepath, "r", encoding="utf-8", errors="ignore") as f:
+        soup = BeautifulSoup(f.read(), "html.parser")
+    for el in soup(["script", "style", "head", "meta"]):
+        el.decompose()
+    return soup.get_text(separator="\n", strip=True)
 
-        try:
-            import PyPDF2
-            text = ""
-            with open(filepath, "rb") as f:
-                for page in PyPDF2.PdfReader(f).pages:
-                    t = page.extract_text()
-                    if t:
-                        text += t + "\n"
+
+def _read_pdf_text(filepath: Path) -> str:
+    try:
+        text = extract_pdf_text(filepath)     # page-parallel for long PDFs
+        if text.strip():
             return text
-        except Exception:
-            pass
+    except Exception:
+        pass
+
+    # Raises when PyPDF2 fails too, so the failure isn't cached
+    import PyPDF2
+    text = ""
+    with open(filepath, "rb") as f:
+        for page in PyPDF2.PdfReader(f).pages:
+            t = page.extract_text()
+            if t:
+                text += t + "\n\n"
+    return text
+
 
+def _extract_text_strict(filepath: Path, sha: Optional[str] = None, layout: bool = False) -> str:
+    """
+    Extract text from HTML or PDF files (via the shared extraction cache).
+    With layout=True tables are rendered as Markdown (for structured chunking).
+    Extraction errors propagate.
+    """
+    suffix = filepath.suffix.lower()
+    if suffix in (".html", ".htm"):
+        if layout:
+            return cached_extract(filepath, *HTML_LAYOUT, read_html_layout, sha=sha)
+        return cached_extract(filepath, *HTML_TEXT, _read_html_text, sha=sha)
+    elif suffix == ".pdf":
+        if layout:
+            return cached_extract(filepath, *PDF_LAYOUT, read_pdf_layout, sha=sha)
+        return cached_extract(filepath, *PDF_TEXT, _read_pdf_text, sha=sha)
     return ""
 
 
-def _chunk_text(text: str, chunk_words: int = 250, overlap_words: int = 50) -> list[str]:
-    """Split text into overlapping chunks."""
-    words = text.split()
-    if not words:
-        return []
-    chunks = []
-    i = 0
-    while i < len(words):
-        chunks.append(" ".join(words[i:i + chunk_words]).strip())
-        i += chunk_words - overlap_words
-    return [c for c in chunks if len(c) > 50]
+def prefetch_extraction(filepath: str) -> int:
+    """
+    Extract a filing into the extraction cache (run in an ingest worker process).
+
+    process_filing() then reads the text from the cache instead of parsing
+    the document on the API process. Raises when extraction fails, so the
+    file can be retried. Returns the length of the extracted text.
+    """
+    return len(_extract_text_strict(Path(filepath), layout=CHUNKING_STRATEGY == "structured"))
+
+
+def filing_is_current(filepath: Path) -> bool:
+    """True when process_filing() would skip the file (unchanged and still indexed)."""
+    manifest = get_content_manifest()
+    key = file_key(filepath)
+    if not get_metadata_index().contains(manifest.chunk_ids(key)):
+        return False
+    return manifest.known_sha(key, filepath, CHUNKING_STRATEGY) is not None
+
+
+def _filing_period(ticker: str, form: str, report_date: str, filing_date: str) -> tuple[str, str]:
+    """(fiscal_year, quarter) of an SEC filing from its period end (EDGAR reportDate)."""
+    fye_name = COMPANIES.get(ticker, {}).get("fiscal_year_end", "December")
+    fye_month = datetime.strptime(fye_name, "%B").month
+    period_end = report_date or (filing_date and last_quarter_end(filing_date, fye_month))
+    if not period_end:
+        return "Unknown", ""
+    fiscal_year, quarter = fiscal_period(period_end, fye_month)
+    return fiscal_year, quarter if form.startswith("10-Q") else ""
+
+
+def filing_fields(filing: dict) -> dict:
+    """
+    process_filing() arguments for a filing dict.
+
+    Accepts the processor's own keys (filepath, company, filing_type,
+    fiscal_year, quarter) as well as SEC downloader records (local_path,
+    ticker, form, report_date, filing_date); for the latter the company is
+    the short display name used in the collection and the fiscal year and
+    quarter come from the period end in the company's fiscal calendar (the
+    last quarter end before the filing date when EDGAR gave no reportDate).
+    """
+    ticker = filing.get("ticker", "")
+    company = filing.get("company", "Unknown")
+    if ticker in COMPANIES:
+        company = COMPANIES[ticker]["name"].split()[0]
+    filing_type = filing.get("filing_type") or filing.get("form") or "Unknown"
+    fiscal_year, quarter = filing.get("fiscal_year"), filing.get("quarter", "")
+    if not fiscal_year:
+        fiscal_year, quarter = _filing_period(
+            ticker, filing_type, filing.get("report_date", ""), filing.get("filing_date", "")
+        )
+    return {
+        "filepath": Path(filing.get("filepath") or filing.get("local_path") or ""),
+        "company": company,
+        "filing_type": filing_type,
+        "fiscal_year": fiscal_year,
+        "quarter": quarter,
+    }
 
 
 def process_filing(
@@ -69,51 +143,111 @@ def process_filing(
     filing_type: str,
     fiscal_year: str = "Unknown",
     quarter: str = "",
+    progress: Optional[Callable[[int, int], None]] = None,
 ) -> int:
     """
     Process a single filing: extract, chunk, embed, and upsert into ChromaDB.
 
-    Returns the number of chunks added.
+    Incremental: an unchanged file (same content hash, chunks still indexed)
+    is skipped without extraction, only chunks whose text changed are
+    re-embedded, metadata-only changes are patched in place, and chunks that
+    no longer exist (e.g. the file got shorter) are deleted. A file that
+    yields no text is left untouched; extraction errors are raised.
+
+    progress, if given, is called as progress(chunks_done, total_chunks)
+    after every embedding batch.
+
+    Returns the number of chunks embedded.
     """
-    text = _extract_text(filepath)
-    if not text or len(text.strip()) < 100:
+    manifest = get_content_manifest()
+    index = get_metadata_index()
+    key = file_key(filepath)
+
+    if not index.contains(manifest.chunk_ids(key)):
+        manifest.forget(key)    # collection lost this file's chunks; start over
+    sha = manifest.known_sha(key, filepath, CHUNKING_STRATEGY)
+    if sha is not None:
+        manifest.save()     # writes only if known_sha refreshed a touched file's mtime
         return 0
+    sha = file_sha256(filepath)
 
-    chunks = _chunk_text(text)
-    if not chunks:
+    # Extraction errors propagate (the ingest queue retries the file). Empty
+    # text, e.g. an image-only PDF, leaves the file's existing chunks and its
+    # manifest entry alone, so it is looked at again next time.
+    structured = CHUNKING_STRATEGY == "structured"
+    text = _extract_text_strict(filepath, sha, layout=structured)
+    if not text or len(text.strip()) < 100:
         return 0
+    total_chunks = sum(1 for _ in iter_document_chunks(text, CHUNKING_STRATEGY))
 
     collection = get_collection()
     safe_stem = re.sub(r"[^a-zA-Z0-9_\-]", "_", filepath.stem)
 
-    ids = []
-    metadatas = []
-    for i, chunk in enumerate(chunks):
-        ids.append(f"{company}_{safe_stem}_chunk{i:04d}")
-        metadatas.append({
+    # Chunks stream through the plan; only one embedding batch is held at a time
+    plan = manifest.start_plan(key)
+    batch_ids, batch_docs, batch_meta = [], [], []
+    update_ids, update_meta = [], []
+    embedded = 0
+    done = 0
+
+    def flush():
+        nonlocal batch_ids, batch_docs, batch_meta, embedded
+        if progress is not None:
+            progress(done, total_chunks)
+        if not batch_ids:
+            return
+        collection.upsert(
+            ids=batch_ids,
+            embeddings=embed_texts(batch_docs),
+            documents=batch_docs,
+            metadatas=batch_meta,
+        )
+        record_upsert(batch_ids, batch_meta, batch_docs)
+        embedded += len(batch_ids)
+        batch_ids, batch_docs, batch_meta = [], [], []
+
+    for i, chunk in enumerate(iter_document_chunks(text, CHUNKING_STRATEGY)):
+        done = i + 1
+        chunk_id = f"{company}_{safe_stem}_chunk{i:04d}"
+        meta = {
             "company": company,
             "source_file": filepath.name,
             "filing_type": filing_type,
             "fiscal_year": fiscal_year,
             "quarter": quarter,
+            **period_fields(fiscal_year, quarter),
             "chunk_index": i,
-            "total_chunks": len(chunks),
-        })
+            "total_chunks": total_chunks,
+            "simhash": simhash_hex(chunk.text),
+            **chunk_metadata(chunk),
+        }
+        action = plan.add(i, chunk_id, chunk.text, meta)
+        if action == "embed":
+            # Re-embed new/changed chunks only
+            batch_ids.append(chunk_id)
+            batch_docs.append(chunk.text)
+            batch_meta.append(meta)
+            if len(batch_ids) >= EMBED_BATCH:
+                flush()
+        elif action == "update":
+            update_ids.append(chunk_id)
+            update_meta.append(meta)
+    flush()
+    plan.finish()
 
-    embeddings = embed_texts(chunks)
+    if update_ids:
+        collection.update(ids=update_ids, metadatas=update_meta)
+        record_upsert(update_ids, update_meta)
 
-    # Upsert in batches
-    batch_size = 64
-    for start in range(0, len(chunks), batch_size):
-        end = start + batch_size
-        collection.upsert(
-            ids=ids[start:end],
-            embeddings=embeddings[start:end],
-            documents=chunks[start:end],
-            metadatas=metadatas[start:end],
-        )
+    if plan.delete:
+        collection.delete(ids=plan.delete)
+        record_delete(plan.delete)
+
+    manifest.record(key, filepath, sha, plan.hashes, CHUNKING_STRATEGY)
+    manifest.save()
+    save_metadata_index()
 
-    return len(chunks)
+    return embedded
 
 
 def process_new_filings(filings: list[dict]) -> dict:
@@ -122,6 +256,7 @@ def process_new_filings(filings: list[dict]) -> dict:
 
     Args:
         filings: List of dicts with keys: filepath, company, filing_type, etc.
+            (or SEC downloader records; see filing_fields)
 
     Returns:
         Summary dict with counts
@@ -131,22 +266,17 @@ def process_new_filings(filings: list[dict]) -> dict:
     errors = []
 
     for filing in filings:
-        filepath = Path(filing.get("filepath", ""))
-        if not filepath.exists():
+        fields = filing_fields(filing)
+        filepath = fields["filepath"]
+        if not filepath.is_file():
             errors.append(f"File not found: {filepath}")
             continue
 
         try:
-            chunks = process_filing(
-                filepath=filepath,
-                company=filing.get("company", "Unknown"),
-                filing_type=filing.get("filing_type", "Unknown"),
-                fiscal_year=filing.get("fiscal_year", "Unknown"),
-                quarter=filing.get("quarter", ""),
-            )
+            chunks = process_filing(**fields)
             total_files += 1
             total_chunks += chunks
-            print(f"  Processed {filepath.name}: {chunks} chunks")
+            print(f"  Processed {filepath.name}: {chunks} chunks embedded")
         except Exception as e:
             errors.append(f"{filepath.name}: {e}")
 
@@ -9,8 +9,7 @@ from datetime import datetime
 import logging
 
 from backend.core.config import INGESTION_SCHEDULE
-from backend.ingestion.sec_downloader import SECDownloader
-from backend.ingestion.processor import process_new_filings
+from backend.ingestion.jobs import get_ingest_queue
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -28,23 +27,19 @@ async def scheduled_sec_check():
     logger.info(f"[{datetime.now()}] Starting scheduled SEC filing check...")
     
     try:
-        downloader = SECDownloader()
-        new_filings = await downloader.check_and_download_new_filings(
-            filing_types=["10-K", "10-Q", "8-K"],
-            days_back=7,  # Check last week
+        # The job checks EDGAR, downloads new filings and embeds them into
+        # ChromaDB off the event loop; progress shows in /api/ingestion/status
+        job = get_ingest_queue().submit(
+            check={
+                "filing_types": ["10-K", "10-Q", "8-K"],
+                "days_back": 7,  # Check last week
+            },
+            source="scheduled",
         )
+        logger.info(f"Queued ingest job {job.id}")
         
-        if new_filings:
-            logger.info(f"Found {len(new_filings)} new filings. Processing...")
-            
-            # Process and add to ChromaDB
-            processed = await process_new_filings(new_filings)
-            logger.info(f"Processed {processed} new documents into ChromaDB")
-            
-            # TODO: Send alert notification
-            # await send_new_filing_alert(new_filings)
-        else:
-            logger.info("No new filings found.")
+        # TODO: Send alert notification
+        # await send_new_filing_alert(new_filings)
             
     except Exception as e:
         logger.error(f"Error in scheduled SEC check: {e}")
@@ -1,33 +1,199 @@
 """
 Automated SEC filing downloader using EDGAR API.
 Downloads new 10-K, 10-Q, and 8-K filings for tracked companies.
+
+All requests go through one pooled (HTTP/2 when available) client per event
+loop and a process-wide token bucket holding them to SEC's 10 requests/second,
+so tickers and documents can be fetched concurrently. Submissions JSON is
+fetched conditionally (ETag / If-Modified-Since) and cached on disk.
+Set SEC_DATA_URL / SEC_ARCHIVES_URL to test against a local mock server.
 """
+import asyncio
+import importlib.util
 import httpx
 import os
 import json
+import weakref
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Optional
-from backend.core.config import COMPANIES, SEC_USER_AGENT, DATA_DIR
+from backend.core.config import (
+    COMPANIES,
+    SEC_USER_AGENT,
+    DATA_DIR,
+    SEC_DATA_URL,
+    SEC_ARCHIVES_URL,
+    SEC_RATE_LIMIT,
+    SEC_MAX_CONCURRENCY,
+    SEC_HTTP2,
+    SEC_TIMEOUT,
+    SEC_MAX_RETRIES,
+)
+from backend.core.rate_limit import TokenBucket
 
 
 # SEC EDGAR API endpoints
-EDGAR_SUBMISSIONS_URL = "https://data.sec.gov/submissions/CIK{cik}.json"
-EDGAR_FILING_URL = "https://www.sec.gov/Archives/edgar/data/{cik}/{accession}/{filename}"
+EDGAR_SUBMISSIONS_URL = SEC_DATA_URL + "/submissions/CIK{cik}.json"
+EDGAR_FILING_URL = SEC_ARCHIVES_URL + "/edgar/data/{cik}/{accession}/{filename}"
+
+# Responses worth retrying (rate limited / transient server errors)
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+# ---------------------------------------------------------------------------
+# SHARED CLIENT + RATE LIMIT
+# ---------------------------------------------------------------------------
+# SEC's limit is per client IP, so one bucket covers every loop and thread
+_rate_limiter = TokenBucket(SEC_RATE_LIMIT)
+
+# event loop -> (httpx.AsyncClient, asyncio.Semaphore); httpx async pools are loop-bound
+_clients: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def _http2_enabled() -> bool:
+    """HTTP/2 needs the optional h2 package (pip install httpx[http2])."""
+    return SEC_HTTP2 and importlib.util.find_spec("h2") is not None
+
+
+def _client_entry() -> tuple:
+    loop = asyncio.get_running_loop()
+    entry = _clients.get(loop)
+    if entry is None:
+        client = httpx.AsyncClient(
+            http2=_http2_enabled(),
+            headers={"User-Agent": SEC_USER_AGENT, "Accept-Encoding": "gzip, deflate"},
+            limits=httpx.Limits(
+                max_connections=SEC_MAX_CONCURRENCY,
+                max_keepalive_connections=SEC_MAX_CONCURRENCY,
+            ),
+            timeout=SEC_TIMEOUT,
+        )
+        entry = (client, asyncio.Semaphore(SEC_MAX_CONCURRENCY))
+        _clients[loop] = entry
+    return entry
+
+
+def get_edgar_client() -> httpx.AsyncClient:
+    """Get the shared EDGAR client for the running event loop."""
+    return _client_entry()[0]
+
+
+async def close_edgar_client() -> None:
+    """Close the running loop's EDGAR client (on shutdown / before closing the loop)."""
+    entry = _clients.pop(asyncio.get_running_loop(), None)
+    if entry is not None:
+        await entry[0].aclose()
+
+
+def edgar_stats() -> dict:
+    """Rate limiter counters and client settings."""
+    return {**_rate_limiter.stats(), "http2": _http2_enabled(), "max_concurrency": SEC_MAX_CONCURRENCY}
 
 
 class SECDownloader:
     """Downloads SEC filings from EDGAR."""
     
-    def __init__(self):
+    def __init__(
+        self,
+        download_dir: Optional[Path] = None,
+        client: Optional[httpx.AsyncClient] = None,
+    ):
+        """
+        Args:
+            download_dir: Where filings are stored (default data/sec_filings)
+            client: Client to use instead of the shared pooled one (e.g. with a mock transport)
+        """
         self.headers = {
             "User-Agent": SEC_USER_AGENT,
             "Accept-Encoding": "gzip, deflate",
         }
-        self.download_dir = DATA_DIR / "sec_filings"
+        self.download_dir = Path(download_dir) if download_dir else DATA_DIR / "sec_filings"
         self.download_dir.mkdir(parents=True, exist_ok=True)
+        self.submissions_dir = self.download_dir / "submissions"
         self.tracking_file = self.download_dir / "downloaded_filings.json"
         self.downloaded = self._load_tracking()
+        self._client = client
+        self._slots: Optional[asyncio.Semaphore] = None
+    
+    # ------------------------------------------------------------------
+    # HTTP
+    # ------------------------------------------------------------------
+    def _client_and_slots(self) -> tuple:
+        if self._client is None:
+            return _client_entry()
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(SEC_MAX_CONCURRENCY)
+        return self._client, self._slots
+    
+    async def _request(self, url: str, headers: Optional[dict] = None, stream_to: Optional[Path] = None) -> httpx.Response:
+        """
+        Rate-limited GET with retries on 429/5xx (honoring Retry-After).
+        With stream_to, a 200 body is streamed to that file instead of read.
+        """
+        client, slots = self._client_and_slots()
+        headers = {**self.headers, **(headers or {})}
+        for attempt in range(SEC_MAX_RETRIES + 1):
+            async with slots:
+                await _rate_limiter.acquire()
+                if stream_to is None:
+                    response = await client.get(url, headers=headers)
+                else:
+                    async with client.stream("GET", url, headers=headers) as response:
+                        if response.status_code == 200:
+                            tmp = stream_to.with_suffix(stream_to.suffix + ".part")
+                            with open(tmp, "wb") as f:
+                                async for block in response.aiter_bytes():
+                                    f.write(block)
+                            os.replace(tmp, stream_to)
+            if response.status_code not in RETRY_STATUS or attempt == SEC_MAX_RETRIES:
+                break
+            retry_after = response.headers.get("Retry-After", "")
+            delay = float(retry_after) if retry_after.isdigit() else 2 ** attempt
+            print(f"EDGAR {response.status_code} for {url}; retrying in {delay:.0f}s")
+            await asyncio.sleep(delay)
+        if response.status_code != 304:     # Not Modified is handled by the caller
+            response.raise_for_status()
+        return response
+    
+    async def _get_submissions(self, cik: str) -> dict:
+        """
+        Submissions JSON for a CIK, fetched conditionally.
+        
+        The last response is cached on disk with its ETag / Last-Modified;
+        a 304 Not Modified reuses it without transferring the document again.
+        """
+        cache_path = self.submissions_dir / f"CIK{cik}.json"
+        cached = None
+        if cache_path.exists():
+            try:
+                with open(cache_path) as f:
+                    cached = json.load(f)
+            except Exception:
+                cached = None
+        
+        headers = {}
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+        
+        response = await self._request(EDGAR_SUBMISSIONS_URL.format(cik=cik), headers=headers)
+        if response.status_code == 304 and cached:
+            return cached["data"]
+        
+        data = response.json()
+        self.submissions_dir.mkdir(parents=True, exist_ok=True)
+        tmp = cache_path.with_suffix(".json.tmp")
+        with open(tmp, "w") as f:
+            json.dump({
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "fetched_at": datetime.now().isoformat(),
+                "data": data,
+            }, f)
+        os.replace(tmp, cache_path)
+        return data
     
     def _load_tracking(self) -> dict:
         """Load tracking of already downloaded filings."""
@@ -68,13 +234,9 @@ class SECDownloader:
             return []
         
         cik = self._format_cik(company["cik"])
-        url = EDGAR_SUBMISSIONS_URL.format(cik=cik)
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, headers=self.headers, timeout=30.0)
-                response.raise_for_status()
-                data = response.json()
+            data = await self._get_submissions(cik)
         except Exception as e:
             print(f"Error fetching filings for {ticker}: {e}")
             return []
@@ -93,6 +255,7 @@ class SECDownloader:
         accessions = recent.get("accessionNumber", [])
         primary_docs = recent.get("primaryDocument", [])
         descriptions = recent.get("primaryDocDescription", [])
+        report_dates = recent.get("reportDate", [])
         
         for i in range(len(forms)):
             form = forms[i]
@@ -112,6 +275,7 @@ class SECDownloader:
                 "cik": cik,
                 "form": form,
                 "filing_date": dates[i],
+                "report_date": report_dates[i] if i < len(report_dates) else "",
                 "accession": accession,
                 "accession_formatted": accessions[i],
                 "primary_doc": primary_docs[i],
@@ -153,12 +317,7 @@ class SECDownloader:
         output_path = company_dir / filename
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, headers=self.headers, timeout=60.0)
-                response.raise_for_status()
-                
-                with open(output_path, "wb") as f:
-                    f.write(response.content)
+            await self._request(url, stream_to=output_path)
             
             # Track download
             self.downloaded[filing["filing_id"]] = str(output_path)
@@ -182,23 +341,39 @@ class SECDownloader:
         Returns:
             List of newly downloaded filings
         """
-        new_filings = []
+        # Fan out: all tickers' submissions, then every new document, concurrently
+        # (the shared client caps requests in flight and the bucket the rate)
+        by_ticker = await self.get_all_company_filings(filing_types, days_back)
         
-        for ticker in COMPANIES.keys():
-            print(f"\nChecking {ticker} for new filings...")
-            filings = await self.get_company_filings(ticker, filing_types, days_back)
-            
-            for filing in filings:
-                if filing["already_downloaded"]:
-                    continue
-                
-                path = await self.download_filing(filing)
-                if path:
-                    filing["local_path"] = str(path)
-                    new_filings.append(filing)
+        pending = [
+            filing
+            for filings in by_ticker.values()
+            for filing in filings
+            if not filing["already_downloaded"]
+        ]
+        paths = await asyncio.gather(*(self.download_filing(filing) for filing in pending))
+        
+        new_filings = []
+        for filing, path in zip(pending, paths):
+            if path:
+                filing["local_path"] = str(path)
+                new_filings.append(filing)
         
         return new_filings
     
+    async def get_all_company_filings(
+        self,
+        filing_types: list[str] = ["10-K", "10-Q", "8-K"],
+        days_back: int = 90,
+    ) -> dict[str, list[dict]]:
+        """Recent filings for every tracked company, fetched concurrently."""
+        tickers = list(COMPANIES.keys())
+        print(f"\nChecking {', '.join(tickers)} for new filings...")
+        results = await asyncio.gather(
+            *(self.get_company_filings(ticker, filing_types, days_back) for ticker in tickers)
+        )
+        return dict(zip(tickers, results))
+    
     def get_download_stats(self) -> dict:
         """Get statistics about downloaded filings."""
         stats = {
@@ -227,12 +402,16 @@ def check_new_filings_sync(
     
     downloader = SECDownloader()
     
+    async def run():
+        try:
+            return await downloader.check_and_download_new_filings(filing_types, days_back)
+        finally:
+            await close_edgar_client()
+    
     loop = asyncio.new_event_loop()
     asyncio.set_event_loop(loop)
     try:
-        return loop.run_until_complete(
-            downloader.check_and_download_new_filings(filing_types, days_back)
-        )
+        return loop.run_until_complete(run())
     finally:
         loop.close()
 
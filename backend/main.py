@@ -1,6 +1,10 @@
 """
 CapEx Intelligence Platform - FastAPI Backend
 """
+import time
+_import_started = time.perf_counter()
+
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
@@ -10,49 +14,127 @@ from backend.api.routes import ingestion, sentiment, earnings, analytics, geogra
 from backend.api.routes import reports as reports_router
 from backend.api.routes import dashboard as dashboard_router
 from backend.ingestion.news_feed import router as news_router
-from backend.core.database import get_collection, get_collection_stats, get_embedding_model
+from backend.core.config import FAST_START, RETRIEVAL_MODE
+from backend.core.database import (
+    get_collection, get_collection_stats, get_embedding_cache, get_sparse_index, get_synced_sparse_index,
+    warm_up_embeddings, embedding_stats,
+)
+from backend.core.executor import run_in_pool, executor_stats, shutdown_executors
+from backend.core.llm import close_llm_clients
+from backend.core.pdf_parallel import shutdown_pdf_pool
+from backend.core.reranker import get_reranker
+from backend.core.startup import get_startup_tracker
+from backend.ingestion.sec_downloader import close_edgar_client
 from backend.ingestion.scheduler import start_scheduler, stop_scheduler
+from backend.ingestion.jobs import get_ingest_queue
 
+startup = get_startup_tracker(_import_started)
+startup.record("imports", time.perf_counter() - _import_started)
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
+
+async def load_embedding_model():
     try:
-        get_embedding_model()
-        print("✓ Embedding model pre-loaded")
+        with startup.phase("embedding_model"):
+            mode = await run_in_pool("embedding", warm_up_embeddings)
+        print("✓ Embedding service connected" if mode == "service" else "✓ Embedding model pre-loaded")
     except Exception as e:
         print(f"⚠ Embedding model failed to load: {e}")
+
+
+async def load_reranker():
+    reranker = get_reranker()
+    if reranker is None:
+        return
+    try:
+        with startup.phase("reranker"):
+            await run_in_pool("embedding", reranker.load)
+        print(f"✓ Re-ranker loaded ({reranker.model_name})")
+    except Exception as e:
+        print(f"⚠ Re-ranker failed to load, using retriever order: {e}")
+
+
+async def load_index():
     try:
-        collection = get_collection()
-        stats = get_collection_stats()
+        with startup.phase("chromadb"):
+            await run_in_pool("search", get_collection)
+        with startup.phase("collection_stats"):
+            stats = await run_in_pool("search", get_collection_stats)
         print(f"✓ ChromaDB connected: {stats['total_documents']} documents")
+        if RETRIEVAL_MODE == "hybrid":
+            with startup.phase("sparse_index"):
+                await run_in_pool("search", get_synced_sparse_index, stats["total_documents"])
     except Exception as e:
         print(f"⚠ ChromaDB connection failed: {e}")
+
+
+async def warm_up():
+    """Load the embedding model, the re-ranker and the index (on the worker pools, concurrently)."""
+    await asyncio.gather(load_embedding_model(), load_reranker(), load_index())
+    startup.finished()
+    print(f"✓ Startup complete in {startup.ready_after:.2f}s ({startup.summary()})")
+
+
+async def warmup_cache_background():
+    try:
+        from backend.analytics.async_api import (
+            aanalyze_company_sentiment,
+            aclassify_company_investments,
+            aprefetch_company_analytics,
+        )
+        from backend.core.config import COMPANIES
+        await aprefetch_company_analytics(
+            [config["name"].split()[0] for config in list(COMPANIES.values())[:2]],
+            include_trends=False,
+        )
+        for ticker, config in list(COMPANIES.items())[:2]:
+            company = config["name"].split()[0]
+            try:
+                await aanalyze_company_sentiment(company)
+                await aclassify_company_investments(company)
+            except:
+                pass
+        print("✓ Cache warmed for initial companies")
+    except Exception as e:
+        print(f"⚠ Cache warmup failed: {e}")
+
+
+async def warm_up_background():
+    await warm_up()
+    # Analytics warmup needs the model and the index; it runs once they are ready
+    with startup.phase("analytics_warmup"):
+        await warmup_cache_background()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    get_ingest_queue().start()
     try:
-        start_scheduler()
+        with startup.phase("scheduler"):
+            start_scheduler()
         print("✓ Scheduler started for automated SEC filing checks")
     except Exception as e:
         print(f"⚠ Scheduler failed to start: {e}")
 
-    import asyncio
-    async def warmup_cache_background():
-        try:
-            from backend.analytics.sentiment import analyze_company_sentiment
-            from backend.analytics.classifier import classify_company_investments
-            from backend.core.config import COMPANIES
-            for ticker, config in list(COMPANIES.items())[:2]:
-                company = config["name"].split()[0]
-                try:
-                    analyze_company_sentiment(company)
-                    classify_company_investments(company)
-                except:
-                    pass
-            print("✓ Cache warmed for initial companies")
-        except Exception as e:
-            print(f"⚠ Cache warmup failed: {e}")
-    asyncio.create_task(warmup_cache_background())
+    if FAST_START:
+        # Serve right away; /api/health reports "warming" until the model and index are loaded
+        warmup_task = asyncio.create_task(warm_up_background())
+        startup.serving()
+        print(f"✓ Accepting traffic after {time.perf_counter() - startup.started:.2f}s "
+              f"(embedding model and ChromaDB loading in background)")
+    else:
+        await warm_up()
+        startup.serving()
+        warmup_task = asyncio.create_task(warmup_cache_background())
     yield
     print("Shutting down...")
+    warmup_task.cancel()
     stop_scheduler()
+    await get_ingest_queue().stop()
+    get_embedding_cache().save()
+    shutdown_executors()
+    shutdown_pdf_pool()
+    close_llm_clients()
+    await close_edgar_client()
 
 
 app = FastAPI(
@@ -95,16 +177,30 @@ async def root():
 
 @app.get("/api/health")
 async def health_check():
+    if startup.warming:
+        return {"status": "warming", "startup": startup.report()}
     try:
-        stats = get_collection_stats()
-        return {"status": "healthy", "chromadb": {"connected": True, "documents": stats["total_documents"], "companies": stats["companies"]}}
+        stats = await run_in_pool("search", get_collection_stats)
+        status = "degraded" if startup.state == "degraded" else "healthy"   # a startup phase failed
+        return {"status": status, "startup": startup.state, "chromadb": {"connected": True, "documents": stats["total_documents"], "companies": stats["companies"]}}
     except Exception as e:
         return {"status": "degraded", "chromadb": {"connected": False, "error": str(e)}}
 
 
 @app.get("/api/stats")
 async def get_stats():
-    return get_collection_stats()
+    return {
+        **await run_in_pool("search", get_collection_stats),
+        "embedding_cache": get_embedding_cache().stats(),
+        "embedding": await run_in_pool("search", embedding_stats),
+        "retrieval": {
+            "mode": RETRIEVAL_MODE,
+            "sparse_index": get_sparse_index().stats(),
+            "reranker": get_reranker().stats() if get_reranker() else None,
+        },
+        "executors": executor_stats(),
+        "startup": startup.report(),
+    }
 
 
 if __name__ == "__main__":
@@ -1,5 +1,5 @@
 """RAG module for retrieval and generation."""
-from .retriever import search_documents
-from .generator import generate_response
+from .retriever import search_documents, search_documents_batch, asearch_documents, asearch_documents_batch
+from .generator import generate_response, agenerate_response
 from .pipeline import process_query, process_query_sync
 from .memory import add_message, get_conversation_history
@@ -2,13 +2,15 @@
 Agentic RAG module with tool-use for multi-step retrieval.
 Uses Claude tool calling to iteratively search documents and build comprehensive answers.
 """
+import asyncio
 import json
 from typing import AsyncGenerator
 
-import anthropic
-
-from backend.core.config import ANTHROPIC_API_KEY, LLM_MODEL
-from backend.rag.retriever import search_documents
+from backend.core.database import embed_queries
+from backend.core.executor import run_in_pool
+from backend.core.llm import llm_available, acreate_message
+from backend.rag.retriever import search_reranked
+from backend.rag.generator import astream_messages
 
 
 TOOLS = [
@@ -56,8 +58,8 @@ You have a maximum of 3 tool-use rounds, so plan your searches efficiently."""
 def _execute_tool(name: str, args: dict) -> str:
     """Execute a tool call and return the result as a string."""
     if name == "search_documents":
-        docs = search_documents(
-            query=args["query"],
+        docs = search_reranked(
+            args["query"],
             company_filter=args.get("company_filter"),
             n_results=args.get("n_results", 10),
         )
@@ -69,13 +71,46 @@ def _execute_tool(name: str, args: dict) -> str:
             header = f"[{d['company']} | {d['filing_type']} | {d['fiscal_year']}"
             if d.get("quarter"):
                 header += f" {d['quarter']}"
+            if d.get("section"):
+                header += f" | {d['section']}"
             header += "]"
-            parts.append(f"{header}\n{d['content'][:800]}")
+            # Table chunks are kept whole so rows stay with their unit headers
+            content = d["content"] if d.get("chunk_type") == "table" else d["content"][:800]
+            parts.append(f"{header}\n{content}")
         return "\n\n---\n\n".join(parts)
 
     return f"Unknown tool: {name}"
 
 
+async def _execute_tools_parallel(tool_calls: list) -> AsyncGenerator[tuple[int, str], None]:
+    """
+    Run one turn's tool calls concurrently on the search pool.
+
+    All search queries are embedded up front in a single encoder call (the
+    per-tool searches then hit the embedding cache). Yields (index, result)
+    pairs in completion order.
+    """
+    inputs = [tc.input if isinstance(tc.input, dict) else {} for tc in tool_calls]
+    queries = [
+        args["query"] for tc, args in zip(tool_calls, inputs)
+        if tc.name == "search_documents" and args.get("query")
+    ]
+    if len(queries) > 1:
+        try:
+            await run_in_pool("search", embed_queries, queries)
+        except Exception as e:
+            print(f"Tool embedding batch failed: {e}")
+
+    async def run(idx: int) -> tuple[int, str]:
+        try:
+            return idx, await run_in_pool("search", _execute_tool, tool_calls[idx].name, inputs[idx])
+        except Exception as e:
+            return idx, f"Error running {tool_calls[idx].name}: {e}"
+
+    for finished in asyncio.as_completed([run(idx) for idx in range(len(tool_calls))]):
+        yield await finished
+
+
 def _make_serializable(content):
     """Ensure content blocks are JSON-serializable dicts (not SDK objects)."""
     if isinstance(content, str):
@@ -107,12 +142,10 @@ async def agentic_stream(
     Yields (event_type, event_data) tuples suitable for SSE streaming.
     Max iterations: 3 to prevent runaway loops.
     """
-    if not ANTHROPIC_API_KEY:
+    if not llm_available():
         yield ("token", {"text": "Error: ANTHROPIC_API_KEY is not configured."})
         return
 
-    client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
-
     messages = []
     if context:
         messages.append({
@@ -126,8 +159,7 @@ async def agentic_stream(
 
     for iteration in range(max_iterations):
         try:
-            response = client.messages.create(
-                model=LLM_MODEL,
+            response = await acreate_message(
                 max_tokens=2000,
                 system=SYSTEM_PROMPT,
                 tools=TOOLS,
@@ -152,39 +184,28 @@ async def agentic_stream(
         assistant_content = _make_serializable(response.content)
         messages.append({"role": "assistant", "content": assistant_content})
 
-        tool_results = []
-        for tc in tool_calls:
-            tool_name = tc.name
+        # Run this turn's tool calls concurrently; report each as it finishes
+        tool_results = [None] * len(tool_calls)
+        async for idx, result_text in _execute_tools_parallel(tool_calls):
+            tc = tool_calls[idx]
             tool_input = tc.input if isinstance(tc.input, dict) else {}
-            tool_id = tc.id
 
             yield ("step", {
                 "icon": "🔧",
-                "label": f"Tool: {tool_name}",
+                "label": f"Tool: {tc.name}",
                 "detail": json.dumps(tool_input, default=str)[:200],
             })
 
-            result_text = _execute_tool(tool_name, tool_input)
-            tool_results.append({
+            tool_results[idx] = {
                 "type": "tool_result",
-                "tool_use_id": tool_id,
+                "tool_use_id": tc.id,
                 "content": result_text[:4000],
-            })
+            }
 
         messages.append({"role": "user", "content": tool_results})
 
-    # If we exhausted iterations, do a final generation without tools
-    try:
-        response = client.messages.create(
-            model=LLM_MODEL,
-            max_tokens=2000,
-            system=SYSTEM_PROMPT,
-            messages=messages,
-        )
-        for block in response.content:
-            if getattr(block, "type", None) == "text":
-                yield ("token", {"text": block.text})
-    except Exception as e:
-        yield ("token", {"text": f"Error in final generation: {e}"})
+    # If we exhausted iterations, stream a final generation without tools
+    async for text in astream_messages(messages, system=SYSTEM_PROMPT):
+        yield ("token", {"text": text})
 
     yield ("done", {})
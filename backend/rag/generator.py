@@ -2,10 +2,10 @@
 LLM generation module for RAG pipeline.
 Handles response generation using Anthropic Claude with context from retrieved documents.
 """
-from typing import Optional
-import anthropic
+from typing import AsyncIterator, Optional
 
-from backend.core.config import ANTHROPIC_API_KEY, LLM_MODEL
+from backend.core.executor import offloaded
+from backend.core.llm import llm_available, create_message, stream_message, astream_message
 
 
 SYSTEM_PROMPT = """You are an expert competitive intelligence analyst specializing in the Electronics Manufacturing Services (EMS) industry. You analyze SEC filings, earnings transcripts, and financial data for Flex, Jabil, Celestica, Benchmark Electronics, and Sanmina.
@@ -79,15 +79,13 @@ def generate_response(
     Returns:
         Generated response text
     """
-    if not ANTHROPIC_API_KEY:
+    if not llm_available():
         return "Error: ANTHROPIC_API_KEY is not configured."
 
-    client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
     user_prompt = _build_prompt(query, context, web_context)
 
     try:
-        response = client.messages.create(
-            model=LLM_MODEL,
+        response = create_message(
             max_tokens=2000,
             system=SYSTEM_PROMPT,
             messages=[{"role": "user", "content": user_prompt}],
@@ -108,16 +106,14 @@ def generate_response_streaming(
     Yields text chunks as they arrive from the API. Uses
     client.messages.stream with max_tokens=2000, no extended thinking.
     """
-    if not ANTHROPIC_API_KEY:
+    if not llm_available():
         yield "Error: ANTHROPIC_API_KEY is not configured."
         return
 
-    client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
     user_prompt = _build_prompt(query, context, web_context)
 
     try:
-        with client.messages.stream(
-            model=LLM_MODEL,
+        with stream_message(
             max_tokens=2000,
             system=SYSTEM_PROMPT,
             messages=[{"role": "user", "content": user_prompt}],
@@ -133,14 +129,11 @@ def generate_summary(text: str) -> str:
     Generate a brief summary of the given text.
     Useful for summarising long document chunks.
     """
-    if not ANTHROPIC_API_KEY:
+    if not llm_available():
         return text[:500] + "..."
 
-    client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
-
     try:
-        response = client.messages.create(
-            model=LLM_MODEL,
+        response = create_message(
             max_tokens=300,
             system="Summarize the following financial/business text in 2-3 concise sentences.",
             messages=[{"role": "user", "content": text[:8000]}],
@@ -148,3 +141,52 @@ def generate_summary(text: str) -> str:
         return response.content[0].text
     except Exception as e:
         return text[:500] + "..."
+
+
+# ---------------------------------------------------------------------------
+# ASYNC GENERATION
+# ---------------------------------------------------------------------------
+agenerate_response = offloaded("llm", generate_response)
+agenerate_summary = offloaded("llm", generate_summary)
+
+
+async def astream_messages(
+    messages: list[dict],
+    system: str = SYSTEM_PROMPT,
+    max_tokens: int = 2000,
+) -> AsyncIterator[str]:
+    """
+    Stream text for a messages list with the shared async Anthropic client.
+
+    Token waits are awaited on the event loop, so open streams don't hold
+    threads. Errors are yielded as text, like generate_response_streaming().
+    """
+    if not llm_available():
+        yield "Error: ANTHROPIC_API_KEY is not configured."
+        return
+
+    try:
+        async with astream_message(
+            max_tokens=max_tokens,
+            system=system,
+            messages=messages,
+        ) as stream:
+            async for text in stream.text_stream:
+                yield text
+    except Exception as e:
+        yield f"\n\nError during streaming: {e}"
+
+
+async def agenerate_response_streaming(
+    query: str,
+    context: str,
+    web_context: str = "",
+) -> AsyncIterator[str]:
+    """
+    Async version of generate_response_streaming() for SSE handlers.
+
+    Yields text chunks as they arrive from the API.
+    """
+    user_prompt = _build_prompt(query, context, web_context)
+    async for text in astream_messages([{"role": "user", "content": user_prompt}]):
+        yield text
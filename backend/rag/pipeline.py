@@ -3,8 +3,8 @@ Hybrid RAG pipeline combining document retrieval, web search, and conversation m
 """
 from typing import Optional
 
-from backend.rag.retriever import search_documents
-from backend.rag.generator import generate_response, generate_response_streaming
+from backend.rag.retriever import asearch_documents
+from backend.rag.generator import agenerate_response
 from backend.rag.web_search import search_web
 from backend.rag.memory import add_message, get_conversation_history
 
@@ -15,7 +15,10 @@ def _format_docs(docs: list[dict]) -> str:
         return ""
     parts = []
     for i, doc in enumerate(docs, 1):
-        header = f"[{doc.get('company', '?')} | {doc.get('filing_type', '?')} | {doc.get('fiscal_year', '?')} {doc.get('quarter', '')}]"
+        header = f"[{doc.get('company', '?')} | {doc.get('filing_type', '?')} | {doc.get('fiscal_year', '?')} {doc.get('quarter', '')}"
+        if doc.get("section"):
+            header += f" | {doc['section']}"
+        header += "]"
         parts.append(f"--- Document {i} {header} ---\n{doc['content']}")
     return "\n\n".join(parts)
 
@@ -55,7 +58,7 @@ async def process_query(
     sources = []
 
     if mode in ("rag", "hybrid"):
-        docs = search_documents(query, company_filter=company_filter, n_results=n_results)
+        docs = await asearch_documents(query, company_filter=company_filter, n_results=n_results)
         context = _format_docs(docs)
         sources = [
             {
@@ -85,7 +88,7 @@ async def process_query(
             )
             context = f"## Conversation Context\n{history_text}\n\n{context}"
 
-    response = generate_response(query, context, web_context)
+    response = await agenerate_response(query, context, web_context)
 
     if session_id:
         add_message(session_id, "user", query)
@@ -1,11 +1,27 @@
 """
 Vector retrieval module for RAG pipeline.
 Handles document search with year detection, recency boosting, and re-ranking.
+Year and recency questions are pre-filtered in the ChromaDB where clause on
+the numeric period fields (fy_int, period_ordinal; see backend.core.periods).
+In "hybrid" mode (RETRIEVAL_MODE) the embedding results are fused with BM25
+results from the sparse index by reciprocal rank fusion (dense-only while
+the sparse index is being brought in sync in the background).
 """
 import re
 from typing import Optional
 
-from backend.core.database import get_collection, embed_text
+import numpy as np
+
+from backend.core.config import RETRIEVAL_MODE, RRF_K, RERANKER_CANDIDATES, RERANK_TOP_K, DEDUP_SEARCH_RESULTS
+from backend.core.cache import search_cache, cache_key
+from backend.core.database import (
+    get_collection, embed_queries, get_synced_metadata_index, get_ready_sparse_index, collection_generation,
+)
+from backend.core.embedding_cache import normalize_query_text
+from backend.core.periods import with_period_fields
+from backend.core.executor import offloaded
+from backend.core.near_duplicates import collapse_near_duplicates
+from backend.core.reranker import get_reranker
 
 
 def _extract_year_from_query(query: str) -> Optional[str]:
@@ -24,21 +40,6 @@ def _extract_year_from_query(query: str) -> Optional[str]:
     return None
 
 
-def _fiscal_year_variants(year: str) -> list[str]:
-    """Generate all common fiscal-year string variants for a given year."""
-    short = year[-2:]
-    return [
-        year,
-        f"FY{year}",
-        f"FY{short}",
-        f"fiscal {year}",
-        f"fiscal year {year}",
-        f"Fiscal Year {year}",
-        f"FY {year}",
-        f"FY {short}",
-    ]
-
-
 def _should_auto_detect_year(query: str) -> bool:
     """Determine whether the query contains an explicit year reference."""
     if re.search(r'\b(20[1-3]\d)\b', query):
@@ -67,106 +68,492 @@ def _wants_latest(query: str) -> bool:
     return False
 
 
-def _fy_sort_key(doc: dict) -> str:
-    """Sort key that orders documents by fiscal year descending."""
-    fy = doc.get("fiscal_year", "") or ""
-    match = re.search(r'(\d{4})', str(fy))
-    return match.group(1) if match else "0000"
+def _query_years(query: str) -> set[int]:
+    """Every year the query mentions ("2024", "FY24", "FY2024", "fiscal year 2024")."""
+    years = {int(y) for y in re.findall(r'\b(20[1-3]\d)\b', query)}
+    for y in re.findall(r'\bFY\s*(\d{2}|\d{4})\b', query, re.IGNORECASE):
+        years.add(int(f"20{y}") if len(y) == 2 else int(y))
+    return years
 
 
-def _quarter_sort_key(doc: dict) -> int:
-    """Sort key that orders documents by quarter descending."""
-    q = doc.get("quarter", "") or ""
-    match = re.search(r'Q(\d)', str(q))
-    return int(match.group(1)) if match else 0
+# Recency questions search the latest N quarters with data (per company in scope)
+RECENT_PERIODS = 4
+# Only these whole words/phrases turn recency into a hard filter; the looser
+# _RECENCY_KEYWORDS match ("new" in "renewable", "current liabilities") stays
+# a soft boost
+_HARD_RECENCY = re.compile(r"\b(?:latest|recent|current\s+(?:fiscal\s+)?(?:quarter|year|period))\b", re.IGNORECASE)
 
 
-def search_documents(
-    query: str,
-    company_filter: Optional[str] = None,
-    filing_type_filter: Optional[str] = None,
-    n_results: int = 20,
-) -> list[dict]:
+def _period_filter(query: str, periods: dict[str, dict[int, int]], company_filter: Optional[str] = None) -> dict:
     """
-    Search ChromaDB for relevant document chunks with re-ranking.
-
-    Applies year boosting when a year is detected in the query and
-    recency boosting when the query implies the user wants recent data.
+    Period pre-filter for a query from the per-company period index
+    (MetadataIndex.company_periods): {"fy_int": year} when it names exactly
+    one year and that year has chunks in scope, {"min_period": ordinal} when
+    it asks for the latest/recent data or the current quarter/year and names
+    no year, else {}. Everything else (several years, loose recency words,
+    "current liabilities") is left to the soft boosts in _rerank.
     """
-    collection = get_collection()
-    if collection.count() == 0:
-        return []
-
-    query_embedding = embed_text(query)
-
-    where_filter = None
-    if company_filter and filing_type_filter:
-        where_filter = {
-            "$and": [
-                {"company": company_filter},
-                {"filing_type": filing_type_filter},
-            ]
-        }
-    elif company_filter:
-        where_filter = {"company": company_filter}
-    elif filing_type_filter:
-        where_filter = {"filing_type": filing_type_filter}
-
-    fetch_n = min(n_results * 3, collection.count())
-
+    if company_filter:
+        scope = [periods[company_filter]] if periods.get(company_filter) else []
+    else:
+        scope = [p for p in periods.values() if p]
+    if not scope:
+        return {}
+
+    years = _query_years(query)
+    if len(years) == 1:
+        year = years.pop()
+        # period_ordinal = fy_int * 4 + quarter - 1
+        if any(ordinal // 4 == year for p in scope for ordinal in p):
+            return {"fy_int": year}
+        return {}
+    if years:
+        return {}
+    if _HARD_RECENCY.search(query):
+        return {"min_period": min(sorted(p, reverse=True)[:RECENT_PERIODS][-1] for p in scope)}
+    return {}
+
+
+def _build_where(
+    company_filter: Optional[str] = None,
+    filing_type_filter: Optional[str] = None,
+    fy_int: Optional[int] = None,
+    min_period: Optional[int] = None,
+) -> Optional[dict]:
+    """Build a ChromaDB where clause from the optional filters."""
+    conditions = []
+    if company_filter:
+        conditions.append({"company": company_filter})
+    if filing_type_filter:
+        conditions.append({"filing_type": filing_type_filter})
+    if fy_int:
+        conditions.append({"fy_int": fy_int})
+    if min_period:
+        conditions.append({"period_ordinal": {"$gte": min_period}})
+    if len(conditions) > 1:
+        return {"$and": conditions}
+    return conditions[0] if conditions else None
+
+
+def _query_collection(collection, embeddings: list, fetch_n: int, where_filter: Optional[dict]) -> dict:
+    """Run one (possibly multi-embedding) query, retrying without the filter on error."""
     try:
-        results = collection.query(
-            query_embeddings=[query_embedding],
+        return collection.query(
+            query_embeddings=embeddings,
             n_results=fetch_n,
             where=where_filter,
             include=["documents", "metadatas", "distances"],
         )
     except Exception:
-        results = collection.query(
-            query_embeddings=[query_embedding],
+        return collection.query(
+            query_embeddings=embeddings,
             n_results=fetch_n,
             include=["documents", "metadatas", "distances"],
         )
 
-    if not results or not results["documents"] or not results["documents"][0]:
-        return []
-
-    docs = []
-    for doc_text, metadata, distance in zip(
-        results["documents"][0],
-        results["metadatas"][0],
-        results["distances"][0],
-    ):
-        similarity = 1 - distance
-        docs.append({
-            "content": doc_text,
-            "company": metadata.get("company", "Unknown"),
-            "source": metadata.get("source_file", metadata.get("source", "Unknown")),
-            "filing_type": metadata.get("filing_type", "Unknown"),
-            "fiscal_year": metadata.get("fiscal_year", "Unknown"),
-            "quarter": metadata.get("quarter", ""),
-            "similarity": round(similarity, 4),
-        })
 
+def _rerank(
+    query: str,
+    docs: list[dict],
+    n_results: int,
+    score_key: str = "similarity",
+    boost_scale: float = 1.0,
+    dedup: bool = DEDUP_SEARCH_RESULTS,
+) -> list[dict]:
+    """
+    Apply year and recency boosting to raw hits and return the top n_results.
+    Boosts are added to doc[score_key], scaled by boost_scale. With dedup,
+    near-duplicates of a higher-ranked hit are skipped.
+    """
     # Year boosting
     detected_year = _extract_year_from_query(query)
     if detected_year:
-        variants = _fiscal_year_variants(detected_year)
+        year = int(detected_year)
         for doc in docs:
-            fy = str(doc.get("fiscal_year", ""))
-            if any(v.lower() in fy.lower() for v in variants):
-                doc["similarity"] += 0.15
+            if doc["fy_int"] == year:
+                doc[score_key] += 0.15 * boost_scale
 
     # Recency boosting
     if _wants_latest(query):
-        docs.sort(key=lambda d: (_fy_sort_key(d), _quarter_sort_key(d)), reverse=True)
+        docs.sort(key=lambda d: d["period_ordinal"], reverse=True)
         for i, doc in enumerate(docs):
-            doc["similarity"] += max(0, 0.10 - i * 0.005)
+            doc[score_key] += max(0, 0.10 - i * 0.005) * boost_scale
 
-    docs.sort(key=lambda d: d["similarity"], reverse=True)
+    docs.sort(key=lambda d: d[score_key], reverse=True)
+    if dedup:
+        return collapse_near_duplicates(docs, n_results)
     return docs[:n_results]
 
 
+def _to_doc(chunk_id: str, doc_text: str, metadata: dict, similarity: float) -> dict:
+    metadata = with_period_fields(metadata or {})
+    return {
+        "id": chunk_id,
+        "content": doc_text,
+        "company": metadata.get("company", "Unknown"),
+        "source": metadata.get("source_file", metadata.get("source", "Unknown")),
+        "filing_type": metadata.get("filing_type", "Unknown"),
+        "fiscal_year": metadata.get("fiscal_year", "Unknown"),
+        "quarter": metadata.get("quarter", ""),
+        "section": metadata.get("section", ""),
+        "chunk_type": metadata.get("chunk_type", "text"),
+        "fy_int": metadata["fy_int"],
+        "period_ordinal": metadata["period_ordinal"],
+        "simhash": metadata.get("simhash", ""),
+        "dup_of": metadata.get("dup_of", ""),
+        "similarity": round(similarity, 4),
+    }
+
+
+# ---------------------------------------------------------------------------
+# HYBRID (DENSE + BM25) FUSION
+# ---------------------------------------------------------------------------
+# RRF scores span ~1/RRF_K; scale the cosine-sized year/recency boosts so they
+# nudge the fused ranking about as much as they nudge a dense one
+RRF_BOOST_SCALE = 1 / 20
+
+
+def _fetch_sparse_only(collection, wanted: dict[str, set], embeddings: dict[str, list]) -> dict[str, dict]:
+    """
+    Load BM25 hits the dense search did not return (one collection.get for all
+    queries) and give each the cosine similarity to its query, so the
+    "similarity" field means the same thing in both modes.
+    wanted maps chunk id -> query strings that need it.
+    """
+    if not wanted:
+        return {}
+    got = collection.get(ids=list(wanted), include=["documents", "metadatas", "embeddings"])
+    docs = {}
+    for chunk_id, doc_text, metadata, vector in zip(
+        got["ids"], got["documents"], got["metadatas"], got["embeddings"],
+    ):
+        vector = np.asarray(vector, dtype=np.float32)
+        vector /= max(float(np.linalg.norm(vector)), 1e-12)
+        for query in wanted[chunk_id]:
+            q = np.asarray(embeddings[query], dtype=np.float32)
+            similarity = float(vector @ q) / max(float(np.linalg.norm(q)), 1e-12)
+            docs[(chunk_id, query)] = _to_doc(chunk_id, doc_text, metadata or {}, similarity)
+    return docs
+
+
+def _fuse(dense: list[dict], sparse_ids: list[str], sparse_docs: dict, query: str) -> list[dict]:
+    """Reciprocal rank fusion: score = sum over both rankings of 1 / (RRF_K + rank)."""
+    by_id = {doc["id"]: doc for doc in dense}
+    scores: dict[str, float] = {}
+    for rank, doc in enumerate(dense, 1):
+        scores[doc["id"]] = 1 / (RRF_K + rank)
+    for rank, chunk_id in enumerate(sparse_ids, 1):
+        scores[chunk_id] = scores.get(chunk_id, 0.0) + 1 / (RRF_K + rank)
+
+    fused = []
+    for chunk_id, score in scores.items():
+        doc = by_id.get(chunk_id)
+        if doc is None and (chunk_id, query) in sparse_docs:
+            doc = dict(sparse_docs[(chunk_id, query)])
+        if doc is not None:
+            doc["score"] = score
+            fused.append(doc)
+    return fused
+
+
+# ---------------------------------------------------------------------------
+# BATCHED SEARCH
+# ---------------------------------------------------------------------------
+def _dense_search(collection, embeddings: list, wheres: dict[int, Optional[dict]], limits: list[int], count: int) -> dict[int, list[dict]]:
+    """
+    Dense candidates (limit * 3 per query) for the queries in wheres, grouped
+    by where clause so each group is a single HNSW round trip.
+    """
+    groups: dict[str, dict] = {}
+    for idx, where_filter in wheres.items():
+        group = groups.setdefault(repr(where_filter), {"where": where_filter, "indices": []})
+        group["indices"].append(idx)
+
+    dense_docs: dict[int, list[dict]] = {}
+    for group in groups.values():
+        indices = group["indices"]
+        fetch_n = min(max(limits[i] for i in indices) * 3, count)
+        results = _query_collection(
+            collection,
+            [embeddings[i] for i in indices],
+            fetch_n,
+            group["where"],
+        )
+        if not results or not results["documents"]:
+            continue
+
+        for pos, idx in enumerate(indices):
+            # Trim the shared over-fetch back to this query's own candidate pool
+            own_n = min(limits[idx] * 3, count)
+            dense_docs[idx] = [
+                _to_doc(chunk_id, doc_text, metadata, 1 - distance)
+                for chunk_id, doc_text, metadata, distance in zip(
+                    results["ids"][pos][:own_n],
+                    results["documents"][pos][:own_n],
+                    results["metadatas"][pos][:own_n],
+                    results["distances"][pos][:own_n],
+                )
+            ]
+    return dense_docs
+
+
+def _result_cache_key(query: str, f: Optional[dict], n_results: int, mode: str, dedup: bool, generation: tuple) -> str:
+    """search_cache key: normalized query, filters, result count, mode, dedup and collection generation."""
+    f = f or {}
+    return cache_key(
+        "search",
+        normalize_query_text(query),
+        f.get("company_filter"),
+        f.get("filing_type_filter"),
+        f.get("n_results", n_results),
+        mode,
+        dedup,
+        generation,
+    )
+
+
+def _search_batch(
+    queries: list[str],
+    filters: list[Optional[dict]],
+    n_results: int,
+    mode: str = RETRIEVAL_MODE,
+    dedup: bool = DEDUP_SEARCH_RESULTS,
+) -> list[list[dict]]:
+    """
+    Embed all queries in one call and run one ChromaDB query per where clause;
+    in hybrid mode, also run each query against the BM25 index and fuse.
+    """
+    collection = get_collection()
+    count = collection.count()
+    if count == 0:
+        return [[] for _ in queries]
+    sparse = get_ready_sparse_index(count) if mode == "hybrid" else None
+
+    # Embed each distinct query string once
+    unique_queries = list(dict.fromkeys(queries))
+    unique_embeddings = embed_queries(unique_queries)
+    by_query = dict(zip(unique_queries, unique_embeddings))
+    embeddings = [by_query[q] for q in queries]
+
+    filters = [f or {} for f in filters]
+    limits = [f.get("n_results", n_results) for f in filters]
+    company_periods = get_synced_metadata_index(count).company_periods()
+    periods = [_period_filter(q, company_periods, f.get("company_filter")) for q, f in zip(queries, filters)]
+    wheres = {
+        idx: _build_where(f.get("company_filter"), f.get("filing_type_filter"), **periods[idx])
+        for idx, f in enumerate(filters)
+    }
+    dense_docs = _dense_search(collection, embeddings, wheres, limits, count)
+
+    # A thin period slice (or a collection indexed before the period fields
+    # existed) is topped up from the whole range; the year/recency boosts
+    # in _rerank still favour the requested periods
+    thin = {
+        idx: _build_where(f.get("company_filter"), f.get("filing_type_filter"))
+        for idx, f in enumerate(filters)
+        if periods[idx] and len(dense_docs.get(idx, [])) < limits[idx]
+    }
+    for idx, docs in _dense_search(collection, embeddings, thin, limits, count).items():
+        seen = {doc["id"] for doc in dense_docs.get(idx, [])}
+        dense_docs[idx] = dense_docs.get(idx, []) + [doc for doc in docs if doc["id"] not in seen]
+
+    batched: list[list[dict]] = [[] for _ in queries]
+    if sparse is None:
+        for idx, docs in dense_docs.items():
+            batched[idx] = _rerank(queries[idx], docs, limits[idx], dedup=dedup)
+        return batched
+
+    # BM25 candidates per query, with the same filters and candidate pool size
+    sparse_ids: dict[int, list[str]] = {}
+    wanted: dict[str, set] = {}
+    for idx, query in enumerate(queries):
+        f = filters[idx]
+        hits = sparse.search(
+            query,
+            min(limits[idx] * 3, count),
+            f.get("company_filter"),
+            f.get("filing_type_filter"),
+            **periods[idx],
+        )
+        sparse_ids[idx] = [chunk_id for chunk_id, _ in hits]
+        dense_ids = {doc["id"] for doc in dense_docs.get(idx, [])}
+        for chunk_id in sparse_ids[idx]:
+            if chunk_id not in dense_ids:
+                wanted.setdefault(chunk_id, set()).add(query)
+    sparse_docs = _fetch_sparse_only(collection, wanted, by_query)
+
+    for idx, query in enumerate(queries):
+        fused = _fuse(dense_docs.get(idx, []), sparse_ids[idx], sparse_docs, query)
+        batched[idx] = _rerank(query, fused, limits[idx], score_key="score", boost_scale=RRF_BOOST_SCALE, dedup=dedup)
+        for doc in batched[idx]:
+            doc["score"] = round(doc["score"], 5)
+    return batched
+
+
+def _resolve_mode(mode: Optional[str]) -> str:
+    """
+    The retrieval mode to run: hybrid falls back to dense while the BM25 index
+    is out of sync with the collection (it is brought up to date in the
+    background), so those results are cached as dense ones.
+    """
+    mode = mode or RETRIEVAL_MODE
+    if mode == "hybrid" and get_ready_sparse_index() is None:
+        return "dense"
+    return mode
+
+
+def search_documents_batch(
+    queries: list[str],
+    filters: Optional[list[Optional[dict]]] = None,
+    n_results: int = 20,
+    mode: Optional[str] = None,
+    dedup: Optional[bool] = None,
+) -> list[list[dict]]:
+    """
+    Search ChromaDB for several queries at once.
+
+    All queries are embedded in a single encoder call, and queries that share
+    the same where clause are sent to ChromaDB as one multi-embedding query.
+    Each result list is re-ranked exactly like search_documents(). Results
+    are cached in search_cache until the collection changes (see
+    collection_generation) or the TTL expires.
+
+    Args:
+        queries: Query strings
+        filters: Optional per-query dicts with any of company_filter,
+            filing_type_filter and n_results (overrides the default)
+        n_results: Default number of results per query
+        mode: "dense" or "hybrid" (defaults to RETRIEVAL_MODE; hybrid runs
+            dense-only while the BM25 index catches up with the collection)
+        dedup: Collapse near-duplicate chunks (defaults to DEDUP_SEARCH_RESULTS)
+
+    Returns:
+        One list of result dicts per query, in input order. Hybrid results
+        also carry the fused ranking "score"; "similarity" is always the
+        cosine similarity to the query.
+    """
+    if not queries:
+        return []
+    mode = _resolve_mode(mode)
+    dedup = DEDUP_SEARCH_RESULTS if dedup is None else dedup
+    if filters is None:
+        filters = [None] * len(queries)
+    if len(filters) != len(queries):
+        raise ValueError("filters must have the same length as queries")
+    generation = collection_generation()
+    keys = [_result_cache_key(q, f, n_results, mode, dedup, generation) for q, f in zip(queries, filters)]
+
+    batched: list[Optional[list[dict]]] = [None] * len(queries)
+    for idx, key in enumerate(keys):
+        cached = search_cache.get(key)
+        if cached is not None:
+            batched[idx] = [dict(doc) for doc in cached]
+
+    pending = [idx for idx, docs in enumerate(batched) if docs is None]
+    if pending:
+        fetched = _search_batch(
+            [queries[i] for i in pending],
+            [filters[i] for i in pending],
+            n_results,
+            mode,
+            dedup,
+        )
+        for idx, docs in zip(pending, fetched):
+            batched[idx] = docs
+            # Callers may annotate their dicts; the cache keeps its own copies
+            search_cache.set(keys[idx], [dict(doc) for doc in docs])
+
+    return batched
+
+
+def prefetch_documents(
+    queries: list[str],
+    filters: Optional[list[Optional[dict]]] = None,
+    n_results: int = 20,
+) -> int:
+    """
+    Run a batch of searches now and put the results in search_cache for later callers.
+
+    Used before fanning out to analytics functions that each issue their own
+    search_documents() call, so the whole fan-out costs one encoder pass.
+    The cache keys carry the collection generation, so nothing prefetched
+    outlives a write. Searches already in the cache are not repeated.
+    Returns the number of searches run.
+    """
+    if not queries:
+        return 0
+    if filters is None:
+        filters = [None] * len(queries)
+
+    mode = _resolve_mode(None)
+    generation = collection_generation()
+    keys = [_result_cache_key(q, f, n_results, mode, DEDUP_SEARCH_RESULTS, generation) for q, f in zip(queries, filters)]
+    pending = [idx for idx, key in enumerate(keys) if search_cache.get(key) is None]
+    if not pending:
+        return 0
+    results = _search_batch(
+        [queries[i] for i in pending],
+        [filters[i] for i in pending],
+        n_results,
+        mode,
+        DEDUP_SEARCH_RESULTS,
+    )
+    for idx, docs in zip(pending, results):
+        search_cache.set(keys[idx], [dict(doc) for doc in docs])
+    return len(results)
+
+
+def search_documents(
+    query: str,
+    company_filter: Optional[str] = None,
+    filing_type_filter: Optional[str] = None,
+    n_results: int = 20,
+    mode: Optional[str] = None,
+    dedup: Optional[bool] = None,
+) -> list[dict]:
+    """
+    Search ChromaDB for relevant document chunks with re-ranking.
+
+    In hybrid mode (the RETRIEVAL_MODE default) embedding and BM25 results
+    are fused by reciprocal rank. Applies year boosting when a year is
+    detected in the query and recency boosting when the query implies the
+    user wants recent data. dedup collapses near-duplicate chunks (defaults
+    to DEDUP_SEARCH_RESULTS).
+    """
+    return search_documents_batch(
+        [query],
+        [{"company_filter": company_filter, "filing_type_filter": filing_type_filter}],
+        n_results=n_results,
+        mode=mode,
+        dedup=dedup,
+    )[0]
+
+
+def search_reranked(
+    query: str,
+    company_filter: Optional[str] = None,
+    n_results: int = 15,
+    top_k: int = RERANK_TOP_K,
+) -> list[dict]:
+    """
+    Search, then keep the top_k chunks by cross-encoder score. Near-duplicate
+    chunks are collapsed so each of the few chunks sent to the LLM is distinct.
+
+    Without the re-ranker (RERANKER_ENABLED off, model still loading, or
+    scoring over its time budget) this is search_documents(query,
+    company_filter, n_results=n_results): the first n_results in retriever order.
+    """
+    reranker = get_reranker()
+    if reranker is None or reranker.model is None:
+        return search_documents(query, company_filter=company_filter, n_results=n_results, dedup=True)
+
+    candidates = search_documents(
+        query, company_filter=company_filter, n_results=max(n_results, RERANKER_CANDIDATES), dedup=True,
+    )
+    reranked = reranker.rerank(query, candidates, min(top_k, n_results))
+    return reranked if reranked is not None else candidates[:n_results]
+
+
 def search_by_company(
     query: str,
     company: str,
@@ -215,3 +602,14 @@ def get_company_documents(company: str, limit: int = 100) -> list[dict]:
         })
 
     return docs
+
+
+# ---------------------------------------------------------------------------
+# ASYNC WRAPPERS (run on the "search" pool; use these from async handlers)
+# ---------------------------------------------------------------------------
+asearch_documents = offloaded("search", search_documents)
+asearch_documents_batch = offloaded("search", search_documents_batch)
+asearch_reranked = offloaded("search", search_reranked)
+aprefetch_documents = offloaded("search", prefetch_documents)
+asearch_cross_company = offloaded("search", search_cross_company)
+aget_company_documents = offloaded("search", get_company_documents)
@@ -0,0 +1,119 @@
+"""build_chromadb's extract → embed → upsert pipeline: checkpoints, resume and skipped files."""
+import importlib.util
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from backend.core.content_manifest import ContentManifest, file_key
+from backend.core.sparse_index import SparseIndex
+from backend.core.stats_index import MetadataIndex
+
+SCRIPT = Path(__file__).resolve().parent.parent / "Vector Database" / "build_chromadb.py"
+
+
+@pytest.fixture(scope="module")
+def build():
+    spec = importlib.util.spec_from_file_location("build_chromadb", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["build_chromadb"] = module     # worker processes unpickle prepare_file by module name
+    spec.loader.exec_module(module)
+    yield module
+    sys.modules.pop("build_chromadb", None)
+
+
+class FakeCollection:
+    def __init__(self, fail_on: str = None):
+        self.chunks: dict[str, dict] = {}
+        self.upserted: list[str] = []
+        self.fail_on = fail_on
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        if self.fail_on and any(self.fail_on in chunk_id for chunk_id in ids):
+            raise RuntimeError("disk full")
+        self.upserted += ids
+        self.chunks.update(zip(ids, metadatas))
+
+    def update(self, ids, metadatas):
+        self.chunks.update(zip(ids, metadatas))
+
+    def delete(self, ids):
+        for chunk_id in ids:
+            self.chunks.pop(chunk_id, None)
+
+
+class FakeModel:
+    def encode(self, texts, **kwargs):
+        return np.zeros((len(texts), 4), dtype=np.float32)
+
+
+class Build:
+    def __init__(self, build, tmp_path, monkeypatch):
+        self.module = build
+        self.tmp_path = tmp_path
+        self.texts: dict[str, str] = {}
+        # Extraction reads our table (inherited by the forked worker processes)
+        monkeypatch.setattr(build, "extract", lambda path, sha=None, pages=None, layout=False: self.texts[path.name])
+        self.manifest = ContentManifest(tmp_path / "manifest.json")
+        self.index = MetadataIndex(tmp_path / "stats.json")
+        self.sparse = SparseIndex(tmp_path / "sparse.json")
+
+    def write(self, name: str, content: str, extracted: str = None) -> tuple:
+        path = self.tmp_path / name
+        path.write_text(content)
+        self.texts[name] = content if extracted is None else extracted
+        return path, "Flex", "10-K"
+
+    def run(self, files, collection, embed_batch=1):
+        return self.module._run_pipeline(
+            files, collection, FakeModel(), self.index, self.sparse, self.manifest,
+            defaultdict(lambda: defaultdict(int)), defaultdict(lambda: defaultdict(int)), 1, embed_batch,
+        )
+
+    def known(self, f) -> bool:
+        return self.manifest.known_sha(file_key(f[0]), f[0]) is not None
+
+
+@pytest.fixture
+def env(build, tmp_path, monkeypatch):
+    return Build(build, tmp_path, monkeypatch)
+
+
+def _words(n: int, prefix: str) -> str:
+    return " ".join(f"{prefix}{i}" for i in range(n))
+
+
+def test_files_are_checkpointed_and_skipped_on_rerun(env):
+    collection = FakeCollection()
+    files = [env.write("a_10k.htm", _words(600, "a")), env.write("b_10k.htm", _words(600, "b"))]
+    assert env.run(files, collection)
+    assert all(env.known(f) for f in files)
+    assert len(collection.chunks) == 6
+    collection.upserted.clear()
+    assert env.run(files, collection)
+    assert collection.upserted == []
+
+
+def test_failed_upsert_leaves_later_files_for_resume(env):
+    collection = FakeCollection(fail_on="b_10k")
+    first = env.write("a_10k.htm", _words(600, "a"))
+    second = env.write("b_10k.htm", _words(600, "b"))
+    with pytest.raises(RuntimeError):
+        env.run([first, second], collection)
+    assert env.known(first)
+    assert not env.known(second)
+
+
+def test_empty_extraction_keeps_indexed_chunks(env):
+    collection = FakeCollection()
+    f = env.write("a_10k.htm", _words(600, "a"))
+    env.run([f], collection)
+    before = env.manifest.chunk_ids(file_key(f[0]))
+    # Same file rewritten; extraction now fails quietly (e.g. a PDF parser error)
+    f = env.write("a_10k.htm", _words(600, "a") + " changed", extracted="")
+    assert env.run([f], collection)
+    assert len(collection.chunks) == 3
+    assert env.manifest.chunk_ids(file_key(f[0])) == before
+    assert not env.known(f)
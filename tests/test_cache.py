@@ -0,0 +1,24 @@
+"""SimpleCache TTL/LRU behaviour."""
+from backend.core.cache import SimpleCache
+
+
+def test_lru_evicts_least_recently_used():
+    cache = SimpleCache(default_ttl=60, max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1      # "a" is now the most recently used
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_expired_entries_miss_and_stale_ones_are_looked_up():
+    cache = SimpleCache(default_ttl=60)
+    cache.set("gone", 1, ttl=0)
+    cache.set("stale", 2, ttl=0, stale_ttl=60)
+    assert cache.get("gone") is None
+    assert cache.get("stale") is None
+    assert cache.lookup("stale") == (2, "stale")
+    assert cache.sweep() == 0       # the expired entry was already dropped by get()
@@ -0,0 +1,40 @@
+"""The streaming word-window chunker against the list-slicing chunker it replaced."""
+import pytest
+
+from backend.core.chunking import iter_chunks, count_chunks
+
+
+def _chunk_text(text: str, chunk_words: int = 250, overlap_words: int = 50) -> list[str]:
+    """The original ingestion chunker (whole word list in memory)."""
+    words = text.split()
+    if not words:
+        return []
+    chunks = []
+    i = 0
+    while i < len(words):
+        chunks.append(" ".join(words[i:i + chunk_words]).strip())
+        i += chunk_words - overlap_words
+    return [c for c in chunks if len(c) > 50]
+
+
+def _text(n_words: int) -> str:
+    return "\n".join(" ".join(f"word{i}" for i in range(start, min(start + 7, n_words)))
+                     for start in range(0, n_words, 7))
+
+
+@pytest.mark.parametrize("n_words", [0, 1, 12, 49, 50, 199, 200, 201, 250, 251, 449, 450, 451, 1000, 1234])
+def test_matches_old_chunker(n_words):
+    text = _text(n_words)
+    assert list(iter_chunks(text)) == _chunk_text(text)
+    assert count_chunks(text) == len(_chunk_text(text))
+
+
+@pytest.mark.parametrize("chunk_words,overlap_words", [(10, 3), (5, 0), (8, 7)])
+def test_matches_old_chunker_with_other_windows(chunk_words, overlap_words):
+    text = _text(137)
+    assert list(iter_chunks(text, chunk_words, overlap_words)) == _chunk_text(text, chunk_words, overlap_words)
+
+
+def test_pages_stream_like_the_joined_text():
+    pages = [_text(300), _text(180), "", _text(75)]
+    assert list(iter_chunks(pages)) == _chunk_text("\n\n".join(pages))
@@ -0,0 +1,59 @@
+"""ContentManifest shared between processes (the API and build_chromadb)."""
+from backend.core.content_manifest import ContentManifest
+
+
+def _record(manifest, tmp_path, key):
+    path = tmp_path / key
+    path.write_text(key)
+    manifest.record(key, path, f"sha-{key}", {f"{key}_chunk0000": ["t", "m"]})
+
+
+def test_unchanged_manifest_is_not_rewritten(tmp_path):
+    manifest = ContentManifest(tmp_path / "manifest.json")
+    _record(manifest, tmp_path, "a")
+    manifest.save()
+    saved = manifest.path.stat().st_mtime_ns
+    manifest.chunk_ids("a")
+    manifest.save()
+    assert manifest.path.stat().st_mtime_ns == saved
+
+
+def test_saves_from_two_processes_merge(tmp_path):
+    api = ContentManifest(tmp_path / "manifest.json")
+    build = ContentManifest(tmp_path / "manifest.json")
+    _record(api, tmp_path, "a")
+    _record(build, tmp_path, "b")
+    api.save()
+    build.save()
+    assert api.chunk_ids("b") == ["b_chunk0000"]
+    assert ContentManifest(tmp_path / "manifest.json").chunk_ids("a") == ["a_chunk0000"]
+
+
+def test_local_changes_win_over_disk(tmp_path):
+    api = ContentManifest(tmp_path / "manifest.json")
+    build = ContentManifest(tmp_path / "manifest.json")
+    _record(api, tmp_path, "a")
+    _record(api, tmp_path, "b")
+    api.save()
+    assert build.chunk_ids("a") == ["a_chunk0000"]
+    build.forget("a")
+    _record(api, tmp_path, "c")
+    api.save()
+    build.save()
+    fresh = ContentManifest(tmp_path / "manifest.json")
+    assert fresh.chunk_ids("a") == []
+    assert fresh.chunk_ids("b") == ["b_chunk0000"]
+    assert fresh.chunk_ids("c") == ["c_chunk0000"]
+
+
+def test_clear_replaces_the_file(tmp_path):
+    api = ContentManifest(tmp_path / "manifest.json")
+    _record(api, tmp_path, "a")
+    api.save()
+    build = ContentManifest(tmp_path / "manifest.json")
+    build.clear()
+    _record(build, tmp_path, "b")
+    build.save()
+    fresh = ContentManifest(tmp_path / "manifest.json")
+    assert fresh.chunk_ids("a") == []
+    assert fresh.chunk_ids("b") == ["b_chunk0000"]
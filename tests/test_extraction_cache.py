@@ -0,0 +1,76 @@
+"""Extraction cache keyed by file content hash and extractor version."""
+import pytest
+
+from backend.core import extraction_cache
+from backend.core.extraction_cache import ExtractionCache, cached_extract
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = ExtractionCache(tmp_path / "cache")
+    monkeypatch.setattr(extraction_cache, "_cache", cache)
+    return cache
+
+
+class Extractor:
+    def __init__(self, value="text"):
+        self.value = value
+        self.calls = 0
+
+    def __call__(self, path):
+        self.calls += 1
+        return self.value
+
+
+def test_hit_after_miss(cache, tmp_path):
+    doc = tmp_path / "a.htm"
+    doc.write_text("<p>hello</p>")
+    extract = Extractor()
+    assert cached_extract(doc, "html_text", 1, extract) == "text"
+    assert cached_extract(doc, "html_text", 1, extract) == "text"
+    assert extract.calls == 1
+    assert cache.stats() == {"enabled": True, "hits": 1, "misses": 1}
+
+
+def test_renamed_file_hits_and_edited_file_misses(cache, tmp_path):
+    doc = tmp_path / "a.htm"
+    doc.write_text("<p>hello</p>")
+    extract = Extractor()
+    cached_extract(doc, "html_text", 1, extract)
+    moved = doc.rename(tmp_path / "b.htm")
+    cached_extract(moved, "html_text", 1, extract)
+    assert extract.calls == 1
+    moved.write_text("<p>changed</p>")
+    cached_extract(moved, "html_text", 1, extract)
+    assert extract.calls == 2
+
+
+def test_version_and_namespace_are_part_of_the_key(cache, tmp_path):
+    doc = tmp_path / "a.pdf"
+    doc.write_bytes(b"%PDF")
+    extract = Extractor()
+    cached_extract(doc, "pdf_text", 1, extract)
+    cached_extract(doc, "pdf_text", 2, extract)
+    cached_extract(doc, "pdf_layout", 1, extract)
+    assert extract.calls == 3
+    assert cache.contains("pdf_text", 1, "0" * 64) is False
+
+
+def test_empty_results_are_not_cached(cache, tmp_path):
+    doc = tmp_path / "a.htm"
+    doc.write_text("x")
+    extract = Extractor(value="")
+    cached_extract(doc, "html_text", 1, extract)
+    cached_extract(doc, "html_text", 1, extract)
+    assert extract.calls == 2
+
+
+def test_disabled_cache_always_extracts(tmp_path, monkeypatch):
+    monkeypatch.setattr(extraction_cache, "_cache", ExtractionCache(tmp_path / "cache", enabled=False))
+    doc = tmp_path / "a.htm"
+    doc.write_text("x")
+    extract = Extractor()
+    cached_extract(doc, "html_text", 1, extract)
+    cached_extract(doc, "html_text", 1, extract)
+    assert extract.calls == 2
+    assert not (tmp_path / "cache").exists()
@@ -0,0 +1,30 @@
+"""SimHash fingerprints and near-duplicate collapsing."""
+from backend.core.near_duplicates import collapse_near_duplicates, simhash, simhash_hex, hamming, _clusters
+
+
+TEXT = "capital expenditures rose to 2.1 billion driven by data center buildout in Texas and Mexico this year"
+
+
+def test_simhash_is_stable_and_close_for_near_duplicates():
+    assert simhash("") == 0
+    assert simhash_hex(TEXT) == simhash_hex(TEXT.upper())
+    assert hamming(simhash(TEXT), simhash(TEXT + " today")) < hamming(simhash(TEXT), simhash("unrelated revenue text about cash"))
+
+
+def test_collapse_keeps_first_of_each_cluster():
+    fp = simhash_hex(TEXT)
+    docs = [
+        {"id": "a", "content": TEXT, "simhash": fp},
+        {"id": "b", "content": TEXT, "simhash": fp},               # same fingerprint
+        {"id": "c", "content": TEXT, "dup_of": "a"},               # marked by the dedup pass
+        {"id": "d", "content": TEXT},                              # no fingerprint: not hashed
+        {"id": "e", "content": "other", "simhash": simhash_hex("other text entirely")},
+    ]
+    assert [doc["id"] for doc in collapse_near_duplicates(docs, 10)] == ["a", "d", "e"]
+    assert [doc["id"] for doc in collapse_near_duplicates(docs, 2)] == ["a", "d"]
+
+
+def test_clusters_group_fingerprints_within_distance():
+    base = simhash(TEXT)
+    clusters = _clusters({"a": base, "b": base ^ 0b101, "c": base ^ (0xFFFF << 20)}, max_distance=3)
+    assert [sorted(members) for members in clusters] == [["a", "b"]]
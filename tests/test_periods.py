@@ -0,0 +1,86 @@
+"""Fiscal period parsing and the retriever's hard period filters."""
+import pytest
+
+from backend.core.periods import (
+    fiscal_period, last_quarter_end, parse_fiscal_year, parse_quarter, period_fields, with_period_fields,
+)
+from backend.rag.retriever import _period_filter
+
+
+@pytest.mark.parametrize("value,year", [
+    ("FY25", 2025), ("FY2024", 2024), ("fiscal 2023", 2023), ("2022", 2022), ("FY '21", 2021),
+    ("", 0), (None, 0), ("Unknown", 0),
+])
+def test_parse_fiscal_year(value, year):
+    assert parse_fiscal_year(value) == year
+
+
+def test_period_fields():
+    assert parse_quarter("Q3") == 3
+    assert parse_quarter("") == 0
+    assert period_fields("FY24", "Q2") == {"fy_int": 2024, "q_int": 2, "period_ordinal": 2024 * 4 + 1}
+    # Annual (no quarter) counts as Q4; no year means no ordinal
+    assert period_fields("2024", "")["period_ordinal"] == 2024 * 4 + 3
+    assert period_fields("Unknown", "Q1")["period_ordinal"] == 0
+
+
+@pytest.mark.parametrize("period_end,fye_month,expected", [
+    ("2024-12-31", 12, ("FY24", "Q4")),     # calendar year
+    ("2024-06-30", 3, ("FY25", "Q1")),      # Flex: March year end
+    ("2025-03-31", 3, ("FY25", "Q4")),
+    ("2024-08-31", 8, ("FY24", "Q4")),      # Jabil: August year end
+    ("2024-11-30", 8, ("FY25", "Q1")),
+])
+def test_fiscal_period(period_end, fye_month, expected):
+    assert fiscal_period(period_end, fye_month) == expected
+
+
+def test_last_quarter_end():
+    assert last_quarter_end("2025-02-14", 12) == "2024-12"
+    assert last_quarter_end("2024-07-26", 3) == "2024-06"
+    assert last_quarter_end("2024-05-20", 3) == "2024-03"
+
+
+def test_with_period_fields_keeps_existing_fields():
+    meta = {"fiscal_year": "FY24", "fy_int": 1999, "q_int": 0, "period_ordinal": 7}
+    assert with_period_fields(meta) is meta
+    assert with_period_fields({"fiscal_year": "FY24"})["fy_int"] == 2024
+
+
+def _ordinals(*years):
+    return {year * 4 + q: 10 for year in years for q in range(4)}
+
+
+PERIODS = {"Flex": _ordinals(2022, 2023, 2024), "Jabil": _ordinals(2023, 2024)}
+
+
+def test_one_year_with_data_is_a_hard_filter():
+    assert _period_filter("capex in FY24", PERIODS) == {"fy_int": 2024}
+    assert _period_filter("Flex capex 2022", PERIODS, "Flex") == {"fy_int": 2022}
+
+
+def test_year_without_data_is_not_filtered():
+    assert _period_filter("Jabil capex 2022", PERIODS, "Jabil") == {}
+
+
+def test_several_years_are_not_filtered():
+    assert _period_filter("compare FY2022 to FY2024", PERIODS) == {}
+    assert _period_filter("capex 2023 vs 2024", PERIODS, "Flex") == {}
+
+
+def test_recency_word_filters_to_latest_quarters():
+    assert _period_filter("latest capex guidance", PERIODS) == {"min_period": 2024 * 4}
+    assert _period_filter("most recent capex", PERIODS, "Flex") == {"min_period": 2024 * 4}
+    assert _period_filter("capex guidance for the current fiscal year", PERIODS) == {"min_period": 2024 * 4}
+
+
+@pytest.mark.parametrize("query", [
+    "renewable energy news Newark",     # "new" inside words
+    "currently planned expansions",     # "current" inside a word
+    "recently announced plants",
+    "updated capex outlook",            # soft recency keyword only
+    "Flex current liabilities and current assets trend",   # accounting "current"
+    "Flex current portion of long-term debt",
+])
+def test_recency_substrings_are_not_filtered(query):
+    assert _period_filter(query, PERIODS) == {}
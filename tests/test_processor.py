@@ -0,0 +1,155 @@
+"""Incremental process_filing: manifest skip/update/delete plans and empty extraction."""
+import pytest
+
+from backend.core.content_manifest import ContentManifest
+from backend.ingestion import processor
+
+
+class FakeCollection:
+    def __init__(self):
+        self.chunks: dict[str, tuple[str, dict]] = {}
+        self.calls: list[tuple[str, list[str]]] = []
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        self.calls.append(("upsert", list(ids)))
+        self.chunks.update(zip(ids, zip(documents, metadatas)))
+
+    def update(self, ids, metadatas):
+        self.calls.append(("update", list(ids)))
+        for chunk_id, meta in zip(ids, metadatas):
+            self.chunks[chunk_id] = (self.chunks[chunk_id][0], meta)
+
+    def delete(self, ids):
+        self.calls.append(("delete", list(ids)))
+        for chunk_id in ids:
+            self.chunks.pop(chunk_id, None)
+
+
+class FakeIndex:
+    def __init__(self, collection):
+        self.collection = collection
+
+    def contains(self, ids):
+        return all(chunk_id in self.collection.chunks for chunk_id in ids)
+
+
+class Env:
+    def __init__(self, tmp_path, monkeypatch):
+        self.collection = FakeCollection()
+        self.manifest = ContentManifest(tmp_path / "manifest.json")
+        self.filing = tmp_path / "flex_10k.htm"
+        self.text = ""
+        monkeypatch.setattr(processor, "CHUNKING_STRATEGY", "words")
+        monkeypatch.setattr(processor, "get_collection", lambda: self.collection)
+        monkeypatch.setattr(processor, "get_content_manifest", lambda: self.manifest)
+        monkeypatch.setattr(processor, "get_metadata_index", lambda: FakeIndex(self.collection))
+        monkeypatch.setattr(processor, "embed_texts", lambda texts: [[0.0] * 4 for _ in texts])
+        monkeypatch.setattr(processor, "record_upsert", lambda *args: None)
+        monkeypatch.setattr(processor, "record_delete", lambda *args: None)
+        monkeypatch.setattr(processor, "save_metadata_index", lambda: None)
+        monkeypatch.setattr(processor, "_extract_text_strict", lambda *args, **kwargs: self.extract())
+
+    def extract(self) -> str:
+        return self.text
+
+    def write(self, content: str, extracted: str = None) -> None:
+        """Write the filing; extracted is what text extraction returns (default: content)."""
+        self.filing.write_text(content)
+        self.text = content if extracted is None else extracted
+
+    def process(self, fiscal_year: str = "FY24") -> int:
+        self.collection.calls.clear()
+        return processor.process_filing(self.filing, "Flex", "10-K", fiscal_year)
+
+    def recorded_ids(self) -> list[str]:
+        return self.manifest.chunk_ids(processor.file_key(self.filing))
+
+
+@pytest.fixture
+def env(tmp_path, monkeypatch):
+    return Env(tmp_path, monkeypatch)
+
+
+def _words(n: int, prefix: str = "w") -> str:
+    return " ".join(f"{prefix}{i}" for i in range(n))
+
+
+def test_new_file_embeds_every_chunk(env):
+    env.write(_words(1000))
+    assert env.process() == 5
+    assert sorted(env.recorded_ids()) == sorted(env.collection.chunks)
+
+
+def test_unchanged_file_is_skipped(env):
+    env.write(_words(1000))
+    env.process()
+    saved = env.manifest.path.stat().st_mtime_ns
+    assert env.process() == 0
+    assert env.collection.calls == []
+    # Nothing changed, so the manifest isn't rewritten
+    assert env.manifest.path.stat().st_mtime_ns == saved
+
+
+def test_metadata_change_patches_in_place(env):
+    text = _words(1000)
+    env.write(text)
+    env.process()
+    env.write(text + "\n<!-- touched -->", extracted=text)
+    assert env.process(fiscal_year="FY25") == 0
+    assert [kind for kind, _ in env.collection.calls] == ["update"]
+    assert all(meta["fy_int"] == 2025 for _, meta in env.collection.chunks.values())
+
+
+def test_changed_and_vanished_chunks(env):
+    env.write(_words(1000))
+    env.process()
+    # Shorter, and different from word 300 on
+    env.write(_words(300) + " " + _words(300, prefix="x"))
+    embedded = env.process()
+    kinds = [kind for kind, _ in env.collection.calls]
+    assert 0 < embedded < 5
+    assert kinds[-1] == "delete"
+    assert len(env.collection.chunks) == len(env.recorded_ids()) == 3
+
+
+def test_empty_extraction_keeps_chunks_and_manifest(env):
+    env.write(_words(1000))
+    env.process()
+    before = sorted(env.recorded_ids())
+    env.write("<html><img src=scan.png></html>", extracted="")
+    assert env.process() == 0
+    assert env.collection.calls == []
+    assert sorted(env.recorded_ids()) == before
+    assert len(env.collection.chunks) == 5
+    # Not recorded as processed: the file is looked at again next time
+    assert env.manifest.known_sha(processor.file_key(env.filing), env.filing) is None
+
+
+def test_extraction_error_propagates_and_keeps_chunks(env, monkeypatch):
+    env.write(_words(1000))
+    env.process()
+
+    def fail(*args, **kwargs):
+        raise OSError("corrupt PDF")
+
+    monkeypatch.setattr(processor, "_extract_text_strict", fail)
+    env.write(_words(1000) + " more")
+    with pytest.raises(OSError):
+        env.process()
+    assert env.collection.calls == []
+    assert len(env.collection.chunks) == 5
+
+
+def test_filing_fields_uses_the_fiscal_calendar():
+    # A 10-K filed in February for calendar 2024 is FY24, not FY25
+    fields = processor.filing_fields({
+        "ticker": "BHE", "form": "10-K", "filing_date": "2025-02-26", "report_date": "2024-12-31",
+        "local_path": "/tmp/BHE_10-K.htm",
+    })
+    assert (fields["company"], fields["fiscal_year"], fields["quarter"]) == ("Benchmark", "FY24", "")
+    # Flex's fiscal year ends in March; without a reportDate the filing date still places it
+    fields = processor.filing_fields({"ticker": "FLEX", "form": "10-Q", "filing_date": "2024-07-26"})
+    assert (fields["fiscal_year"], fields["quarter"]) == ("FY25", "Q1")
+    # Explicit processor keys win
+    fields = processor.filing_fields({"filepath": "x.pdf", "fiscal_year": "FY23", "quarter": "Q2"})
+    assert (fields["fiscal_year"], fields["quarter"]) == ("FY23", "Q2")
@@ -0,0 +1,110 @@
+"""Budgeted cross-encoder re-ranking and the retriever's fallback ordering."""
+import time
+
+import pytest
+
+from backend.core.reranker import CrossEncoderReranker
+from backend.rag import retriever
+
+
+class FakeCrossEncoder:
+    """Scores a pair by the number of query words in the chunk."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.pairs = 0
+
+    def predict(self, pairs, batch_size=32, show_progress_bar=False):
+        time.sleep(self.delay)
+        self.pairs += len(pairs)
+        return [float(sum(word in content for word in query.split())) for query, content in pairs]
+
+
+def _docs():
+    return [
+        {"id": "a", "content": "revenue grew"},
+        {"id": "b", "content": "capex guidance raised for data center capacity"},
+        {"id": "c", "content": "capex was flat"},
+    ]
+
+
+def _reranker(model=None, **kwargs):
+    reranker = CrossEncoderReranker(model_name="fake", batch_size=2, budget_ms=1000, cache_size=8, **kwargs)
+    reranker.model = model
+    return reranker
+
+
+def test_not_ready_falls_back():
+    reranker = _reranker()
+    assert reranker.rerank("capex guidance", _docs(), top_k=2) is None
+    assert reranker.stats()["fallbacks"]["not_ready"] == 1
+
+
+def test_rerank_orders_by_score_and_keeps_top_k():
+    reranker = _reranker(FakeCrossEncoder())
+    ranked = reranker.rerank("capex guidance", _docs(), top_k=2)
+    assert [doc["id"] for doc in ranked] == ["b", "c"]
+    assert ranked[0]["rerank_score"] == 2.0
+
+
+def test_scores_are_cached_per_query_and_chunk():
+    model = FakeCrossEncoder()
+    reranker = _reranker(model)
+    reranker.rerank("capex guidance", _docs(), top_k=2)
+    reranker.rerank("Capex  guidance", _docs(), top_k=2)
+    assert model.pairs == 3
+    assert reranker.stats()["cache_hits"] == 3
+    # Same id, new text: the cached score is stale
+    docs = _docs()
+    docs[0]["content"] = "capex guidance cut"
+    reranker.rerank("capex guidance", docs, top_k=1)
+    assert model.pairs == 4
+
+
+def test_budget_exhausted_falls_back_and_keeps_partial_scores():
+    model = FakeCrossEncoder(delay=0.05)
+    reranker = _reranker(model)
+    assert reranker.rerank("capex guidance", _docs(), top_k=2, budget_ms=10) is None
+    assert reranker.stats()["fallbacks"]["budget"] == 1
+    # The first batch was scored and cached before the budget ran out
+    assert model.pairs == 2
+    assert reranker.rerank("capex guidance", _docs(), top_k=2) is not None
+    assert model.pairs == 3
+
+
+def test_zero_budget_scores_nothing_unless_cached():
+    model = FakeCrossEncoder()
+    reranker = _reranker(model)
+    assert reranker.rerank("capex guidance", _docs(), top_k=2, budget_ms=0) is None
+    assert model.pairs == 0
+    reranker.rerank("capex guidance", _docs(), top_k=2)
+    assert reranker.rerank("capex guidance", _docs(), top_k=2, budget_ms=0) is not None
+
+
+@pytest.fixture
+def search(monkeypatch):
+    calls = []
+
+    def fake_search(query, company_filter=None, n_results=10, dedup=None, **kwargs):
+        calls.append(n_results)
+        return _docs()[:n_results]
+
+    monkeypatch.setattr(retriever, "search_documents", fake_search)
+    monkeypatch.setattr(retriever, "RERANKER_CANDIDATES", 3)
+    return calls
+
+
+def test_search_reranked_keeps_retriever_order_over_budget(search, monkeypatch):
+    reranker = _reranker(FakeCrossEncoder(delay=0.05))
+    reranker.budget_ms = 10
+    monkeypatch.setattr(retriever, "get_reranker", lambda: reranker)
+    results = retriever.search_reranked("capex guidance", n_results=2, top_k=2)
+    assert [doc["id"] for doc in results] == ["a", "b"]
+    assert search == [3]
+
+
+def test_search_reranked_without_model(search, monkeypatch):
+    monkeypatch.setattr(retriever, "get_reranker", lambda: _reranker())
+    results = retriever.search_reranked("capex guidance", n_results=2, top_k=1)
+    assert [doc["id"] for doc in results] == ["a", "b"]
+    assert search == [2]
@@ -0,0 +1,68 @@
+"""search_cache hand-off in search_documents_batch, versioned by collection generation."""
+import pytest
+
+from backend.core.cache import search_cache
+from backend.rag import retriever
+
+
+@pytest.fixture
+def searches(monkeypatch):
+    """Stubbed retrieval: records each batched search and returns one doc per query."""
+    calls = []
+    generation = {"value": (1, 0)}
+
+    def search_batch(queries, filters, n_results, mode, dedup=False):
+        calls.append(list(queries))
+        return [[{"id": f"{query}@{generation['value'][0]}", "content": query}] for query in queries]
+
+    search_cache.clear()
+    monkeypatch.setattr(retriever, "_search_batch", search_batch)
+    monkeypatch.setattr(retriever, "_resolve_mode", lambda mode: mode or "dense")
+    monkeypatch.setattr(retriever, "collection_generation", lambda: generation["value"])
+    yield calls, generation
+    search_cache.clear()
+
+
+def test_repeat_search_is_served_from_cache(searches):
+    calls, _ = searches
+    first = retriever.search_documents("capex outlook")
+    first[0]["annotated"] = True
+    second = retriever.search_documents("  capex   outlook ")
+    assert len(calls) == 1
+    assert second == [{"id": "capex outlook@1", "content": "capex outlook"}]
+
+
+def test_generation_change_invalidates(searches):
+    calls, generation = searches
+    retriever.search_documents("capex outlook")
+    generation["value"] = (2, 0)
+    assert retriever.search_documents("capex outlook")[0]["id"] == "capex outlook@2"
+    assert len(calls) == 2
+
+
+def test_prefetched_results_do_not_outlive_a_write(searches):
+    calls, generation = searches
+    retriever.prefetch_documents(["capex outlook"])
+    assert retriever.search_documents("capex outlook")[0]["id"] == "capex outlook@1"
+    assert len(calls) == 1
+    generation["value"] = (2, 0)
+    assert retriever.search_documents("capex outlook")[0]["id"] == "capex outlook@2"
+    assert len(calls) == 2
+
+
+def test_filters_and_sizes_are_separate_entries(searches):
+    calls, _ = searches
+    retriever.search_documents("capex", company_filter="Flex")
+    retriever.search_documents("capex", company_filter="Jabil")
+    retriever.search_documents("capex", company_filter="Flex", n_results=5)
+    retriever.search_documents("capex", company_filter="Flex")
+    assert len(calls) == 3
+
+
+def test_prefetch_only_runs_cache_misses(searches):
+    calls, _ = searches
+    retriever.search_documents("capex outlook")
+    assert retriever.prefetch_documents(["capex outlook", "ai spend"]) == 1
+    assert calls[-1] == ["ai spend"]
+    assert retriever.prefetch_documents(["capex outlook", "ai spend"]) == 0
+    assert len(calls) == 2
@@ -0,0 +1,85 @@
+"""Single-flight de-duplication of concurrent cache misses."""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from backend.core.cache import _single_flight, _async_single_flight, _async_flights
+
+
+def test_single_flight_shares_one_computation_across_threads():
+    calls = []
+    release = threading.Event()
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return "value"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(_single_flight("sf", compute))) for _ in range(4)]
+    for t in threads:
+        t.start()
+    time.sleep(0.1)
+    release.set()
+    for t in threads:
+        t.join(5)
+    assert results == ["value"] * 4
+    assert len(calls) == 1
+
+
+def test_single_flight_error_reaches_every_waiter():
+    def compute():
+        time.sleep(0.05)
+        raise ValueError("boom")
+
+    errors = []
+
+    def call():
+        try:
+            _single_flight("sf-error", compute)
+        except ValueError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+    assert len(errors) == 3
+
+
+def test_cancelled_async_leader_does_not_cancel_waiters():
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return 42
+
+    async def main():
+        leader = asyncio.create_task(_async_single_flight("asf", compute))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(_async_single_flight("asf", compute))
+        await asyncio.sleep(0)
+        leader.cancel()
+        assert await waiter == 42
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        await asyncio.sleep(0)
+        assert not _async_flights
+
+    asyncio.run(main())
+    assert len(calls) == 1
+
+
+def test_async_single_flight_propagates_errors():
+    async def compute():
+        raise ValueError("boom")
+
+    async def main():
+        with pytest.raises(ValueError):
+            await _async_single_flight("asf-error", compute)
+
+    asyncio.run(main())
@@ -0,0 +1,55 @@
+"""BM25 scoring and reciprocal rank fusion."""
+from backend.core.config import RRF_K
+from backend.core.sparse_index import SparseIndex, tokenize
+from backend.rag.retriever import _fuse
+
+
+def _index(tmp_path):
+    index = SparseIndex(tmp_path / "sparse.json")
+    index.record_upsert(
+        ["a", "b", "c"],
+        [
+            {"company": "Flex", "filing_type": "10-K", "fiscal_year": "FY24"},
+            {"company": "Jabil", "filing_type": "10-Q", "fiscal_year": "FY23", "quarter": "Q2"},
+            {"company": "Flex", "filing_type": "8-K", "fiscal_year": "FY23"},
+        ],
+        [
+            "Purchases of property and equipment were 2.1 billion",
+            "Capital expenditures for data center capacity",
+            "Press release: purchases of property and equipment",
+        ],
+    )
+    return index
+
+
+def test_tokenize_drops_stopwords():
+    assert tokenize("Purchases of Property and Equipment, FY2024") == ["purchases", "property", "equipment", "fy2024"]
+
+
+def test_bm25_ranks_and_filters(tmp_path):
+    index = _index(tmp_path)
+    assert {chunk_id for chunk_id, _ in index.search("property equipment")} == {"a", "c"}
+    assert [chunk_id for chunk_id, _ in index.search("data center")] == ["b"]
+    assert [chunk_id for chunk_id, _ in index.search("property equipment", company_filter="Flex", fy_int=2024)] == ["a"]
+    assert [chunk_id for chunk_id, _ in index.search("property equipment", filing_type_filter="8-K")] == ["c"]
+    assert index.search("property", min_period=2025 * 4) == []
+
+
+def test_sparse_index_persists_and_deletes(tmp_path):
+    index = _index(tmp_path)
+    index.record_delete(["c"])
+    index.save()
+    loaded = SparseIndex(tmp_path / "sparse.json")
+    assert loaded.load()
+    assert loaded.in_sync(2)
+    assert [chunk_id for chunk_id, _ in loaded.search("property equipment")] == ["a"]
+
+
+def test_rrf_fuses_both_rankings():
+    dense = [{"id": "a"}, {"id": "b"}]
+    sparse_docs = {("c", "q"): {"id": "c"}}
+    fused = {doc["id"]: doc["score"] for doc in _fuse(dense, ["b", "c"], sparse_docs, "q")}
+    assert fused["b"] == 1 / (RRF_K + 2) + 1 / (RRF_K + 1)
+    assert fused["a"] == 1 / (RRF_K + 1)
+    assert fused["c"] == 1 / (RRF_K + 2)
+    assert max(fused, key=fused.get) == "b"
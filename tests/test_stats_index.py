@@ -0,0 +1,36 @@
+"""Incremental metadata statistics index."""
+from backend.core.stats_index import MetadataIndex
+
+
+def _meta(company, source_file, fiscal_year="FY24", quarter="Q1"):
+    return {"company": company, "filing_type": "10-Q", "fiscal_year": fiscal_year,
+            "quarter": quarter, "source_file": source_file}
+
+
+def test_counts_follow_upserts_and_deletes(tmp_path):
+    index = MetadataIndex(tmp_path / "stats.json")
+    index.record_upsert(["a0", "a1", "b0"], [_meta("Flex", "a.htm"), _meta("Flex", "a.htm"), _meta("Jabil", "b.htm")])
+    index.record_upsert(["a1"], [_meta("Flex", "a.htm", quarter="Q2")])
+    index.record_delete(["b0"])
+    stats = index.stats()
+    assert stats["total_documents"] == 2
+    assert stats["companies"] == {"Flex": 2}
+    assert stats["quarters"] == {"Q1": 1, "Q2": 1}
+    assert index.file_counts() == {"a.htm": 2}
+    assert index.file_ids("Flex", "a.htm") == {"a0", "a1"}
+
+
+def test_stats_size_does_not_grow_with_files(tmp_path):
+    index = MetadataIndex(tmp_path / "stats.json")
+    index.record_upsert([f"c{i}" for i in range(50)], [_meta("Flex", f"f{i}.htm") for i in range(50)])
+    assert set(index.stats()) == {"total_documents", "companies", "filing_types", "fiscal_years", "quarters"}
+    assert len(index.file_counts()) == 50
+
+
+def test_persisted_index_round_trips(tmp_path):
+    index = MetadataIndex(tmp_path / "stats.json")
+    index.record_upsert(["a0"], [_meta("Flex", "a.htm")])
+    index.save()
+    loaded = MetadataIndex(tmp_path / "stats.json")
+    assert loaded.load()
+    assert loaded.stats() == index.stats()